@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Fan-out benchmark of subscriber broadcasts against a simulated Telegram API.
+
+Compares the previous one-chat-at-a-time loop with the rate-limited
+concurrent Broadcaster in src/bot/broadcast.py. The simulated bot answers
+after a fixed round-trip time and, like Telegram, replies with RetryAfter
+when more than --limit messages are sent within one second.
+
+Usage:
+    python benchmark_broadcast.py [--users N] [--rtt-ms MS] [--rate R] [--concurrency C]
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from collections import deque
+
+from telegram.error import Forbidden, RetryAfter
+
+from src.bot.broadcast import Broadcaster
+
+
+class SimulatedBot:
+    """Stand-in for telegram.Bot with a round-trip delay and Telegram-like flood control."""
+    
+    def __init__(self, rtt: float, limit: int, blocked_every: int = 0):
+        """
+        Args:
+            rtt: Seconds per request
+            limit: Messages per second above which RetryAfter is raised
+            blocked_every: Every n-th chat has blocked the bot (0 for none)
+        """
+        self.rtt = rtt
+        self.limit = limit
+        self.blocked_every = blocked_every
+        self.sent = deque()
+        self.rate_limited = 0
+    
+    async def send_message(self, chat_id: int, text: str, parse_mode=None):
+        now = time.monotonic()
+        while self.sent and self.sent[0] < now - 1:
+            self.sent.popleft()
+        if len(self.sent) >= self.limit:
+            self.rate_limited += 1
+            await asyncio.sleep(self.rtt)
+            raise RetryAfter(1)
+        self.sent.append(now)
+        await asyncio.sleep(self.rtt)
+        if self.blocked_every and chat_id % self.blocked_every == 0:
+            raise Forbidden("Forbidden: bot was blocked by the user")
+
+
+async def sequential(bot, users, text):
+    """The previous send_message_to_all_users loop."""
+    start = time.monotonic()
+    latencies = []
+    for chat_id in users:
+        try:
+            await bot.send_message(chat_id=chat_id, text=text, parse_mode='Markdown')
+            latencies.append(time.monotonic() - start)
+        except Exception:
+            pass
+    return time.monotonic() - start, latencies
+
+
+async def run(args):
+    users = list(range(1, args.users + 1))
+    text = "✅ Italy Visa Appointments Available!"
+    print(f"{args.users} subscribers, {args.rtt_ms:g} ms round trip, flood limit {args.limit}/s")
+    print(f"  {'engine':<14}{'seconds':>9}{'msg/s':>8}{'p50 s':>8}{'max s':>8}{'429s':>6}")
+    
+    bot = SimulatedBot(args.rtt_ms / 1000, args.limit, args.blocked_every)
+    elapsed, latencies = await sequential(bot, users, text)
+    latencies.sort()
+    print(f"  {'sequential':<14}{elapsed:>9.2f}{len(latencies) / elapsed:>8.1f}"
+          f"{latencies[len(latencies) // 2]:>8.2f}{latencies[-1]:>8.2f}{bot.rate_limited:>6}")
+    
+    bot = SimulatedBot(args.rtt_ms / 1000, args.limit, args.blocked_every)
+    report = await Broadcaster(bot, messages_per_second=args.rate, max_concurrency=args.concurrency).send_all(users, text)
+    print(f"  {'broadcaster':<14}{report['seconds']:>9.2f}{report['messages_per_second']:>8.1f}"
+          f"{report['latency_p50_seconds']:>8.2f}{report['latency_max_seconds']:>8.2f}{report['rate_limited']:>6}")
+    print(f"  delivered {report['delivered']}, unreachable {len(report['unreachable'])}, failed {report['failed']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Telegram broadcast fan-out")
+    parser.add_argument('--users', type=int, default=300)
+    parser.add_argument('--rtt-ms', type=float, default=150, help="Simulated Telegram round-trip time")
+    parser.add_argument('--limit', type=int, default=30, help="Simulated flood limit in messages per second")
+    parser.add_argument('--rate', type=float, default=25, help="Broadcaster send rate")
+    parser.add_argument('--concurrency', type=int, default=30)
+    parser.add_argument('--blocked-every', type=int, default=50, help="Every n-th chat has blocked the bot")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.ERROR)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
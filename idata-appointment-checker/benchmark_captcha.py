@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Accuracy and latency benchmark of the CAPTCHA solver on a captured corpus.
+
+Replays a corpus written by CAPTCHA capture mode (CAPTCHA_CAPTURE_DIR)
+through each solver configuration and reports accuracy, p50/p95 latency and
+throughput, optionally from several client threads and through the
+multi-process CaptchaService. Accuracy counts only images with a known answer (accepted by
+the server or labelled by hand); 'repeats' counts answers the server is
+known to have rejected for that image. 'held back' counts readings the
+solver flags as implausible (wrong length or below CAPTCHA_MIN_CONFIDENCE),
+which the checker replaces with a fresh CAPTCHA instead of submitting, and
+'sent acc.' is the accuracy of the remaining readings.
+
+Without a corpus, CAPTCHAs are generated with the local IDATA stand-in's
+renderer.
+
+Usage:
+    python benchmark_captcha.py [--corpus DIR] [--solvers single,ensemble,glyph] [--engine auto]
+                                [--glyph-model glyph_model.npz] [--clients N] [--service-workers N]
+                                [--min-confidence 0.6]
+"""
+
+import argparse
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from src.captcha.corpus import load_samples
+from src.captcha.service import CaptchaService
+from src.captcha.solver import CaptchaSolver
+from src.devtools.fake_idata import CAPTCHA_ALPHABET, CAPTCHA_LENGTH, render_captcha
+
+# Solver configurations by name; a new backend only needs an entry here
+SOLVERS = {
+    'single': {'ensemble': False},
+    'ensemble': {'ensemble': True},
+    'glyph': {'backend': 'glyph', 'ensemble': False},
+}
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def generate_samples(count: int, seed: int) -> List[Dict]:
+    """Render ``count`` CAPTCHAs with known answers."""
+    rng = random.Random(seed)
+    samples = []
+    for index in range(count):
+        answer = ''.join(rng.choice(CAPTCHA_ALPHABET) for _ in range(CAPTCHA_LENGTH))
+        samples.append({'name': f'generated-{index}', 'image': render_captcha(answer),
+                        'answer': answer, 'rejected': []})
+    return samples
+
+
+def run_solver(name: str, samples: List[Dict], engine: str, glyph_model: str, verbose: bool = False,
+               clients: int = 1, service_workers: int = 0, min_confidence: float = 0.6):
+    """Replay every sample through one solver configuration and print a result row."""
+    # Tuning would change parameters between solves and write its state file; cached answers skip OCR
+    config = {'captcha': {'ocr_engine': engine, 'glyph_model': glyph_model, 'tuning': False, 'answer_cache': False,
+                          'length': CAPTCHA_LENGTH, 'min_confidence': min_confidence, **SOLVERS[name]}}
+    if service_workers:
+        solver = CaptchaService(config, workers=service_workers)
+    else:
+        solver = CaptchaSolver(config)
+        if solver.backend == 'glyph' and not solver.glyph_recognizer:
+            print(f"  {name:<12} no glyph model at {glyph_model} (train with python -m src.captcha.glyph_recognizer)")
+            solver.close()
+            return
+    
+    def solve(sample: Dict):
+        solve_start = time.perf_counter()
+        result = solver.solve_captcha_detailed(sample['image'])
+        return result, time.perf_counter() - solve_start
+    
+    try:
+        # Warm up every client so model loading is not counted as solve latency
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            list(pool.map(solve, samples[:max(clients, service_workers, 1)]))
+            
+            start = time.perf_counter()
+            results = list(pool.map(solve, samples))
+            elapsed = time.perf_counter() - start
+        
+        latencies = []
+        labelled = correct = repeats = failed = held_back = sent = sent_correct = 0
+        for sample, (result, seconds) in zip(samples, results):
+            latencies.append(seconds)
+            text = result['text'] if result else None
+            
+            failed += not text
+            repeats += bool(text) and text in sample['rejected']
+            held_back += bool(text) and not result['plausible']
+            if sample['answer']:
+                labelled += 1
+                correct += text == sample['answer']
+                if text and result['plausible']:
+                    sent += 1
+                    sent_correct += text == sample['answer']
+            if verbose and sample['answer'] and text != sample['answer']:
+                print(f"    {name}: {sample['name']} read {text!r}, expected {sample['answer']!r}")
+    finally:
+        solver.close()
+    
+    if failed == len(samples):
+        print(f"  {name:<12} failed on every image (is tesseract installed?)")
+        return
+    
+    accuracy = f"{correct / labelled * 100:.1f}%" if labelled else 'n/a'
+    sent_accuracy = f"{sent_correct / sent * 100:.1f}%" if sent else 'n/a'
+    print(f"  {name:<12}{accuracy:>10}{repeats:>9}{failed:>8}{held_back:>11}{sent_accuracy:>11}"
+          f"{percentile(latencies, 0.5) * 1000:>10.1f}{percentile(latencies, 0.95) * 1000:>10.1f}"
+          f"{len(samples) / elapsed:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CAPTCHA solver accuracy and latency")
+    parser.add_argument('--corpus', help="Captured corpus, or a directory of images named after their answer")
+    parser.add_argument('--count', type=int, default=100, help="Generated CAPTCHAs when no corpus is given")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--solvers', default=','.join(SOLVERS), help=f"Any of: {', '.join(SOLVERS)}")
+    parser.add_argument('--engine', default='auto', help="OCR engine: auto, tesserocr or pytesseract")
+    parser.add_argument('--glyph-model', default='glyph_model.npz', help="Model for the glyph solver")
+    parser.add_argument('--clients', type=int, default=1, help="Threads submitting CAPTCHAs at once")
+    parser.add_argument('--service-workers', type=int, default=0,
+                        help="Solve through CaptchaService with this many processes (0 solves in-process)")
+    parser.add_argument('--min-confidence', type=float, default=0.6,
+                        help="Confidence below which a reading is held back (CAPTCHA_MIN_CONFIDENCE)")
+    parser.add_argument('--verbose', action='store_true', help="List every wrong answer")
+    args = parser.parse_args()
+    
+    # The solver logs every solve, and every failure
+    logging.basicConfig(level=logging.CRITICAL)
+    
+    samples = load_samples(args.corpus) if args.corpus else generate_samples(args.count, args.seed)
+    if not samples:
+        print("Corpus is empty")
+        return
+    
+    labelled = sum(1 for sample in samples if sample['answer'])
+    print(f"{len(samples)} CAPTCHAs ({labelled} with a known answer) "
+          f"from {args.corpus or 'the stand-in renderer'}, engine={args.engine}, clients={args.clients}, "
+          f"service workers={args.service_workers or 'none'}")
+    print(f"  {'solver':<12}{'accuracy':>10}{'repeats':>9}{'failed':>8}{'held back':>11}{'sent acc.':>11}{'p50 ms':>10}{'p95 ms':>10}{'solves/s':>10}")
+    for name in args.solvers.split(','):
+        name = name.strip()
+        if name not in SOLVERS:
+            print(f"  {name:<12} unknown solver")
+            continue
+        run_solver(name, samples, args.engine, args.glyph_model, args.verbose, args.clients, args.service_workers,
+                   args.min_confidence)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of AppointmentChecker against the local IDATA stand-in.
+
+Starts src/devtools/fake_idata.py on a free port, runs full appointment
+checks against it and reports wall time and per-stage timings, so scraper
+changes can be compared without touching the live site.
+
+Usage:
+    python benchmark_checker.py [--runs N] [--backend selenium|http] [--concurrency N]
+                                [--mode no_slots|slots|error] [--latency main_page=0.3,results=1]
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+
+from src.devtools.fake_idata import RESULT_MODES, FakeIdataServer, parse_latency
+from src.scraper.appointment_checker import AppointmentChecker
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def build_config(args, base_url: str, session_file: str) -> Dict:
+    """Checker configuration pointing at the fake server."""
+    return {
+        'appointment': {
+            'residence_city': 'İstanbul',
+            'idata_offices': args.offices.split(','),
+            'travel_purpose': 'Tourism',
+            'service_type': 'Standard',
+            'num_persons': '1',
+            'profiles': [],
+        },
+        'scraper': {
+            'base_url': base_url,
+            'backend': args.backend,
+            'check_concurrency': args.concurrency,
+            'driver_pool_size': args.concurrency,
+            'session_persistence': args.keep_session,
+            'session_file': session_file,
+        },
+        # Runs against the fake site must not leave tuning state or cached answers behind
+        'captcha': {'tuning': False, 'answer_cache': False},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark AppointmentChecker against a local fake IDATA site")
+    parser.add_argument('--runs', type=int, default=3, help="Full checks to run")
+    parser.add_argument('--backend', choices=('selenium', 'http'), default='selenium')
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--offices', default='Altunizade,Gayrettepe')
+    parser.add_argument('--mode', choices=RESULT_MODES, default='no_slots', help="Result page the server returns")
+    parser.add_argument('--latency', default='', help="Per-route server delays, e.g. main_page=0.3,results=1")
+    parser.add_argument('--captcha-mode', choices=('strict', 'any'), default='any',
+                        help="'any' accepts every six-character code so OCR accuracy does not skew timings")
+    parser.add_argument('--captcha-reject-rate', type=float, default=0.0)
+    parser.add_argument('--keep-session', action='store_true',
+                        help="Persist the session between runs (measures the CAPTCHA-free path)")
+    parser.add_argument('--show-browser', action='store_true')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+    
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
+    session_file = os.path.join(tempfile.mkdtemp(prefix='idata-bench-'), 'session_state.json')
+    
+    with FakeIdataServer(
+        result_mode=args.mode,
+        latency=parse_latency(args.latency),
+        captcha_mode=args.captcha_mode,
+        captcha_reject_rate=args.captcha_reject_rate
+    ) as server:
+        checker = AppointmentChecker(
+            headless=not args.show_browser,
+            config=build_config(args, server.base_url, session_file)
+        )
+        
+        run_times: List[float] = []
+        stage_times: Dict[str, List[float]] = {}
+        profile_times: List[float] = []
+        try:
+            for run in range(1, args.runs + 1):
+                start = time.perf_counter()
+                is_available, message = checker.check_appointments()
+                elapsed = time.perf_counter() - start
+                run_times.append(elapsed)
+                print(f"run {run}: {elapsed:.2f}s - {message}")
+                
+                for result in checker.last_results:
+                    if result.get('duration_seconds') is not None:
+                        profile_times.append(result['duration_seconds'])
+                    for stage, seconds in result['details'].get('step_timings', {}).items():
+                        stage_times.setdefault(stage, []).append(seconds)
+        finally:
+            checker.close()
+        
+        print(f"\nbackend={args.backend} concurrency={args.concurrency} offices={args.offices} "
+              f"latency={args.latency or 'none'}")
+        print(f"  {'stage':<18}{'n':>5}{'mean s':>10}{'p50 s':>10}{'p95 s':>10}{'max s':>10}")
+        rows = [('check (wall)', run_times), ('profile', profile_times)] + sorted(stage_times.items())
+        for name, values in rows:
+            if not values:
+                continue
+            print(f"  {name:<18}{len(values):>5}{statistics.mean(values):>10.3f}"
+                  f"{percentile(values, 0.5):>10.3f}{percentile(values, 0.95):>10.3f}{max(values):>10.3f}")
+        
+        captcha = checker.captcha_retry.get_stats()
+        print(f"  CAPTCHA attempts: {captcha['attempts']} "
+              f"({captcha['rejected']} rejected, {captcha['unsolved']} unsolved)")
+        print(f"  server: {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
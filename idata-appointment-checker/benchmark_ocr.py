@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Solves-per-second benchmark of the OCR engines on a CAPTCHA corpus.
+
+Runs the full CaptchaSolver pipeline (decode, preprocess, OCR, clean) with
+each engine from src/captcha/ocr_engine.py, with and without the
+preprocessing ensemble, and reports throughput, latency and accuracy.
+
+The corpus is a directory of images named after their answer
+(e.g. ``K7MPR2.png`` or ``K7MPR2_3.png``); without one, CAPTCHAs are
+generated with the local IDATA stand-in's renderer.
+
+Usage:
+    python benchmark_ocr.py [--corpus DIR] [--count N] [--engines pytesseract,tesserocr] [--modes single,ensemble]
+"""
+
+import argparse
+import logging
+import random
+import statistics
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from src.captcha.ocr_engine import PytesseractEngine, TesserocrEngine
+from src.captcha.solver import CaptchaSolver
+from src.devtools.fake_idata import CAPTCHA_ALPHABET, CAPTCHA_LENGTH, render_captcha
+
+ENGINES = {
+    'pytesseract': PytesseractEngine,
+    'tesserocr': TesserocrEngine,
+}
+
+
+def load_corpus(directory: str) -> List[Tuple[bytes, str]]:
+    """Read (image bytes, answer) pairs from image files named after their answer."""
+    samples = []
+    for path in sorted(Path(directory).iterdir()):
+        if path.suffix.lower() in ('.png', '.jpg', '.jpeg', '.gif', '.bmp'):
+            samples.append((path.read_bytes(), path.stem.split('_')[0].upper()))
+    return samples
+
+
+def generate_corpus(count: int, seed: int) -> List[Tuple[bytes, str]]:
+    """Render ``count`` CAPTCHAs with known answers."""
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(count):
+        answer = ''.join(rng.choice(CAPTCHA_ALPHABET) for _ in range(CAPTCHA_LENGTH))
+        samples.append((render_captcha(answer), answer))
+    return samples
+
+
+def run_engine(name: str, samples: List[Tuple[bytes, str]], ensemble: bool = False):
+    """Solve every sample with one engine and print a result row."""
+    label = f"{name}{'+ensemble' if ensemble else ''}"
+    try:
+        engine = ENGINES[name]()
+    except Exception as e:
+        print(f"  {label:<22} unavailable: {e}")
+        return
+    
+    solver = CaptchaSolver({'captcha': {'ensemble': ensemble, 'tuning': False, 'answer_cache': False}})
+    solver.ocr_engine.close()
+    solver.ocr_engine = engine
+    
+    try:
+        # The first solve includes loading the model (every time for pytesseract)
+        first_start = time.perf_counter()
+        solver.solve_captcha(samples[0][0])
+        first_solve = time.perf_counter() - first_start
+        
+        latencies = []
+        correct = 0
+        failed = 0
+        start = time.perf_counter()
+        for image, answer in samples:
+            solve_start = time.perf_counter()
+            text = solver.solve_captcha(image)
+            latencies.append(time.perf_counter() - solve_start)
+            correct += text == answer
+            failed += text is None
+        elapsed = time.perf_counter() - start
+    finally:
+        solver.close()
+    
+    if failed == len(samples):
+        print(f"  {label:<22} failed on every image (is tesseract installed?)")
+        return
+    
+    print(f"  {label:<22}{len(samples) / elapsed:>10.1f}{statistics.median(latencies) * 1000:>10.1f}"
+          f"{first_solve * 1000:>12.1f}{correct / len(samples) * 100:>10.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OCR engines on a CAPTCHA corpus")
+    parser.add_argument('--corpus', help="Directory of images named after their answer")
+    parser.add_argument('--count', type=int, default=100, help="Generated CAPTCHAs when no corpus is given")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--engines', default='pytesseract,tesserocr')
+    parser.add_argument('--modes', default='single,ensemble', help="Solver modes to compare")
+    args = parser.parse_args()
+    
+    # The solver logs every solve, and every failure
+    logging.basicConfig(level=logging.CRITICAL)
+    
+    samples = load_corpus(args.corpus) if args.corpus else generate_corpus(args.count, args.seed)
+    if not samples:
+        print("Corpus is empty")
+        return
+    
+    print(f"{len(samples)} CAPTCHAs from {args.corpus or 'the stand-in renderer'}")
+    print(f"  {'engine':<22}{'solves/s':>10}{'p50 ms':>10}{'first ms':>12}{'accuracy':>11}")
+    modes = [mode.strip() for mode in args.modes.split(',')]
+    for name in args.engines.split(','):
+        for mode in modes:
+            run_engine(name.strip(), samples, ensemble=mode == 'ensemble')
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
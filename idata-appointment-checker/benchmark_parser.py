@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of the result page parser against saved HTML fixtures.
+
+Compares the previous BeautifulSoup implementation with the single-pass
+lxml parser in src/scraper/result_parser.py for speed and peak memory.
+
+Usage:
+    python benchmark_parser.py [fixture.html ...] [--runs N]
+"""
+
+import argparse
+import time
+import tracemalloc
+import warnings
+
+from bs4 import BeautifulSoup
+
+from src.scraper.result_parser import NO_APPOINTMENT_TEXT, parse_result_page
+
+
+def legacy_parse(page_content: str):
+    """The BeautifulSoup-based availability check the scraper used before."""
+    soup = BeautifulSoup(page_content, 'html.parser')
+    details = {'slots_found': 0, 'error_messages': []}
+    
+    if NO_APPOINTMENT_TEXT in page_content:
+        no_appt_element = soup.find(text=lambda text: text and NO_APPOINTMENT_TEXT in text)
+        if no_appt_element:
+            return False, no_appt_element.strip(), details
+        return False, "No appointments available", details
+    
+    error_keywords = ['hata', 'error', 'başarısız', 'failed', 'geçersiz', 'invalid']
+    for keyword in error_keywords:
+        if keyword in page_content.lower():
+            error_elements = soup.find_all(text=lambda text: text and keyword.lower() in text.lower())
+            for error in error_elements[:3]:
+                details['error_messages'].append(error.strip())
+    
+    time_slots = []
+    for tag in ['div', 'button', 'a']:
+        for elem in soup.find_all(tag):
+            class_attr = elem.get('class', [])
+            if any(keyword in str(class_attr).lower() for keyword in ['slot', 'time', 'saat', 'randevu', 'tarih', 'date']):
+                slot_text = elem.get_text(strip=True)
+                if slot_text and len(slot_text) > 3:
+                    time_slots.append(slot_text)
+    
+    calendar_slots = soup.find_all(['td', 'div'], class_=lambda x: x and any(
+        word in str(x).lower() for word in ['available', 'mevcut', 'uygun', 'calendar']
+    ))
+    for slot in calendar_slots:
+        slot_text = slot.get_text(strip=True)
+        if slot_text and len(slot_text) > 3:
+            time_slots.append(slot_text)
+    
+    time_slots = list(set(time_slots))
+    details['slots_found'] = len(time_slots)
+    if time_slots:
+        return True, f"Appointments available! Found {len(time_slots)} slots", details
+    return False, "No appointment slots found", details
+
+
+def new_parse(page_content: str):
+    """The single-pass lxml parser."""
+    return parse_result_page(page_content, 'https://it-tr-appointment.idata.com.tr/tr/appointment-form')
+
+
+def measure(parse, page_content: str, runs: int):
+    """
+    Time ``runs`` parses and record the peak Python heap usage of one parse.
+    
+    Returns:
+        Tuple of (mean seconds per parse, peak Python heap bytes, parse result)
+    """
+    result = parse(page_content)  # warm-up
+    
+    start = time.perf_counter()
+    for _ in range(runs):
+        parse(page_content)
+    elapsed = (time.perf_counter() - start) / runs
+    
+    tracemalloc.start()
+    parse(page_content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    return elapsed, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the result page parser")
+    parser.add_argument('fixtures', nargs='*', default=['page_source.html'], help="HTML files to parse")
+    parser.add_argument('--runs', type=int, default=50, help="Parses per implementation and fixture")
+    args = parser.parse_args()
+    
+    # The legacy code uses BeautifulSoup's deprecated ``text=`` argument
+    warnings.simplefilter('ignore', DeprecationWarning)
+    
+    for path in args.fixtures:
+        with open(path, 'r', encoding='utf-8') as f:
+            page_content = f.read()
+        
+        legacy_time, legacy_peak, legacy_result = measure(legacy_parse, page_content, args.runs)
+        new_time, new_peak, new_result = measure(new_parse, page_content, args.runs)
+        
+        print(f"\n{path} ({len(page_content) / 1024:.1f} KB, {args.runs} runs)")
+        # tracemalloc only sees Python allocations, not libxml2's C heap
+        print(f"  {'parser':<18}{'ms/parse':>10}{'py heap KB':>12}")
+        print(f"  {'BeautifulSoup':<18}{legacy_time * 1000:>10.2f}{legacy_peak / 1024:>12.1f}")
+        print(f"  {'lxml single-pass':<18}{new_time * 1000:>10.2f}{new_peak / 1024:>12.1f}")
+        print(f"  speedup: {legacy_time / new_time:.1f}x")
+        
+        if legacy_result[0] != new_result[0]:
+            print(f"  ⚠️  availability differs: legacy={legacy_result[:2]} new={new_result[:2]}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of CAPTCHA decoding and preprocessing (no OCR).
+
+Compares the previous PIL-based path (BytesIO -> PIL -> np.array -> BGR ->
+gray) with the decoder in src/captcha/solver.py, which goes from the
+data-URL payload to a grayscale array with cv2.imdecode and preprocesses
+into reused per-thread buffers.
+
+Usage:
+    python benchmark_preprocess.py [--runs N] [--ensemble]
+"""
+
+import argparse
+import base64
+import io
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from src.captcha.solver import CaptchaSolver, decode_image
+from src.devtools.fake_idata import render_captcha
+
+
+def legacy_preprocess(data_url: str) -> np.ndarray:
+    """The decode and preprocessing chain the solver used before."""
+    image = Image.open(io.BytesIO(base64.b64decode(data_url.split(',')[1])))
+    img = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    _, thresh = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY)
+    denoised = cv2.medianBlur(thresh, 3)
+    width = int(denoised.shape[1] * 200 / 100)
+    height = int(denoised.shape[0] * 200 / 100)
+    return cv2.resize(denoised, (width, height), interpolation=cv2.INTER_CUBIC)
+
+
+def measure(function, runs: int):
+    """Mean microseconds per call and peak traced memory of one call."""
+    function()
+    start = time.perf_counter()
+    for _ in range(runs):
+        function()
+    elapsed = time.perf_counter() - start
+    
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / runs * 1e6, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CAPTCHA decoding and preprocessing")
+    parser.add_argument('--runs', type=int, default=2000)
+    parser.add_argument('--ensemble', action='store_true', help="Also time all ensemble variants")
+    args = parser.parse_args()
+    
+    data_url = 'data:image/png;base64,' + base64.b64encode(render_captcha('K7MPR2')).decode()
+    solver = CaptchaSolver({'captcha': {'ensemble': False, 'tuning': False, 'answer_cache': False}})
+    
+    def legacy():
+        return legacy_preprocess(data_url)
+    
+    def current():
+        payload = data_url[data_url.find(',') + 1:]
+        return solver._preprocess_image(decode_image(base64.b64decode(payload)))
+    
+    def ensemble():
+        payload = data_url[data_url.find(',') + 1:]
+        return solver._preprocess_variants(decode_image(base64.b64decode(payload)))
+    
+    assert np.array_equal(legacy(), current()), "Preprocessing output changed"
+    
+    rows = [('legacy (PIL)', legacy), ('imdecode', current)]
+    if args.ensemble:
+        rows.append(('ensemble variants', ensemble))
+    
+    print(f"  {'path':<20}{'us/solve':>10}{'peak KB':>10}")
+    for name, function in rows:
+        micros, peak = measure(function, args.runs)
+        print(f"  {name:<20}{micros:>10.1f}{peak:>10.1f}")
+    solver.close()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
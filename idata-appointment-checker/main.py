@@ -9,8 +9,10 @@ import logging
 import sys
 import threading
 from datetime import datetime
+from typing import Optional
 
-from src.config import load_config
+from src.config import describe_appointment, load_config
+from src.notifier.availability import AvailabilityTracker, format_changes
 from src.notifier.notifier import Notifier
 from src.scheduler.scheduler import AppointmentScheduler
 from src.scraper.appointment_checker import AppointmentChecker
@@ -30,30 +32,38 @@ def setup_logging(log_level: str = 'INFO'):
     )
 
 
-def check_appointments(config: dict):
+def check_appointments(config: dict, checker: AppointmentChecker, notifier: Notifier,
+                       tracker: Optional[AvailabilityTracker] = None):
     """
     Main function to check appointments and send notifications.
     
     Args:
         config: Application configuration
+        checker: Long-lived appointment checker whose browsers are reused between checks
+        notifier: Long-lived notifier whose Telegram connections are reused between checks
+        tracker: Slot state of earlier checks; when given, only changes are announced
     """
     logger = logging.getLogger(__name__)
     
-    # Initialize components
-    checker = AppointmentChecker(headless=config['general']['headless_browser'])
-    notifier = Notifier(config)
-    
     try:
         # Check appointments
         is_available, message = checker.check_appointments()
         
         if is_available:
             logger.info(f"APPOINTMENTS AVAILABLE! {message}")
-            # Send notification
-            notifier.send_appointment_available_notification(message)
         else:
             logger.info(f"No appointments available: {message}")
         
+        if tracker:
+            # Every result updates the state, so slots that close and reopen are announced again
+            changes = tracker.update(checker.last_results)
+            if changes:
+                notifier.send_appointment_available_notification(format_changes(changes))
+            elif is_available:
+                logger.info("Open slots unchanged since the last alert, not notifying again")
+        elif is_available:
+            notifier.send_appointment_available_notification(message)
+        
     except Exception as e:
         logger.error(f"Error during appointment check: {e}", exc_info=True)
         # Send error notification
@@ -84,14 +94,12 @@ def main():
         logger.info(f"Email notifications: {config['email']['enabled']}")
         
         # Print appointment configuration
+        appointment_lines = describe_appointment(config['appointment'])
         logger.info("Appointment configuration:")
-        logger.info(f"  - Residence City: {config['appointment']['residence_city']}")
-        logger.info(f"  - IDATA Offices: {', '.join(config['appointment']['idata_offices'])}")
-        logger.info(f"  - Travel Purpose: {config['appointment']['travel_purpose']}")
-        logger.info(f"  - Service Type: {config['appointment']['service_type']}")
-        logger.info(f"  - Number of Persons: {config['appointment']['num_persons']}")
+        for line in appointment_lines:
+            logger.info(f"  - {line}")
         
-        # Initialize notifier for startup notification
+        # One notifier for the whole run: its event loop, Bot and user store are set up once
         notifier = Notifier(config)
         
         # Create detailed startup message
@@ -101,17 +109,15 @@ def main():
             f"⏰ *Check Interval:* Every {config['general']['check_interval_minutes']} minutes\n"
             f"🖥️ *Browser Mode:* {'Headless' if config['general']['headless_browser'] else 'Visible'}\n\n"
             f"*📋 Configuration:*\n"
-            f"• City: {config['appointment']['residence_city']}\n"
-            f"• Offices: {', '.join(config['appointment']['idata_offices'])}\n"
-            f"• Purpose: {config['appointment']['travel_purpose']}\n"
-            f"• Service: {config['appointment']['service_type']}\n"
-            f"• Persons: {config['appointment']['num_persons']}\n\n"
+            + ''.join(f"• {line}\n" for line in appointment_lines) + "\n"
             f"*🔔 Notifications:*\n"
             f"• Telegram: {'✅ Enabled' if config['telegram']['enabled'] else '❌ Disabled'}\n"
             f"• Email: {'✅ Enabled' if config['email']['enabled'] else '❌ Disabled'}\n\n"
             f"_The bot is now monitoring appointments. You will be notified when slots become available._"
         )
         
+        # Deliver notifications a previous run left undelivered, then announce the start
+        notifier.start()
         notifier.send_status_notification(startup_message)
         
         # Initialize Telegram bot if enabled
@@ -171,12 +177,30 @@ def main():
             check_interval_minutes=config['general']['check_interval_minutes']
         )
         
-        # Start scheduler with initial check
-        scheduler.start(
-            check_function=lambda: check_appointments(config),
-            initial_check=True
+        # Browsers stay warm in the checker's pool across scheduled checks
+        checker = AppointmentChecker(
+            headless=config['general']['headless_browser'],
+            config=config
         )
         
+        # Remembers announced slots so unchanged availability is not broadcast on every check
+        tracker = None
+        if config['notifications']['only_changes']:
+            tracker = AvailabilityTracker(
+                path=config['notifications']['availability_state_file'],
+                reminder_minutes=config['notifications']['reminder_minutes']
+            )
+        
+        # Start scheduler with initial check
+        try:
+            scheduler.start(
+                check_function=lambda: check_appointments(config, checker, notifier, tracker),
+                initial_check=True
+            )
+        finally:
+            checker.close()
+            notifier.close()
+        
     except KeyboardInterrupt:
         logger.info("Application stopped by user")
     except Exception as e:
@@ -9,8 +9,10 @@ import sys
 import threading
 from datetime import datetime
 import time
+from typing import Optional
 
-from src.config import load_config
+from src.config import describe_appointment, load_config
+from src.notifier.availability import AvailabilityTracker, format_changes
 from src.notifier.notifier import Notifier
 from src.scheduler.scheduler import AppointmentScheduler
 from src.scraper.appointment_checker import AppointmentChecker
@@ -30,24 +32,30 @@ def setup_logging(log_level: str = 'INFO'):
     )
 
 
-def check_appointments(config: dict):
-    """Check appointments and send notifications."""
+def check_appointments(config: dict, checker: AppointmentChecker, notifier: Notifier,
+                       tracker: Optional[AvailabilityTracker] = None):
+    """Check appointments and send notifications for new or changed availability."""
     logger = logging.getLogger(__name__)
     
-    # Initialize components
-    checker = AppointmentChecker(headless=config['general']['headless_browser'])
-    notifier = Notifier(config)
-    
     try:
         # Check appointments
         is_available, message = checker.check_appointments()
         
         if is_available:
             logger.info(f"APPOINTMENTS AVAILABLE! {message}")
-            notifier.send_appointment_available_notification(message)
         else:
             logger.info(f"No appointments available: {message}")
         
+        if tracker:
+            # Every result updates the state, so slots that close and reopen are announced again
+            changes = tracker.update(checker.last_results)
+            if changes:
+                notifier.send_appointment_available_notification(format_changes(changes))
+            elif is_available:
+                logger.info("Open slots unchanged since the last alert, not notifying again")
+        elif is_available:
+            notifier.send_appointment_available_notification(message)
+        
     except Exception as e:
         logger.error(f"Error during appointment check: {e}", exc_info=True)
         notifier.send_error_notification(str(e))
@@ -118,8 +126,11 @@ def main():
         logger.info("Starting IDATA Appointment Checker with Telegram Bot...")
         logger.info(f"Check interval: {config['general']['check_interval_minutes']} minutes")
         logger.info(f"Telegram bot enabled: {config['telegram']['enabled']}")
+        logger.info("Appointment configuration:")
+        for line in describe_appointment(config['appointment']):
+            logger.info(f"  - {line}")
         
-        # Send startup notification
+        # Send startup notification; the notifier is reused for every check
         notifier = Notifier(config)
         startup_message = (
             f"🚀 *IDATA Appointment Checker Started*\n\n"
@@ -132,6 +143,8 @@ def main():
             f"• `/help` - Get help\n\n"
             f"_The bot is now monitoring appointments and accepting commands._"
         )
+        # Deliver notifications a previous run left undelivered, then announce the start
+        notifier.start()
         notifier.send_status_notification(startup_message)
         
         # Start Telegram bot in a separate thread
@@ -154,11 +167,29 @@ def main():
             check_interval_minutes=config['general']['check_interval_minutes']
         )
         
-        scheduler.start(
-            check_function=lambda: check_appointments(config),
-            initial_check=True
+        # Browsers stay warm in the checker's pool across scheduled checks
+        checker = AppointmentChecker(
+            headless=config['general']['headless_browser'],
+            config=config
         )
         
+        # Remembers announced slots so unchanged availability is not broadcast on every check
+        tracker = None
+        if config['notifications']['only_changes']:
+            tracker = AvailabilityTracker(
+                path=config['notifications']['availability_state_file'],
+                reminder_minutes=config['notifications']['reminder_minutes']
+            )
+        
+        try:
+            scheduler.start(
+                check_function=lambda: check_appointments(config, checker, notifier, tracker),
+                initial_check=True
+            )
+        finally:
+            checker.close()
+            notifier.close()
+        
     except KeyboardInterrupt:
         logger.info("Application stopped by user")
     except Exception as e:
@@ -1,6 +1,8 @@
+import asyncio
 import logging
 from telegram import Update
 from telegram.ext import Application, CommandHandler, ContextTypes
+from .broadcast import GLOBAL_MESSAGES_PER_SECOND, Broadcaster
 from .user_manager import UserManager
 
 logger = logging.getLogger(__name__)
@@ -198,34 +200,45 @@ class BotHandler:
             await self.application.stop()
             await self.application.shutdown()
 
-async def send_message_to_all_users(bot_token: str, message: str, database_url: str = None, users_file: str = "users.json"):
+def create_broadcast_bot(bot_token: str, max_concurrency: int = 30):
+    """Create a telegram.Bot whose connection pool can carry ``max_concurrency`` sends at once."""
     from telegram import Bot
+    from telegram.request import HTTPXRequest
     
+    # The default request object holds a single connection
+    request = HTTPXRequest(connection_pool_size=max_concurrency, pool_timeout=10.0)
+    return Bot(token=bot_token, request=request)
+
+async def send_message_to_all_users(bot_token: str, message: str, database_url: str = None, users_file: str = "users.json",
+                                    messages_per_second: float = GLOBAL_MESSAGES_PER_SECOND, max_concurrency: int = 30):
     user_manager = UserManager(database_url=database_url, users_file=users_file)
-    bot = Bot(token=bot_token)
+    if not user_manager.get_all_users():
+        return 0
     
-    users = user_manager.get_all_users()
-    failed_users = []
+    async with create_broadcast_bot(bot_token, max_concurrency) as bot:
+        broadcaster = Broadcaster(bot, messages_per_second=messages_per_second, max_concurrency=max_concurrency)
+        return await broadcast_to_users(broadcaster, user_manager, message)
+
+async def broadcast_to_users(broadcaster: Broadcaster, user_manager: UserManager, message: str) -> int:
+    """Send a message to every subscriber and drop the ones that blocked the bot."""
+    loop = asyncio.get_running_loop()
+    # User storage is synchronous (SQLAlchemy or JSON); keep it off the event loop
+    users = await loop.run_in_executor(None, user_manager.get_all_users)
+    if not users:
+        return 0
     
-    for chat_id in users:
-        try:
-            await bot.send_message(
-                chat_id=chat_id,
-                text=message,
-                parse_mode='Markdown'
-            )
-            logger.info(f"Message sent to user {chat_id}")
-        except Exception as e:
-            logger.error(f"Failed to send message to user {chat_id}: {e}")
-            if "chat not found" in str(e).lower() or "blocked by the user" in str(e).lower():
-                failed_users.append(chat_id)
+    # Concurrent sends under Telegram's rate limits instead of one round trip per user
+    report = await broadcaster.send_all(users, message, parse_mode='Markdown')
     
     # Remove users who blocked the bot or deleted their account
-    for chat_id in failed_users:
-        user_manager.remove_user(chat_id)
+    for chat_id in report['unreachable']:
+        await loop.run_in_executor(None, user_manager.remove_user, chat_id)
         logger.info(f"Removed inactive user {chat_id}")
     
-    successful_sends = len(users) - len(failed_users)
-    logger.info(f"Message sent to {successful_sends}/{len(users)} users")
+    logger.info(
+        f"Message sent to {report['delivered']}/{len(users)} users in {report['seconds']:.1f}s "
+        f"({report['messages_per_second']:.1f} msg/s, latency p50 {report['latency_p50_seconds']:.1f}s / "
+        f"max {report['latency_max_seconds']:.1f}s, {report['rate_limited']} rate limited)"
+    )
     
-    return successful_sends
\ No newline at end of file
+    return report['delivered']
\ No newline at end of file
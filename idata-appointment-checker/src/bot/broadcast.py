@@ -0,0 +1,200 @@
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional
+
+from telegram.error import BadRequest, Forbidden, NetworkError, RetryAfter, TimedOut
+
+logger = logging.getLogger(__name__)
+
+# Telegram allows about 30 messages per second per bot and one per second per chat;
+# sending a little below the global limit keeps timer jitter from tripping flood control
+GLOBAL_MESSAGES_PER_SECOND = 25
+PER_CHAT_INTERVAL_SECONDS = 1.0
+
+# Errors after which a chat will never receive messages again
+UNREACHABLE_ERRORS = ("chat not found", "blocked by the user", "user is deactivated", "bot was kicked")
+
+
+class TokenBucket:
+    """
+    Asyncio rate limiter: ``rate`` tokens per second, bursts of up to ``capacity``.
+    
+    Each ``acquire`` reserves the next free token, so callers are released
+    in order and the bucket never needs a lock inside one event loop.
+    """
+    
+    def __init__(self, rate: float, capacity: float = 1):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Largest burst. Telegram counts messages over a sliding
+                second, so a full second's burst followed by refills would
+                overshoot it; the default paces sends evenly.
+        """
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+    
+    async def acquire(self):
+        """Wait for a token, and for any pause to end."""
+        now = time.monotonic()
+        if now > self._updated:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
+        
+        remaining = self._paused_until - time.monotonic()
+        while remaining > 0:
+            await asyncio.sleep(remaining)
+            remaining = self._paused_until - time.monotonic()
+    
+    def pause(self, seconds: float):
+        """Hand out no tokens for ``seconds``, then restart without a burst."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = min(self._tokens, 0)
+        self._updated = max(self._updated, self._paused_until)
+
+
+class Broadcaster:
+    """
+    Sends one message to many Telegram chats concurrently within Telegram's rate limits.
+    
+    Workers share a global token bucket and keep at least
+    ``per_chat_interval`` between messages to the same chat. A RetryAfter
+    (HTTP 429) pauses the whole bucket for the time Telegram asks and puts
+    the message back in the queue; timeouts and network errors are retried
+    a few times. Fan-out time is then bounded by the rate limit rather than
+    by the round-trip time of every message in turn.
+    """
+    
+    def __init__(self, bot, messages_per_second: float = GLOBAL_MESSAGES_PER_SECOND,
+                 per_chat_interval: float = PER_CHAT_INTERVAL_SECONDS, max_concurrency: int = 30,
+                 max_retries: int = 3):
+        """
+        Args:
+            bot: telegram.Bot (or anything with an async ``send_message``)
+            messages_per_second: Global send rate
+            per_chat_interval: Minimum seconds between two messages to one chat
+            max_concurrency: Requests in flight at once
+            max_retries: Retries per chat after timeouts or network errors
+        """
+        self.bot = bot
+        self.bucket = TokenBucket(messages_per_second)
+        self.per_chat_interval = per_chat_interval
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        # Earliest time the next message may go to each chat
+        self._chat_ready: Dict[int, float] = {}
+    
+    async def send_all(self, chat_ids: Iterable[int], text: str, parse_mode: Optional[str] = 'Markdown') -> Dict:
+        """
+        Send ``text`` to every chat.
+        
+        Args:
+            chat_ids: Recipients (duplicates are sent once)
+            text: Message text
+            parse_mode: Telegram parse mode
+        
+        Returns:
+            Report with 'recipients', 'delivered', 'delivered_to' (chat ids),
+            'failed', 'unreachable' (chat ids that blocked the bot or no
+            longer exist), 'rate_limited'
+            (RetryAfter responses), 'retries', 'seconds', 'messages_per_second'
+            and p50/p95/max delivery latency in seconds since the start
+        """
+        recipients = list(dict.fromkeys(chat_ids))
+        report = {
+            'recipients': len(recipients),
+            'delivered': 0,
+            'delivered_to': [],
+            'failed': 0,
+            'unreachable': [],
+            'rate_limited': 0,
+            'retries': 0,
+        }
+        latencies: List[float] = []
+        start = time.monotonic()
+        self._chat_ready = {chat_id: ready for chat_id, ready in self._chat_ready.items() if ready > start}
+        
+        queue: asyncio.Queue = asyncio.Queue()
+        for chat_id in recipients:
+            queue.put_nowait((chat_id, 0))
+        
+        async def worker():
+            while True:
+                try:
+                    chat_id, retries = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                outcome = await self._send(chat_id, text, parse_mode, report)
+                if outcome == 'delivered':
+                    report['delivered'] += 1
+                    report['delivered_to'].append(chat_id)
+                    latencies.append(time.monotonic() - start)
+                elif outcome == 'unreachable':
+                    report['unreachable'].append(chat_id)
+                elif outcome == 'rate_limited':
+                    # Not the chat's fault: does not use up its retries
+                    queue.put_nowait((chat_id, retries))
+                elif outcome == 'retry' and retries < self.max_retries:
+                    report['retries'] += 1
+                    queue.put_nowait((chat_id, retries + 1))
+                else:
+                    report['failed'] += 1
+        
+        # A requeued message can outlive the worker that took it, so workers
+        # run until the queue is drained in rounds
+        while not queue.empty():
+            await asyncio.gather(*(worker() for _ in range(min(self.max_concurrency, queue.qsize()))))
+        
+        elapsed = time.monotonic() - start
+        latencies.sort()
+        report['seconds'] = round(elapsed, 3)
+        report['messages_per_second'] = round(report['delivered'] / elapsed, 1) if elapsed else 0.0
+        for label, fraction in (('p50', 0.5), ('p95', 0.95), ('max', 1.0)):
+            value = latencies[min(len(latencies) - 1, int(round(fraction * (len(latencies) - 1))))] if latencies else 0.0
+            report[f'latency_{label}_seconds'] = round(value, 3)
+        return report
+    
+    async def _send(self, chat_id: int, text: str, parse_mode: Optional[str], report: Dict) -> str:
+        """
+        Send to one chat once the rate limits allow it.
+        
+        Returns:
+            'delivered', 'unreachable', 'rate_limited', 'retry' or 'failed'
+        """
+        wait = self._chat_ready.get(chat_id, 0.0) - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        await self.bucket.acquire()
+        self._chat_ready[chat_id] = time.monotonic() + self.per_chat_interval
+        
+        try:
+            await self.bot.send_message(chat_id=chat_id, text=text, parse_mode=parse_mode)
+            return 'delivered'
+        except RetryAfter as e:
+            retry_after = e.retry_after
+            seconds = retry_after.total_seconds() if isinstance(retry_after, timedelta) else float(retry_after)
+            report['rate_limited'] += 1
+            logger.warning(f"Telegram rate limit hit, pausing broadcast for {seconds:g}s")
+            self.bucket.pause(seconds)
+            return 'rate_limited'
+        except (BadRequest, Forbidden) as e:
+            error = e
+        except (TimedOut, NetworkError) as e:
+            logger.debug(f"Transient error sending to {chat_id}: {e}")
+            return 'retry'
+        except Exception as e:
+            error = e
+        
+        if any(reason in str(error).lower() for reason in UNREACHABLE_ERRORS):
+            logger.info(f"Chat {chat_id} is unreachable: {error}")
+            return 'unreachable'
+        logger.error(f"Failed to send message to user {chat_id}: {error}")
+        return 'failed'
\ No newline at end of file
@@ -0,0 +1,185 @@
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from src.utils.atomic_json import write_json
+
+logger = logging.getLogger(__name__)
+
+# Images are hashed on a HASH_SIZE x HASH_SIZE grid (256 bits). A 64-bit hash
+# is too coarse for CAPTCHAs: different codes can land a few bits apart.
+HASH_SIZE = 16
+
+# Set bits per byte value, for Hamming distances over packed hashes
+_POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+
+def image_hash(gray: np.ndarray) -> str:
+    """
+    Perceptual difference hash of a grayscale image.
+    
+    Every bit says whether a cell of the downscaled image is brighter than
+    its left neighbour, so re-encoding or slight recompression of the same
+    CAPTCHA flips only a few bits.
+    
+    Args:
+        gray: Grayscale image as numpy array
+    
+    Returns:
+        Hash as a hex string
+    """
+    small = cv2.resize(gray, (HASH_SIZE + 1, HASH_SIZE), interpolation=cv2.INTER_AREA)
+    return np.packbits(small[:, 1:] > small[:, :-1]).tobytes().hex()
+
+
+class AnswerCache:
+    """
+    Remembers server-confirmed answers of CAPTCHA images by perceptual hash.
+    
+    Only answers the site accepted are stored, so a repeat CAPTCHA is
+    answered without OCR and without the risk of a misread. The cache keeps
+    the most recently used entries up to its size limit and persists them to
+    a JSON file.
+    """
+    
+    def __init__(self, path: Optional[str] = 'captcha_answers.json', max_entries: int = 5000,
+                 max_distance: int = 6):
+        """
+        Args:
+            path: JSON file the entries persist to (None keeps them in memory)
+            max_entries: Entries kept before the least recently used is evicted
+            max_distance: Differing hash bits up to which an image counts as a repeat
+                (0 only matches identical pixels)
+        """
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self.max_distance = max_distance
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, str]' = OrderedDict()
+        # Packed hashes for near-match search with the keys in row order, rebuilt after
+        # inserts and removals; kept apart from the LRU order, which changes on every hit
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys: List[str] = []
+        self.stats = {
+            'lookups': 0,
+            'hits': 0,
+            'stored': 0,
+            'evicted': 0,
+            'discarded': 0,
+        }
+        self._load()
+    
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up the confirmed answer of an image.
+        
+        Args:
+            key: Hash from ``image_hash``
+        
+        Returns:
+            The answer, or None if the image has not been solved before
+        """
+        with self._lock:
+            self.stats['lookups'] += 1
+            match = key if key in self._entries else self._nearest(key)
+            if match is None:
+                return None
+            self._entries.move_to_end(match)
+            self.stats['hits'] += 1
+            return self._entries[match]
+    
+    def put(self, key: str, answer: str):
+        """
+        Store an answer the server accepted.
+        
+        Args:
+            key: Hash from ``image_hash``
+            answer: Accepted CAPTCHA text
+        """
+        with self._lock:
+            if self._entries.get(key) == answer:
+                self._entries.move_to_end(key)
+                return
+            self._entries[key] = answer
+            self._entries.move_to_end(key)
+            self.stats['stored'] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evicted'] += 1
+            self._matrix = None
+            self._save()
+    
+    def discard(self, key: str):
+        """
+        Forget an image whose cached answer the server rejected.
+        
+        Args:
+            key: Hash from ``image_hash``
+        """
+        with self._lock:
+            match = key if key in self._entries else self._nearest(key)
+            if match is None:
+                return
+            del self._entries[match]
+            self.stats['discarded'] += 1
+            self._matrix = None
+            self._save()
+    
+    def get_stats(self) -> Dict:
+        """Get a snapshot of the counters, the number of entries and the hit rate."""
+        with self._lock:
+            stats = dict(self.stats, entries=len(self._entries))
+        stats['hit_rate'] = round(stats['hits'] / stats['lookups'], 3) if stats['lookups'] else 0.0
+        return stats
+    
+    def _nearest(self, key: str) -> Optional[str]:
+        """Closest stored hash within max_distance bits (called with the lock held)."""
+        if not self.max_distance or not self._entries:
+            return None
+        
+        if self._matrix is None:
+            self._matrix_keys = list(self._entries)
+            self._matrix = np.frombuffer(bytes.fromhex(''.join(self._matrix_keys)),
+                                         dtype=np.uint8).reshape(len(self._matrix_keys), -1)
+        probe = np.frombuffer(bytes.fromhex(key), dtype=np.uint8)
+        if probe.shape[0] != self._matrix.shape[1]:
+            return None
+        
+        distances = _POPCOUNT[self._matrix ^ probe].sum(axis=1, dtype=np.int32)
+        index = int(np.argmin(distances))
+        return self._matrix_keys[index] if distances[index] <= self.max_distance else None
+    
+    def _load(self):
+        """Restore entries saved by an earlier run, oldest first."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                saved = json.load(f).get('entries', [])
+            for key, answer in saved:
+                # Hashes of another size cannot be compared with new ones
+                if len(key) == HASH_SIZE * HASH_SIZE // 4 and answer:
+                    self._entries[key] = answer
+        except (OSError, ValueError, AttributeError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable CAPTCHA answer cache: {e}")
+            self._entries.clear()
+            return
+        
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        logger.debug(f"Loaded {len(self._entries)} cached CAPTCHA answers")
+    
+    def _save(self):
+        """Write the entries to disk (called with the lock held)."""
+        if not self.path:
+            return
+        try:
+            write_json(self.path, {'hash_size': HASH_SIZE, 'entries': list(self._entries.items())})
+        except OSError as e:
+            logger.warning(f"Failed to persist CAPTCHA answer cache: {e}")
\ No newline at end of file
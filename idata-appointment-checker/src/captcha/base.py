@@ -0,0 +1,153 @@
+import base64
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import requests
+
+from src.captcha.answer_cache import AnswerCache, image_hash
+from src.captcha.tuning import ParameterTuner
+
+logger = logging.getLogger(__name__)
+
+
+def cached_solution(text: str, image_key: str) -> Dict:
+    """Solver result for an answer taken from the AnswerCache."""
+    return {
+        'text': text,
+        'confidence': 1.0,
+        'length_valid': True,
+        'plausible': True,
+        'candidates': [{'variant': 'cache', 'text': text, 'confidence': 1.0}],
+        'tuning_arm': None,
+        'image_hash': image_key,
+        'cached': True,
+    }
+
+
+class CaptchaSolverBase(ABC):
+    """
+    What CaptchaSolver and CaptchaService share: learning from the site's
+    verdicts (parameter tuning and the answer cache), image download and
+    the convenience entry points built on ``solve_captcha_detailed``.
+    """
+    
+    def __init__(self, captcha_config: Dict):
+        """
+        Args:
+            captcha_config: The 'captcha' section of the configuration
+        """
+        # Learns which fixed-pipeline parameters get codes accepted
+        self.tuner = None
+        if captcha_config.get('tuning', True):
+            self.tuner = ParameterTuner(state_path=captcha_config.get('tuning_file', 'captcha_tuning.json'))
+        
+        # Server-confirmed answers of CAPTCHAs seen before, by perceptual hash
+        self.answer_cache = None
+        if captcha_config.get('answer_cache', True):
+            self.answer_cache = AnswerCache(
+                path=captcha_config.get('answer_cache_file', 'captcha_answers.json'),
+                max_entries=captcha_config.get('answer_cache_size', 5000),
+                max_distance=captcha_config.get('answer_cache_distance', 6)
+            )
+        
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+        })
+    
+    @abstractmethod
+    def solve_captcha_detailed(self, image_data: bytes) -> Optional[Dict]:
+        """Solve a CAPTCHA and describe the answer (see ``CaptchaSolver.solve_captcha_detailed``)."""
+    
+    def solve_captcha(self, image_data: bytes) -> Optional[str]:
+        """
+        Solve the captcha from image bytes.
+        
+        Args:
+            image_data: Raw image bytes
+        
+        Returns:
+            Solved captcha text or None if failed
+        """
+        result = self.solve_captcha_detailed(image_data)
+        return result['text'] if result else None
+    
+    def solve_from_base64(self, base64_string: str) -> Optional[str]:
+        """
+        Solve captcha from base64 encoded image.
+        
+        Args:
+            base64_string: Base64 encoded image string
+        
+        Returns:
+            Solved captcha text or None if failed
+        """
+        try:
+            # Remove data URL prefix if present
+            image_data = base64.b64decode(base64_string[base64_string.find(',') + 1:])
+        except Exception as e:
+            logger.error(f"Failed to decode base64 image: {e}")
+            return None
+        return self.solve_captcha(image_data)
+    
+    def download_captcha_image(self, url: str) -> Optional[bytes]:
+        """
+        Download captcha image from URL.
+        
+        Args:
+            url: URL of the captcha image
+        
+        Returns:
+            Image bytes or None if failed
+        """
+        try:
+            response = self.session.get(url, timeout=10)
+            response.raise_for_status()
+            return response.content
+        except Exception as e:
+            logger.error(f"Failed to download captcha image: {e}")
+            return None
+    
+    def report_outcome(self, solution: Optional[Dict], accepted: bool):
+        """
+        Tell the solver whether the site accepted a code, so parameter tuning
+        and the answer cache can learn from it.
+        
+        Args:
+            solution: Result of ``solve_captcha_detailed`` for the submitted code
+            accepted: Whether the site accepted the code
+        """
+        if self.tuner and solution and solution.get('tuning_arm'):
+            self.tuner.report(solution['tuning_arm'], accepted)
+        if self.answer_cache and solution and solution.get('image_hash'):
+            if accepted:
+                self.answer_cache.put(solution['image_hash'], solution['text'])
+            elif solution.get('cached'):
+                # The image was not the repeat it looked like
+                self.answer_cache.discard(solution['image_hash'])
+    
+    def _cached_answer(self, gray: np.ndarray) -> Tuple[Optional[str], Optional[Dict]]:
+        """
+        Look an image up in the answer cache.
+        
+        Args:
+            gray: Decoded grayscale image
+        
+        Returns:
+            Tuple of (image hash, cached solution). Both are None without an
+            answer cache; the solution is None if the image is not a repeat.
+        """
+        if not self.answer_cache:
+            return None, None
+        image_key = image_hash(gray)
+        answer = self.answer_cache.get(image_key)
+        if not answer:
+            return image_key, None
+        logger.info(f"Captcha answered from cache: {answer}")
+        return image_key, cached_solution(answer, image_key)
+    
+    def close(self):
+        """Release the HTTP session."""
+        self.session.close()
\ No newline at end of file
@@ -0,0 +1,147 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.utils.atomic_json import atomic_open
+
+logger = logging.getLogger(__name__)
+
+LABELS_FILE = 'labels.jsonl'
+IMAGE_SUFFIXES = ('.png', '.jpg', '.jpeg', '.gif', '.bmp')
+
+
+def _image_suffix(image_data: bytes) -> str:
+    """File extension for image bytes, from their magic number."""
+    if image_data.startswith(b'\x89PNG'):
+        return '.png'
+    if image_data.startswith(b'\xff\xd8'):
+        return '.jpg'
+    if image_data.startswith(b'GIF8'):
+        return '.gif'
+    if image_data.startswith(b'BM'):
+        return '.bmp'
+    return '.bin'
+
+
+class CaptchaCorpus:
+    """
+    Collects live CAPTCHAs with the solver's guess and the server's verdict.
+    
+    Images are stored once under their content hash; every submission
+    appends one JSON line to ``labels.jsonl``. An accepted guess is a
+    verified label, a rejected one is at least known to be wrong.
+    """
+    
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: Folder holding the images and labels.jsonl (created if missing)
+        """
+        self.directory = Path(directory)
+        self.labels_path = self.directory / LABELS_FILE
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+    
+    def record(self, image_data: bytes, guess: Optional[str], outcome: str,
+               solve_seconds: Optional[float] = None, confidence: Optional[float] = None,
+               source: str = '') -> Optional[str]:
+        """
+        Store one CAPTCHA and how the server answered the guess.
+        
+        Args:
+            image_data: Raw image bytes as served by the site
+            guess: Text the solver read (None or '' if it read nothing)
+            outcome: Attempt outcome (see src.scraper.captcha_retry)
+            solve_seconds: Time the solver took
+            confidence: Solver confidence, if it reported one
+            source: Which flow captured the image, e.g. 'selenium' or 'http'
+        
+        Returns:
+            Stored image file name, or None if writing failed
+        """
+        name = hashlib.sha1(image_data).hexdigest()[:16] + _image_suffix(image_data)
+        entry = {
+            'image': name,
+            'guess': guess or '',
+            'outcome': outcome,
+            'solve_ms': round(solve_seconds * 1000, 1) if solve_seconds is not None else None,
+            'confidence': confidence,
+            'source': source,
+            'captured_at': time.time(),
+        }
+        
+        with self._lock:
+            try:
+                image_path = self.directory / name
+                if not image_path.exists():
+                    with atomic_open(str(image_path), 'wb') as f:
+                        f.write(image_data)
+                with open(self.labels_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            except OSError as e:
+                logger.warning(f"Failed to capture CAPTCHA: {e}")
+                return None
+        
+        logger.debug(f"Captured CAPTCHA {name} ({outcome})")
+        return name
+
+
+def load_samples(directory: str) -> List[Dict]:
+    """
+    Read a CAPTCHA corpus for replay.
+    
+    Directories with a labels.jsonl are read as captured by CaptchaCorpus;
+    an entry's answer is its hand-written 'answer' field, else its guess if
+    the server accepted it. Directories without one are read as images named
+    after their answer (e.g. ``K7MPR2.png`` or ``K7MPR2_3.png``).
+    
+    Args:
+        directory: Corpus folder
+    
+    Returns:
+        List of samples with 'name', 'image' bytes, 'answer' (None if unknown)
+        and 'rejected' (guesses the server refused)
+    """
+    root = Path(directory)
+    labels_path = root / LABELS_FILE
+    
+    if not labels_path.exists():
+        return [
+            {
+                'name': path.name,
+                'image': path.read_bytes(),
+                'answer': path.stem.split('_')[0].upper(),
+                'rejected': [],
+            }
+            for path in sorted(root.iterdir())
+            if path.suffix.lower() in IMAGE_SUFFIXES
+        ]
+    
+    # An image can appear in several lines (e.g. re-captured); merge them
+    samples: Dict[str, Dict] = {}
+    with open(labels_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            name = entry.get('image')
+            if not name or not (root / name).exists():
+                continue
+            
+            sample = samples.setdefault(name, {'name': name, 'answer': None, 'rejected': []})
+            guess = (entry.get('guess') or '').upper()
+            if entry.get('answer'):
+                sample['answer'] = entry['answer'].upper()
+            elif entry.get('outcome') == 'accepted' and guess and not sample['answer']:
+                sample['answer'] = guess
+            elif entry.get('outcome') == 'rejected' and guess and guess not in sample['rejected']:
+                sample['rejected'].append(guess)
+    
+    for name, sample in samples.items():
+        sample['image'] = (root / name).read_bytes()
+    return list(samples.values())
\ No newline at end of file
@@ -0,0 +1,307 @@
+"""
+Segment-and-classify CAPTCHA recognizer that needs only OpenCV and NumPy.
+
+The IDATA CAPTCHA is a short code of dark characters on a light, lightly
+noised background. Characters are cut out with connected components (wide
+blobs are split at their thinnest column), each glyph is reduced to a small
+normalized bitmap, and all glyphs of an image are matched at once against a
+feature matrix of labelled glyphs built from a CAPTCHA corpus.
+
+Train a model from a captured corpus:
+    python -m src.captcha.glyph_recognizer --corpus captcha_corpus --output glyph_model.npz
+"""
+
+import argparse
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Glyphs are scaled into a GLYPH_SIZE x GLYPH_SIZE bitmap before matching
+GLYPH_SIZE = 16
+# Blobs smaller than this many pixels are noise
+MIN_COMPONENT_AREA = 20
+
+
+def binarize(gray: np.ndarray) -> np.ndarray:
+    """
+    Separate character ink from background and noise lines.
+    
+    Args:
+        gray: Grayscale image as numpy array
+    
+    Returns:
+        uint8 mask with 1 for ink
+    """
+    _, ink = cv2.threshold(gray, 0, 1, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    # One-pixel noise lines do not survive an opening; character strokes do
+    return cv2.morphologyEx(ink, cv2.MORPH_OPEN, np.ones((2, 2), np.uint8))
+
+
+def segment(ink: np.ndarray, expected_length: Optional[int] = None) -> List[Tuple[int, int, int, int]]:
+    """
+    Find character bounding boxes, left to right.
+    
+    Args:
+        ink: Mask from ``binarize``
+        expected_length: Known code length; blobs are split or dropped to match it
+    
+    Returns:
+        List of (x, y, width, height) boxes
+    """
+    count, _, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+    boxes = [
+        [int(x), int(y), int(x + w), int(y + h), int(area)]
+        for x, y, w, h, area in stats[1:count]
+        if area >= MIN_COMPONENT_AREA
+    ]
+    boxes.sort()
+    
+    # Blobs that share most of their columns belong to one character (e.g. the dot of an i)
+    merged: List[List[int]] = []
+    for box in boxes:
+        if merged:
+            last = merged[-1]
+            overlap = min(last[2], box[2]) - max(last[0], box[0])
+            if overlap > 0.5 * min(last[2] - last[0], box[2] - box[0]):
+                merged[-1] = [min(last[0], box[0]), min(last[1], box[1]),
+                              max(last[2], box[2]), max(last[3], box[3]), last[4] + box[4]]
+                continue
+        merged.append(box)
+    
+    if expected_length:
+        # Touching characters form one wide blob: cut the widest at its thinnest column
+        while 0 < len(merged) < expected_length:
+            index = max(range(len(merged)), key=lambda i: merged[i][2] - merged[i][0])
+            x0, y0, x1, y1, area = merged[index]
+            if x1 - x0 < 6:
+                break
+            columns = ink[y0:y1, x0:x1].sum(axis=0)
+            margin = (x1 - x0) // 4
+            cut = x0 + margin + int(np.argmin(columns[margin:len(columns) - margin]))
+            merged[index:index + 1] = [[x0, y0, cut, y1, area // 2], [cut, y0, x1, y1, area - area // 2]]
+        
+        # Leftover noise: drop the smallest blobs
+        while len(merged) > expected_length:
+            merged.remove(min(merged, key=lambda box: box[4]))
+    
+    return [(x0, y0, x1 - x0, y1 - y0) for x0, y0, x1, y1, _ in merged]
+
+
+def glyph_features(ink: np.ndarray, boxes: List[Tuple[int, int, int, int]]) -> np.ndarray:
+    """
+    Turn each character box into a unit-length feature vector.
+    
+    Args:
+        ink: Mask from ``binarize``
+        boxes: Character boxes from ``segment``
+    
+    Returns:
+        float32 matrix with one GLYPH_SIZE * GLYPH_SIZE row per box
+    """
+    features = np.zeros((len(boxes), GLYPH_SIZE * GLYPH_SIZE), dtype=np.float32)
+    for row, (x, y, w, h) in enumerate(boxes):
+        glyph = ink[y:y + h, x:x + w]
+        # Pad to a square so narrow characters (I, 1) keep their shape
+        side = max(w, h)
+        square = np.zeros((side, side), dtype=np.float32)
+        square[(side - h) // 2:(side - h) // 2 + h, (side - w) // 2:(side - w) // 2 + w] = glyph
+        features[row] = cv2.resize(square, (GLYPH_SIZE, GLYPH_SIZE), interpolation=cv2.INTER_AREA).ravel()
+    
+    norms = np.linalg.norm(features, axis=1, keepdims=True)
+    features /= np.maximum(norms, 1e-6)
+    return features
+
+
+class GlyphModel:
+    """Labelled glyph feature matrix, grouped by character for per-class scoring."""
+    
+    def __init__(self, features: np.ndarray, labels: np.ndarray):
+        """
+        Args:
+            features: float32 matrix of unit-length glyph features, one row per glyph
+            labels: Character of each row
+        """
+        order = np.argsort(labels, kind='stable')
+        self.features = np.ascontiguousarray(features[order], dtype=np.float32)
+        self.labels = labels[order]
+        self.classes, self._class_starts = np.unique(self.labels, return_index=True)
+    
+    def classify(self, features: np.ndarray) -> Tuple[List[str], np.ndarray]:
+        """
+        Match glyphs against every labelled glyph in one matrix product.
+        
+        Args:
+            features: Glyph features from ``glyph_features``
+        
+        Returns:
+            Tuple of (characters, confidences 0-100). Confidence is how much of
+            the distance to a perfect match the winning class closes beyond
+            the runner-up class.
+        """
+        similarities = features @ self.features.T
+        class_scores = np.maximum.reduceat(similarities, self._class_starts, axis=1)
+        
+        best = np.argmax(class_scores, axis=1)
+        rows = np.arange(len(features))
+        best_score = class_scores[rows, best]
+        if class_scores.shape[1] > 1:
+            class_scores[rows, best] = -1
+            rival = class_scores.max(axis=1)
+        else:
+            rival = np.zeros_like(best_score)
+        
+        confidence = np.clip((best_score - rival) / np.maximum(1 - rival, 1e-6), 0, 1) * 100
+        return [str(char) for char in self.classes[best]], confidence
+    
+    def save(self, path: str):
+        """Write the model as a compressed .npz file."""
+        np.savez_compressed(path, features=self.features, labels=self.labels, glyph_size=GLYPH_SIZE)
+    
+    @classmethod
+    def load(cls, path: str) -> 'GlyphModel':
+        """
+        Read a model written by ``save``.
+        
+        Raises:
+            OSError: If the file cannot be read
+            ValueError: If it was built for another glyph size
+        """
+        with np.load(path, allow_pickle=False) as data:
+            if int(data['glyph_size']) != GLYPH_SIZE:
+                raise ValueError(f"Glyph model {path} uses {int(data['glyph_size'])}px glyphs, expected {GLYPH_SIZE}")
+            return cls(data['features'], data['labels'])
+
+
+class GlyphRecognizer:
+    """Reads a CAPTCHA by segmenting it and classifying each glyph with a GlyphModel."""
+    
+    def __init__(self, model: GlyphModel, expected_length: Optional[int] = None):
+        """
+        Args:
+            model: Trained glyph model
+            expected_length: Known code length, used to split or drop blobs
+        """
+        self.model = model
+        self.expected_length = expected_length
+    
+    @classmethod
+    def load(cls, path: str, expected_length: Optional[int] = None) -> 'GlyphRecognizer':
+        """Create a recognizer from a saved model file."""
+        return cls(GlyphModel.load(path), expected_length=expected_length)
+    
+    def recognize(self, gray: np.ndarray) -> List[Tuple[str, float]]:
+        """
+        Read the characters of a grayscale CAPTCHA.
+        
+        Args:
+            gray: Grayscale image as numpy array (not thresholded)
+        
+        Returns:
+            List of (character, confidence 0-100) in reading order
+        """
+        ink = binarize(gray)
+        boxes = segment(ink, self.expected_length)
+        if not boxes:
+            return []
+        chars, confidences = self.model.classify(glyph_features(ink, boxes))
+        return list(zip(chars, confidences.tolist()))
+
+
+def train(samples: List[Dict], expected_length: Optional[int] = None, prototypes_per_class: int = 8) -> GlyphModel:
+    """
+    Build a glyph model from labelled CAPTCHAs.
+    
+    Images whose segmentation does not yield one box per answer character
+    are skipped, so a mislabelled box never enters the model. Each
+    character's glyphs are then condensed to a few k-means prototypes, which
+    keeps the feature matrix small enough for sub-millisecond matching.
+    
+    Args:
+        samples: Samples as returned by ``src.captcha.corpus.load_samples``
+        expected_length: Known code length (defaults to each answer's length)
+        prototypes_per_class: Feature rows kept per character
+    
+    Returns:
+        Trained model
+    
+    Raises:
+        ValueError: If no sample could be segmented
+    """
+    glyphs: Dict[str, List[np.ndarray]] = {}
+    skipped = 0
+    
+    for sample in samples:
+        answer = sample.get('answer')
+        if not answer:
+            continue
+        gray = cv2.imdecode(np.frombuffer(sample['image'], dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            skipped += 1
+            continue
+        ink = binarize(gray)
+        boxes = segment(ink, expected_length or len(answer))
+        if len(boxes) != len(answer):
+            skipped += 1
+            continue
+        
+        for char, row in zip(answer, glyph_features(ink, boxes)):
+            glyphs.setdefault(char, []).append(row)
+    
+    if not glyphs:
+        raise ValueError("No labelled CAPTCHA could be segmented")
+    
+    features = []
+    labels: List[str] = []
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 20, 1e-3)
+    for char, rows in sorted(glyphs.items()):
+        matrix = np.stack(rows)
+        if len(rows) > prototypes_per_class:
+            _, _, matrix = cv2.kmeans(matrix, prototypes_per_class, None, criteria, 3, cv2.KMEANS_PP_CENTERS)
+            matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-6)
+        features.append(matrix)
+        labels.extend(char * len(matrix))
+    
+    logger.info(f"Trained glyph model on {sum(len(rows) for rows in glyphs.values())} glyphs of "
+                f"{len(glyphs)} characters ({skipped} images skipped)")
+    return GlyphModel(np.concatenate(features), np.array(labels))
+
+
+def main():
+    """Train a glyph model from the command line."""
+    parser = argparse.ArgumentParser(description="Train the NumPy glyph recognizer for CAPTCHAs")
+    parser.add_argument('--corpus', help="Captured corpus, or a directory of images named after their answer")
+    parser.add_argument('--generate', type=int, default=0,
+                        help="Train on this many CAPTCHAs from the local stand-in renderer instead")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--length', type=int, default=6, help="CAPTCHA length (0 to take it from each answer)")
+    parser.add_argument('--prototypes', type=int, default=8, help="Feature rows kept per character")
+    parser.add_argument('--output', default='glyph_model.npz')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    
+    if args.corpus:
+        from src.captcha.corpus import load_samples
+        samples = load_samples(args.corpus)
+    elif args.generate:
+        import random
+        from src.devtools.fake_idata import CAPTCHA_ALPHABET, CAPTCHA_LENGTH, render_captcha
+        rng = random.Random(args.seed)
+        samples = []
+        for _ in range(args.generate):
+            answer = ''.join(rng.choice(CAPTCHA_ALPHABET) for _ in range(CAPTCHA_LENGTH))
+            samples.append({'image': render_captcha(answer), 'answer': answer})
+    else:
+        parser.error("Pass --corpus or --generate")
+    
+    model = train(samples, expected_length=args.length or None, prototypes_per_class=args.prototypes)
+    model.save(args.output)
+    print(f"Saved {len(model.labels)} glyphs of {len(model.classes)} characters to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
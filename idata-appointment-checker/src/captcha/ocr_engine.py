@@ -0,0 +1,153 @@
+import logging
+import threading
+from typing import List, Tuple
+
+import numpy as np
+import pytesseract
+from PIL import Image
+
+try:
+    import tesserocr
+except ImportError:  # optional: needs libtesseract at build time
+    tesserocr = None
+
+logger = logging.getLogger(__name__)
+
+ALPHANUMERIC = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+
+# Tesseract page segmentation mode 8: treat the image as a single word
+PSM_SINGLE_WORD = 8
+
+
+class OcrEngine:
+    """Recognizes the text of a preprocessed CAPTCHA image."""
+    
+    name = 'base'
+    
+    def recognize(self, image: np.ndarray) -> List[Tuple[str, float]]:
+        """
+        Run OCR on an image and report how sure the engine is of each character.
+        
+        Args:
+            image: Grayscale or binary image as numpy array
+        
+        Returns:
+            List of (character, confidence 0-100) in reading order
+        """
+        raise NotImplementedError
+    
+    def close(self):
+        """Release engine resources."""
+
+
+class PytesseractEngine(OcrEngine):
+    """Runs the tesseract executable for every image (temp file plus subprocess)."""
+    
+    name = 'pytesseract'
+    
+    def __init__(self, psm: int = PSM_SINGLE_WORD, whitelist: str = ALPHANUMERIC):
+        """
+        Args:
+            psm: Tesseract page segmentation mode
+            whitelist: Characters tesseract may output
+        """
+        self.config = f'--oem 3 --psm {psm} -c tessedit_char_whitelist={whitelist}'
+    
+    def recognize(self, image: np.ndarray) -> List[Tuple[str, float]]:
+        # image_to_data only scores whole words; every character gets its word's score
+        data = pytesseract.image_to_data(image, config=self.config, output_type=pytesseract.Output.DICT)
+        symbols = []
+        for word, confidence in zip(data['text'], data['conf']):
+            if float(confidence) < 0 or not word.strip():
+                continue
+            symbols.extend((char, float(confidence)) for char in word.strip())
+        return symbols
+
+
+class TesserocrEngine(OcrEngine):
+    """Keeps tesseract loaded in-process; each thread gets its own initialized API."""
+    
+    name = 'tesserocr'
+    
+    def __init__(self, psm: int = PSM_SINGLE_WORD, whitelist: str = ALPHANUMERIC, lang: str = 'eng'):
+        """
+        Args:
+            psm: Tesseract page segmentation mode
+            whitelist: Characters tesseract may output
+            lang: Tesseract language model to load
+        
+        Raises:
+            RuntimeError: If tesserocr is not installed or cannot load the model
+        """
+        if tesserocr is None:
+            raise RuntimeError("tesserocr is not installed")
+        
+        self.psm = psm
+        self.whitelist = whitelist
+        self.lang = lang
+        self._local = threading.local()
+        self._apis: List = []
+        self._lock = threading.Lock()
+        
+        # Load the model once up front so a broken installation fails here, not mid-check
+        self._api()
+    
+    def _api(self):
+        """The calling thread's API instance; the model is loaded on first use only."""
+        api = getattr(self._local, 'api', None)
+        if api is None:
+            api = tesserocr.PyTessBaseAPI(lang=self.lang, psm=self.psm, oem=tesserocr.OEM.DEFAULT)
+            api.SetVariable('tessedit_char_whitelist', self.whitelist)
+            self._local.api = api
+            with self._lock:
+                self._apis.append(api)
+        return api
+    
+    def recognize(self, image: np.ndarray) -> List[Tuple[str, float]]:
+        api = self._api()
+        api.SetImage(Image.fromarray(image))
+        api.Recognize()
+        iterator = api.GetIterator()
+        if iterator is None:
+            return []
+        
+        level = tesserocr.RIL.SYMBOL
+        symbols = []
+        for symbol in tesserocr.iterate_level(iterator, level):
+            text = symbol.GetUTF8Text(level)
+            if text:
+                symbols.append((text, symbol.Confidence(level)))
+        return symbols
+    
+    def close(self):
+        with self._lock:
+            apis, self._apis = self._apis, []
+        for api in apis:
+            api.End()
+
+
+def create_ocr_engine(backend: str = 'auto', psm: int = PSM_SINGLE_WORD,
+                      whitelist: str = ALPHANUMERIC) -> OcrEngine:
+    """
+    Create an OCR engine.
+    
+    Args:
+        backend: 'tesserocr', 'pytesseract' or 'auto' (tesserocr when available)
+        psm: Tesseract page segmentation mode
+        whitelist: Characters tesseract may output
+    
+    Returns:
+        OCR engine instance
+    """
+    if backend in ('auto', 'tesserocr'):
+        try:
+            engine = TesserocrEngine(psm=psm, whitelist=whitelist)
+            logger.info("Using in-process tesserocr OCR engine")
+            return engine
+        except Exception as e:
+            if backend == 'tesserocr':
+                logger.warning(f"tesserocr unavailable, falling back to pytesseract: {e}")
+            else:
+                logger.debug(f"tesserocr unavailable: {e}")
+    
+    return PytesseractEngine(psm=psm, whitelist=whitelist)
\ No newline at end of file
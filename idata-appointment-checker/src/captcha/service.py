@@ -0,0 +1,172 @@
+import logging
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from src.captcha.base import CaptchaSolverBase
+from src.captcha.solver import CaptchaSolver, decode_image
+
+logger = logging.getLogger(__name__)
+
+# Solver of the current worker process, created by _init_worker
+_worker_solver = None
+
+
+def _init_worker(config: Dict):
+    """Load a CaptchaSolver (and its OCR models) once per worker process."""
+    global _worker_solver
+    
+    # Tuning statistics and the answer cache are kept by the service in the parent process
+    captcha_config = dict(config.get('captcha', {}), tuning=False, answer_cache=False)
+    _worker_solver = CaptchaSolver(dict(config, captcha=captcha_config))
+
+
+def _solve_in_worker(image_data: bytes,
+                     tuning: Optional[Tuple[str, Dict[str, int]]]) -> Tuple[Optional[Dict], float, float]:
+    """
+    Solve one CAPTCHA in a worker process.
+    
+    Returns:
+        Tuple of (solver result, wall-clock start, wall-clock end)
+    """
+    started = time.time()
+    result = _worker_solver.solve_captcha_detailed(image_data, tuning=tuning)
+    return result, started, time.time()
+
+
+def _ping() -> bool:
+    """No-op task that makes the pool start its worker processes."""
+    return True
+
+
+class CaptchaService(CaptchaSolverBase):
+    """
+    Solves CAPTCHAs in a pool of worker processes so OCR does not compete for the scraper's GIL.
+    
+    Any number of scraper threads can call it at once: requests wait in the
+    pool's queue and each caller blocks only on its own answer. It offers the
+    CaptchaSolver methods the scrapers use, so it can stand in for one.
+    """
+    
+    def __init__(self, config: Optional[Dict] = None, workers: int = 2, metrics_window: int = 500):
+        """
+        Args:
+            config: Application configuration (the 'captcha' section configures the workers)
+            workers: Number of solver processes
+            metrics_window: Number of recent solves latency percentiles are computed over
+        """
+        config = config or {}
+        # Tuning statistics and the answer cache live here; repeat CAPTCHAs never reach a worker
+        super().__init__(config.get('captcha', {}))
+        self.workers = max(1, workers)
+        
+        # Spawned workers do not inherit the scraper's threads and browser handles
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(config,)
+        )
+        
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._latencies = deque(maxlen=metrics_window)
+        self._queue_waits = deque(maxlen=metrics_window)
+        self._solve_times = deque(maxlen=metrics_window)
+        self.stats = {
+            'submitted': 0,
+            'solved': 0,
+            'failed': 0,
+            'max_queue_depth': 0,
+        }
+        
+        # Start the workers now so the first CAPTCHA does not wait for model loading
+        for _ in range(self.workers):
+            self._executor.submit(_ping)
+        logger.info(f"Started CAPTCHA service with {self.workers} worker processes")
+    
+    def solve_captcha_detailed(self, image_data: bytes, timeout: Optional[float] = 60) -> Optional[Dict]:
+        """
+        Queue a CAPTCHA for the worker processes and wait for the answer.
+        
+        Args:
+            image_data: Raw image bytes
+            timeout: Seconds to wait for a worker (None waits forever)
+        
+        Returns:
+            Same dictionary as ``CaptchaSolver.solve_captcha_detailed``, or None if failed
+        """
+        image_key = None
+        if self.answer_cache:
+            try:
+                image_key, cached = self._cached_answer(decode_image(image_data))
+            except ValueError as e:
+                logger.error(f"CAPTCHA service failed to decode image: {e}")
+                return None
+            if cached:
+                return cached
+        
+        tuning = self.tuner.choose() if self.tuner else None
+        
+        with self._lock:
+            self._in_flight += 1
+            self.stats['submitted'] += 1
+            self.stats['max_queue_depth'] = max(self.stats['max_queue_depth'], self._queue_depth())
+        
+        submitted = time.time()
+        result = None
+        try:
+            result, started, finished = self._executor.submit(_solve_in_worker, image_data, tuning).result(timeout)
+        except Exception as e:
+            logger.error(f"CAPTCHA service failed to solve: {e}")
+        else:
+            with self._lock:
+                self._latencies.append(finished - submitted)
+                self._queue_waits.append(max(0.0, started - submitted))
+                self._solve_times.append(finished - started)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self.stats['solved' if result and result['text'] else 'failed'] += 1
+        
+        if result:
+            result['image_hash'] = image_key
+        return result
+    
+    def get_metrics(self) -> Dict:
+        """
+        Get queue and latency metrics.
+        
+        Returns:
+            Dictionary with the current 'queue_depth' (requests waiting for a
+            free worker), 'in_flight' requests, counters, and p50/p95 of total
+            latency, queue wait and solve time in milliseconds over the recent
+            window
+        """
+        with self._lock:
+            metrics = dict(self.stats, queue_depth=self._queue_depth(), in_flight=self._in_flight,
+                           workers=self.workers)
+            series = {
+                'latency': list(self._latencies),
+                'queue_wait': list(self._queue_waits),
+                'solve': list(self._solve_times),
+            }
+        
+        for name, values in series.items():
+            ordered = sorted(values)
+            for label, fraction in (('p50', 0.5), ('p95', 0.95)):
+                value = ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))] if ordered else 0.0
+                metrics[f'{name}_{label}_ms'] = round(value * 1000, 1)
+        return metrics
+    
+    def _queue_depth(self) -> int:
+        """Requests waiting for a worker (called with the lock held)."""
+        return max(0, self._in_flight - self.workers)
+    
+    def close(self):
+        """Stop the worker processes and release the HTTP session."""
+        self._executor.shutdown(wait=True)
+        super().close()
\ No newline at end of file
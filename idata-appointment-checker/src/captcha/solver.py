@@ -1,160 +1,369 @@
-import base64
-import io
 import logging
 import re
-from typing import Optional, Tuple
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
 import cv2
 import numpy as np
-import pytesseract
-import requests
-from PIL import Image
+
+from src.captcha.base import CaptchaSolverBase
+from src.captcha.glyph_recognizer import GlyphRecognizer
+from src.captcha.ocr_engine import create_ocr_engine
+from src.captcha.tuning import DEFAULT_ARMS
 
 logger = logging.getLogger(__name__)
 
 
-class CaptchaSolver:
+def decode_image(image_data: bytes) -> np.ndarray:
+    """
+    Decode image bytes into a grayscale array without intermediate copies.
+    
+    Args:
+        image_data: Raw image bytes (PNG, JPEG, GIF, ...)
+        
+    Returns:
+        Grayscale image as numpy array
+        
+    Raises:
+        ValueError: If the bytes are not a readable image
+    """
+    # np.frombuffer wraps the bytes; OpenCV decodes palette and RGB images to gray itself
+    encoded = np.frombuffer(memoryview(image_data), dtype=np.uint8)
+    
+    # PNG color types 4 and 6 carry alpha: composite onto white so transparent
+    # background does not decode as black
+    if image_data[:4] == b'\x89PNG' and len(image_data) > 25 and image_data[25] in (4, 6):
+        image = cv2.imdecode(encoded, cv2.IMREAD_UNCHANGED)
+        if image is not None and image.ndim == 3 and image.shape[2] == 4:
+            alpha = image[:, :, 3].astype(np.float32) / 255
+            gray = cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY).astype(np.float32)
+            return (gray * alpha + 255 * (1 - alpha)).astype(np.uint8)
+    
+    gray = cv2.imdecode(encoded, cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        raise ValueError("Unreadable captcha image")
+    return gray
+
+
+class CaptchaSolver(CaptchaSolverBase):
     """Solves image-based captchas from IDATA website."""
     
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        })
+    # Preprocessing recipes OCR'd side by side in ensemble mode
+    ENSEMBLE_VARIANTS = ('fixed', 'otsu', 'adaptive', 'otsu_large', 'otsu_morph')
+    # Threshold, median blur kernel (0 = none) and upscale factor of the fixed pipeline
+    DEFAULT_PARAMS = DEFAULT_ARMS[0]
     
-    def solve_captcha(self, image_data: bytes) -> Optional[str]:
+    def __init__(self, config: Optional[Dict] = None):
+        captcha_config = (config or {}).get('captcha', {})
+        super().__init__(captcha_config)
+        # Created once and reused for every solve
+        self.ocr_engine = create_ocr_engine(captcha_config.get('ocr_engine', 'auto'))
+        self.ensemble = captcha_config.get('ensemble', True)
+        self._executor = None
+        if self.ensemble:
+            self._executor = ThreadPoolExecutor(
+                max_workers=captcha_config.get('ensemble_workers', len(self.ENSEMBLE_VARIANTS)),
+                thread_name_prefix='captcha-ocr'
+            )
+        # Per-thread scratch arrays reused by every solve on that thread
+        self._buffers = threading.local()
+        
+        # Readings of the wrong length or below this confidence are flagged as not worth submitting
+        self.expected_length = captcha_config.get('length') or None
+        self.min_confidence = captcha_config.get('min_confidence', 0.0)
+        
+        # "glyph" reads CAPTCHAs with a trained NumPy model; tesseract remains the fallback
+        self.backend = captcha_config.get('backend', 'tesseract')
+        self.glyph_recognizer = None
+        if self.backend == 'glyph':
+            model_path = captcha_config.get('glyph_model', 'glyph_model.npz')
+            try:
+                self.glyph_recognizer = GlyphRecognizer.load(
+                    model_path, expected_length=self.expected_length
+                )
+                logger.info(f"Using glyph recognizer model {model_path}")
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Glyph model unavailable, using tesseract: {e}")
+    
+    def solve_captcha_detailed(self, image_data: bytes,
+                               tuning: Optional[Tuple[str, Dict[str, int]]] = None) -> Optional[Dict]:
         """
-        Solve the captcha from image bytes.
+        Solve the captcha from image bytes and report how sure the solver is.
+        
+        An image whose answer the server accepted before is answered from
+        the answer cache without OCR. With the glyph backend the trained
+        recognizer reads the image and
+        tesseract is only used when it finds no characters. In ensemble mode
+        several preprocessing variants are OCR'd in parallel and the answer is
+        a confidence-weighted vote over their readings.
         
         Args:
             image_data: Raw image bytes
+            tuning: (arm id, parameters) picked by an outside tuner, used
+                instead of this solver's own (e.g. by CaptchaService workers)
             
         Returns:
-            Solved captcha text or None if failed
+            Dictionary with the solved 'text', its 'confidence' (0-1),
+            'length_valid' (the text has the configured CAPTCHA length),
+            'plausible' (length valid and confidence at least min_confidence),
+            the per-variant 'candidates', the 'tuning_arm' to credit with the
+            outcome (None unless the answer is the tuned variant's reading), the image's
+            perceptual 'image_hash' and whether it was 'cached' (pass the
+            dictionary to ``report_outcome`` once the site answered), or None
+            if failed
         """
         try:
-            # Convert bytes to PIL Image
-            image = Image.open(io.BytesIO(image_data))
+            # Decode straight to a single-channel array
+            gray = decode_image(image_data)
             
-            # Preprocess image for better OCR
-            processed_image = self._preprocess_image(image)
+            image_key, cached = self._cached_answer(gray)
+            if cached:
+                return cached
             
-            # Extract text using OCR
-            text = self._extract_text(processed_image)
+            candidates = []
+            tuning_arm = None
+            if self.glyph_recognizer:
+                candidates = [self._candidate('glyph', self.glyph_recognizer.recognize(gray))]
             
-            # Clean extracted text
-            cleaned_text = self._clean_text(text)
+            if not candidates or not candidates[0]['text']:
+                params = None
+                if tuning:
+                    tuning_arm, params = tuning
+                elif self.tuner:
+                    tuning_arm, params = self.tuner.choose()
+                
+                # Preprocess image for better OCR
+                if self.ensemble:
+                    variants = self._preprocess_variants(gray, params)
+                else:
+                    variants = {'fixed': self._preprocess_image(gray, params)}
+                
+                # Extract text using OCR
+                if self._executor and len(variants) > 1:
+                    candidates = list(self._executor.map(lambda item: self._recognize(*item), variants.items()))
+                else:
+                    candidates = [self._recognize(name, processed) for name, processed in variants.items()]
             
-            logger.info(f"Captcha solved: {cleaned_text}")
-            return cleaned_text
+            text, confidence = self._vote(candidates)
+            if tuning_arm and not any(c['variant'] == 'fixed' and c['text'] == text for c in candidates):
+                # In ensemble mode the tuned variant is one voter of several; the site's verdict
+                # only says something about its parameters when the answer was its own reading
+                tuning_arm = None
+            length_valid = self.expected_length is None or len(text) == self.expected_length
+            logger.info(f"Captcha solved: {text} (confidence {confidence:.2f} over {len(candidates)} variants)")
+            return {
+                'text': text,
+                'confidence': confidence,
+                'length_valid': length_valid,
+                'plausible': bool(text) and length_valid and confidence >= self.min_confidence,
+                'candidates': [
+                    {'variant': c['variant'], 'text': c['text'], 'confidence': round(c['weight'], 3)}
+                    for c in candidates
+                ],
+                'tuning_arm': tuning_arm,
+                'image_hash': image_key,
+                'cached': False,
+            }
             
         except Exception as e:
             logger.error(f"Failed to solve captcha: {e}")
             return None
     
-    def _preprocess_image(self, image: Image.Image) -> np.ndarray:
+    def _buffer(self, name: str, shape: Tuple[int, ...]) -> np.ndarray:
+        """
+        Scratch array for one preprocessing step, reused while the image size stays the same.
+        
+        Args:
+            name: Preprocessing step the array belongs to
+            shape: Required array shape
+            
+        Returns:
+            Uninitialized uint8 array owned by the calling thread
+        """
+        buffers = getattr(self._buffers, 'arrays', None)
+        if buffers is None:
+            buffers = self._buffers.arrays = {}
+        buffer = buffers.get(name)
+        if buffer is None or buffer.shape != shape:
+            buffer = buffers[name] = np.empty(shape, dtype=np.uint8)
+        return buffer
+    
+    def _scaled(self, name: str, gray: np.ndarray, factor: int) -> np.ndarray:
+        """Upscale an image into the named buffer."""
+        height, width = gray.shape
+        scaled = self._buffer(name, (height * factor, width * factor))
+        return cv2.resize(gray, (width * factor, height * factor), dst=scaled, interpolation=cv2.INTER_CUBIC)
+    
+    def _preprocess_image(self, gray: np.ndarray, params: Optional[Dict[str, int]] = None) -> np.ndarray:
         """
         Preprocess image for better OCR results.
         
         Args:
-            image: PIL Image object
+            gray: Grayscale image as numpy array
+            params: 'threshold', 'blur' and 'scale' to use (defaults to DEFAULT_PARAMS)
             
         Returns:
             Preprocessed image as numpy array
         """
-        # Convert to OpenCV format
-        img = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-        
-        # Convert to grayscale
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        params = params or self.DEFAULT_PARAMS
         
         # Apply threshold to get binary image
-        _, thresh = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY)
+        thresh = self._buffer('fixed_thresh', gray.shape)
+        cv2.threshold(gray, params['threshold'], 255, cv2.THRESH_BINARY, dst=thresh)
         
         # Denoise
-        denoised = cv2.medianBlur(thresh, 3)
+        denoised = thresh
+        if params['blur']:
+            denoised = self._buffer('fixed_denoised', gray.shape)
+            cv2.medianBlur(thresh, params['blur'], dst=denoised)
         
         # Resize for better OCR
-        scale_percent = 200
-        width = int(denoised.shape[1] * scale_percent / 100)
-        height = int(denoised.shape[0] * scale_percent / 100)
-        resized = cv2.resize(denoised, (width, height), interpolation=cv2.INTER_CUBIC)
-        
-        return resized
+        return self._scaled('fixed', denoised, params['scale'])
+    
+    def _otsu(self, name: str, gray: np.ndarray) -> np.ndarray:
+        """Blur and binarize with Otsu's threshold into the named buffer."""
+        binary = self._buffer(name, gray.shape)
+        cv2.GaussianBlur(gray, (3, 3), 0, dst=binary)
+        cv2.threshold(binary, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=binary)
+        return binary
     
-    def _extract_text(self, image: np.ndarray) -> str:
+    def _preprocess_variants(self, gray: np.ndarray, params: Optional[Dict[str, int]] = None) -> Dict[str, np.ndarray]:
         """
-        Extract text from preprocessed image using OCR.
+        Build the ensemble's preprocessing variants of an image.
         
         Args:
-            image: Preprocessed image as numpy array
+            gray: Grayscale image as numpy array
+            params: Parameters of the 'fixed' variant (see ``_preprocess_image``)
             
         Returns:
-            Extracted text
+            Dictionary mapping variant name to preprocessed image
         """
-        # Configure Tesseract for alphanumeric characters
-        custom_config = r'--oem 3 --psm 8 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+        gray_2x = self._scaled('gray_2x', gray, 2)
+        otsu_2x = self._otsu('otsu', gray_2x)
+        
+        # Opening removes thin noise lines, closing repairs broken strokes
+        kernel = np.ones((2, 2), np.uint8)
+        morph = self._buffer('otsu_morph', otsu_2x.shape)
+        cv2.morphologyEx(otsu_2x, cv2.MORPH_OPEN, kernel, dst=morph)
+        cv2.morphologyEx(morph, cv2.MORPH_CLOSE, kernel, dst=morph)
         
-        # Perform OCR
-        text = pytesseract.image_to_string(image, config=custom_config)
+        adaptive = self._buffer('adaptive_thresh', gray_2x.shape)
+        cv2.adaptiveThreshold(gray_2x, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 10, dst=adaptive)
         
-        return text.strip()
+        variants = {
+            'fixed': self._preprocess_image(gray, params),
+            'otsu': otsu_2x,
+            'adaptive': cv2.medianBlur(adaptive, 3, dst=self._buffer('adaptive', adaptive.shape)),
+            'otsu_large': self._otsu('otsu_large', self._scaled('gray_3x', gray, 3)),
+            'otsu_morph': morph,
+        }
+        return {name: variants[name] for name in self.ENSEMBLE_VARIANTS}
     
-    def _clean_text(self, text: str) -> str:
+    def _recognize(self, variant: str, image: np.ndarray) -> Dict:
         """
-        Clean extracted text by removing unwanted characters.
+        OCR one preprocessed variant.
         
         Args:
-            text: Raw extracted text
+            variant: Name of the preprocessing variant
+            image: Preprocessed image as numpy array
             
         Returns:
-            Cleaned text
+            Candidate with cleaned 'text', per-character 'confidences' (0-100)
+            and overall 'weight' (mean confidence, 0-1)
         """
-        # Remove non-alphanumeric characters
-        cleaned = re.sub(r'[^a-zA-Z0-9]', '', text)
-        
-        # Convert to uppercase (if needed based on captcha format)
-        cleaned = cleaned.upper()
-        
-        return cleaned
+        # Perform OCR (single word, alphanumeric whitelist)
+        return self._candidate(variant, self.ocr_engine.recognize(image))
     
-    def download_captcha_image(self, url: str) -> Optional[bytes]:
+    def _candidate(self, variant: str, symbols: List[Tuple[str, float]]) -> Dict:
         """
-        Download captcha image from URL.
+        Clean a recognizer's reading into a voting candidate.
         
         Args:
-            url: URL of the captcha image
+            variant: Name of the preprocessing variant or recognizer
+            symbols: (text, confidence 0-100) pairs in reading order
             
         Returns:
-            Image bytes or None if failed
+            Candidate with cleaned 'text', per-character 'confidences' (0-100)
+            and overall 'weight' (mean confidence, 0-1)
         """
-        try:
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            return response.content
-        except Exception as e:
-            logger.error(f"Failed to download captcha image: {e}")
-            return None
+        symbols = [
+            (char, confidence)
+            for text, confidence in symbols
+            for char in self._clean_text(text)
+        ]
+        confidences = [confidence for _, confidence in symbols]
+        return {
+            'variant': variant,
+            'text': ''.join(char for char, _ in symbols),
+            'confidences': confidences,
+            'weight': sum(confidences) / len(confidences) / 100 if confidences else 0.0,
+        }
     
-    def solve_from_base64(self, base64_string: str) -> Optional[str]:
+    def _vote(self, candidates: List[Dict]) -> Tuple[str, float]:
         """
-        Solve captcha from base64 encoded image.
+        Combine candidate readings into one answer.
+        
+        The answer length is the one with the most confidence behind it; each
+        position is then decided by a confidence-weighted vote among candidates
+        of that length.
         
         Args:
-            base64_string: Base64 encoded image string
+            candidates: Results of ``_recognize``
             
         Returns:
-            Solved captcha text or None if failed
+            Tuple of (text, confidence 0-1). Confidence is the mean confidence
+            of the winning characters scaled by how much of the total candidate
+            confidence agreed with them.
         """
-        try:
-            # Remove data URL prefix if present
-            if ',' in base64_string:
-                base64_string = base64_string.split(',')[1]
-            
-            # Decode base64
-            image_data = base64.b64decode(base64_string)
+        readable = [c for c in candidates if c['text']]
+        if not readable:
+            return '', 0.0
+        
+        length_weights: Dict[int, float] = defaultdict(float)
+        for candidate in readable:
+            length_weights[len(candidate['text'])] += candidate['weight']
+        length = max(length_weights, key=length_weights.get)
+        voters = [c for c in readable if len(c['text']) == length]
+        
+        answer = []
+        agreement = 0.0
+        winner_confidence = 0.0
+        for position in range(length):
+            votes: Dict[str, List[float]] = defaultdict(list)
+            for candidate in voters:
+                votes[candidate['text'][position]].append(candidate['confidences'][position] / 100)
+            char, scores = max(votes.items(), key=lambda item: sum(item[1]))
+            answer.append(char)
+            agreement += sum(scores)
+            winner_confidence += sum(scores) / len(scores)
+        
+        total_weight = sum(c['weight'] for c in readable)
+        confidence = (agreement / length / total_weight) * (winner_confidence / length) if total_weight else 0.0
+        return ''.join(answer), round(min(confidence, 1.0), 3)
+    
+    def _clean_text(self, text: str) -> str:
+        """
+        Clean extracted text by removing unwanted characters.
+        
+        Args:
+            text: Raw extracted text
             
-            return self.solve_captcha(image_data)
-        except Exception as e:
-            logger.error(f"Failed to decode base64 image: {e}")
-            return None
\ No newline at end of file
+        Returns:
+            Cleaned text
+        """
+        # Remove non-alphanumeric characters
+        cleaned = re.sub(r'[^a-zA-Z0-9]', '', text)
+        
+        # Convert to uppercase (if needed based on captcha format)
+        cleaned = cleaned.upper()
+        
+        return cleaned
+    
+    def close(self):
+        """Release the OCR engine, worker threads and HTTP session."""
+        if self._executor:
+            self._executor.shutdown(wait=True)
+        self.ocr_engine.close()
+        super().close()
\ No newline at end of file
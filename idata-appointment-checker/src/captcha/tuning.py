@@ -0,0 +1,135 @@
+import json
+import logging
+import os
+import random
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from src.utils.atomic_json import write_json
+
+logger = logging.getLogger(__name__)
+
+# Candidate settings for the fixed preprocessing pipeline; the first one is the original
+DEFAULT_ARMS = [
+    {'threshold': threshold, 'blur': blur, 'scale': scale}
+    for threshold, blur, scale in [
+        (150, 3, 2),
+        (130, 3, 2),
+        (170, 3, 2),
+        (150, 0, 2),
+        (150, 5, 2),
+        (150, 3, 3),
+        (130, 3, 3),
+        (170, 3, 3),
+        (110, 3, 2),
+        (190, 3, 2),
+    ]
+]
+
+
+def arm_id(params: Dict[str, int]) -> str:
+    """Stable name of a parameter set, used as its key in the saved statistics."""
+    return f"t{params['threshold']}-b{params['blur']}-s{params['scale']}"
+
+
+class ParameterTuner:
+    """
+    Picks CAPTCHA preprocessing parameters by Thompson sampling over accept/reject feedback.
+    
+    Every parameter set keeps a Beta(accepted + 1, rejected + 1) posterior of
+    its acceptance rate. Each solve draws from all posteriors and uses the
+    best draw, so sets that keep getting accepted are chosen more often while
+    untried ones are still explored.
+    """
+    
+    def __init__(self, arms: Optional[List[Dict[str, int]]] = None, state_path: Optional[str] = 'captcha_tuning.json',
+                 seed: Optional[int] = None):
+        """
+        Args:
+            arms: Candidate parameter sets (defaults to DEFAULT_ARMS)
+            state_path: JSON file the statistics persist to (None keeps them in memory)
+            seed: Seed for the sampler, for reproducible runs
+        """
+        self.arms = {arm_id(params): dict(params) for params in (arms or DEFAULT_ARMS)}
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self.stats: Dict[str, Dict[str, int]] = {name: {'accepted': 0, 'rejected': 0} for name in self.arms}
+        self._load()
+    
+    def choose(self) -> Tuple[str, Dict[str, int]]:
+        """
+        Pick the parameter set for the next solve.
+        
+        Returns:
+            Tuple of (arm id, parameters)
+        """
+        with self._lock:
+            draws = {
+                name: self._random.betavariate(counts['accepted'] + 1, counts['rejected'] + 1)
+                for name, counts in self.stats.items()
+            }
+        name = max(draws, key=draws.get)
+        return name, self.arms[name]
+    
+    def report(self, name: str, accepted: bool):
+        """
+        Record the server's verdict on a code read with a parameter set.
+        
+        Args:
+            name: Arm id returned by ``choose``
+            accepted: Whether the code was accepted
+        """
+        if name not in self.stats:
+            return
+        with self._lock:
+            self.stats[name]['accepted' if accepted else 'rejected'] += 1
+            self._save()
+    
+    def best(self) -> Tuple[str, float]:
+        """
+        The parameter set with the highest posterior mean acceptance rate.
+        
+        Returns:
+            Tuple of (arm id, estimated acceptance rate)
+        """
+        with self._lock:
+            rates = {
+                name: (counts['accepted'] + 1) / (counts['accepted'] + counts['rejected'] + 2)
+                for name, counts in self.stats.items()
+            }
+        name = max(rates, key=rates.get)
+        return name, rates[name]
+    
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """Get a snapshot of the accepted/rejected counts per arm."""
+        with self._lock:
+            return {name: dict(counts) for name, counts in self.stats.items()}
+    
+    def _load(self):
+        """Restore counts saved by an earlier run; unknown arms are ignored."""
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, 'r') as f:
+                saved = json.load(f).get('arms', {})
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable CAPTCHA tuning state: {e}")
+            return
+        
+        for name, counts in saved.items():
+            if name in self.stats and isinstance(counts, dict):
+                self.stats[name] = {
+                    'accepted': int(counts.get('accepted', 0)),
+                    'rejected': int(counts.get('rejected', 0)),
+                }
+        logger.debug(f"Loaded CAPTCHA tuning statistics for {len(saved)} parameter sets")
+    
+    def _save(self):
+        """Write the counts to disk (called with the lock held)."""
+        if not self.state_path:
+            return
+        try:
+            write_json(self.state_path, {'arms': self.stats, 'params': self.arms}, indent=2)
+        except OSError as e:
+            logger.warning(f"Failed to persist CAPTCHA tuning state: {e}")
\ No newline at end of file
@@ -1,10 +1,63 @@
 import os
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List
 
 from dotenv import load_dotenv
 
 
+def _parse_key_values(value: str) -> Dict[str, float]:
+    """
+    Parse a "name=value,name=value" string into a dictionary of floats.
+    
+    Args:
+        value: Comma separated name=value pairs
+        
+    Returns:
+        Dictionary mapping names to numeric values
+    """
+    result = {}
+    for item in value.split(','):
+        if '=' in item:
+            key, number = item.split('=', 1)
+            result[key.strip()] = float(number)
+    return result
+
+
+def _parse_list(value: str) -> List[str]:
+    """
+    Parse a comma separated string into a list of non-empty, stripped items.
+    
+    Args:
+        value: Comma separated items
+        
+    Returns:
+        List of items
+    """
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def _parse_profiles(value: str) -> List[Dict[str, str]]:
+    """
+    Parse "city|office|purpose|service|persons;..." into appointment profiles.
+    
+    Args:
+        value: Semicolon separated profiles with pipe separated fields
+        
+    Returns:
+        List of profile dictionaries
+    """
+    fields = ['residence_city', 'idata_office', 'travel_purpose', 'service_type', 'num_persons']
+    profiles = []
+    for item in value.split(';'):
+        if not item.strip():
+            continue
+        values = [part.strip() for part in item.split('|')]
+        if len(values) != len(fields):
+            raise ValueError(f"Appointment profile needs {len(fields)} '|' separated fields: {item}")
+        profiles.append(dict(zip(fields, values)))
+    return profiles
+
+
 def load_config() -> Dict:
     """
     Load configuration from environment variables.
@@ -27,6 +80,23 @@ def load_config() -> Dict:
             'enabled': os.getenv('TELEGRAM_ENABLED', 'false').lower() == 'true',
             'bot_token': os.getenv('TELEGRAM_BOT_TOKEN', ''),
             'chat_id': int(os.getenv('TELEGRAM_CHAT_ID', '0')) if os.getenv('TELEGRAM_CHAT_ID') else 0,
+            # Broadcasts to subscribers: messages per second (Telegram allows ~30) and requests in flight
+            'broadcast_rate': float(os.getenv('TELEGRAM_BROADCAST_RATE', '25')),
+            'broadcast_concurrency': int(os.getenv('TELEGRAM_BROADCAST_CONCURRENCY', '30')),
+        },
+        'notifications': {
+            # Queue notifications durably and deliver them from a background thread
+            'outbox': os.getenv('NOTIFICATION_OUTBOX', 'true').lower() == 'true',
+            # Used when the database is disabled or unreachable
+            'outbox_file': os.getenv('NOTIFICATION_OUTBOX_FILE', 'notification_outbox.jsonl'),
+            'dispatch_interval_seconds': float(os.getenv('NOTIFICATION_DISPATCH_INTERVAL_SECONDS', '5')),
+            # Delivery attempts before a partly delivered notification is given up
+            'max_attempts': int(os.getenv('NOTIFICATION_MAX_ATTEMPTS', '10')),
+            # Alert only on new or changed slots instead of on every check that finds some
+            'only_changes': os.getenv('NOTIFY_ONLY_CHANGES', 'true').lower() == 'true',
+            'availability_state_file': os.getenv('AVAILABILITY_STATE_FILE', 'availability_state.json'),
+            # Minutes after which slots that are still open are announced again (0 never)
+            'reminder_minutes': float(os.getenv('AVAILABILITY_REMINDER_MINUTES', '60')),
         },
         'email': {
             'enabled': os.getenv('EMAIL_ENABLED', 'false').lower() == 'true',
@@ -35,7 +105,12 @@ def load_config() -> Dict:
             'smtp_username': os.getenv('EMAIL_SMTP_USERNAME', ''),
             'smtp_password': os.getenv('EMAIL_SMTP_PASSWORD', ''),
             'from_email': os.getenv('EMAIL_FROM', ''),
+            # One address or several, comma separated
             'to_email': os.getenv('EMAIL_TO', ''),
+            # Recipients per message (sent as BCC); 1 sends every recipient their own message
+            'bcc_batch_size': int(os.getenv('EMAIL_BCC_BATCH_SIZE', '50')),
+            # Idle seconds after which the kept-alive SMTP session is replaced rather than reused
+            'keepalive_seconds': int(os.getenv('EMAIL_KEEPALIVE_SECONDS', '240')),
         },
         'appointment': {
             'residence_city': os.getenv('RESIDENCE_CITY', 'İstanbul'),
@@ -43,6 +118,63 @@ def load_config() -> Dict:
             'travel_purpose': os.getenv('TRAVEL_PURPOSE', 'Tourism'),
             'service_type': os.getenv('SERVICE_TYPE', 'Standard'),
             'num_persons': os.getenv('NUM_PERSONS', '3'),
+            # Optional profile matrix; overrides the single combination above
+            'profiles': _parse_profiles(os.getenv('APPOINTMENT_PROFILES', '')),
+        },
+        'scraper': {
+            'base_url': os.getenv('IDATA_BASE_URL', 'https://it-tr-appointment.idata.com.tr'),
+            'driver_pool_size': int(os.getenv('DRIVER_POOL_SIZE', '1')),
+            'driver_max_uses': int(os.getenv('DRIVER_MAX_USES', '25')),
+            'driver_reset_cookies': os.getenv('DRIVER_RESET_COOKIES', 'true').lower() == 'true',
+            'driver_reset_storage': os.getenv('DRIVER_RESET_STORAGE', 'true').lower() == 'true',
+            'check_concurrency': int(os.getenv('CHECK_CONCURRENCY', '1')),
+            'office_timeout_seconds': int(os.getenv('OFFICE_TIMEOUT_SECONDS', '300')),
+            # Per-step wait budgets, e.g. "main_page=15,captcha_submit=15,results=20"
+            'step_timeouts': _parse_key_values(os.getenv('STEP_TIMEOUTS', '')),
+            # Fresh CAPTCHAs solved on the same session before an office check gives up
+            'captcha_max_attempts': int(os.getenv('CAPTCHA_MAX_ATTEMPTS', '3')),
+            'captcha_time_budget_seconds': int(os.getenv('CAPTCHA_TIME_BUDGET_SECONDS', '60')),
+            # Implausible readings replaced by a fresh CAPTCHA without submitting, per authentication
+            'captcha_max_skips': int(os.getenv('CAPTCHA_MAX_SKIPS', '2')),
+            # Resources the browser never downloads (CAPTCHA URLs stay allowed)
+            'block_resources': os.getenv('BLOCK_RESOURCES', 'true').lower() == 'true',
+            'blocked_resource_types': _parse_list(os.getenv('BLOCKED_RESOURCE_TYPES', 'image,font,media,analytics')),
+            'blocked_url_patterns': _parse_list(os.getenv('BLOCKED_URL_PATTERNS', '')),
+            'allowed_url_patterns': _parse_list(os.getenv('ALLOWED_URL_PATTERNS', '*captcha*')),
+            'session_persistence': os.getenv('SESSION_PERSISTENCE', 'true').lower() == 'true',
+            'session_file': os.getenv('SESSION_FILE', 'session_state.json'),
+            'session_max_age_minutes': int(os.getenv('SESSION_MAX_AGE_MINUTES', '20')),
+            # "selenium" or "http" (browserless, falls back to Selenium when it breaks)
+            'backend': os.getenv('SCRAPER_BACKEND', 'selenium').lower(),
+            'http_timeout_seconds': int(os.getenv('HTTP_TIMEOUT_SECONDS', '15')),
+            'http_cooldown_minutes': int(os.getenv('HTTP_COOLDOWN_MINUTES', '30')),
+        },
+        'captcha': {
+            # "tesseract", or "glyph" for the trained NumPy recognizer (src/captcha/glyph_recognizer.py)
+            'backend': os.getenv('CAPTCHA_BACKEND', 'tesseract').lower(),
+            'glyph_model': os.getenv('GLYPH_MODEL_PATH', 'glyph_model.npz'),
+            # Characters per CAPTCHA (0 if unknown)
+            'length': int(os.getenv('CAPTCHA_LENGTH', '6')),
+            # Codes read with less confidence (0-1) are swapped for a fresh CAPTCHA instead of submitted
+            'min_confidence': float(os.getenv('CAPTCHA_MIN_CONFIDENCE', '0.6')),
+            # "auto" uses in-process tesserocr when installed, else the tesseract executable
+            'ocr_engine': os.getenv('OCR_ENGINE', 'auto').lower(),
+            # OCR several preprocessing variants in parallel and vote on the answer
+            'ensemble': os.getenv('CAPTCHA_ENSEMBLE', 'true').lower() == 'true',
+            'ensemble_workers': int(os.getenv('CAPTCHA_ENSEMBLE_WORKERS', '5')),
+            # Solver processes shared by all scraper workers (0 solves on the scraper thread)
+            'service_workers': int(os.getenv('CAPTCHA_SERVICE_WORKERS', '0')),
+            # Learn the best preprocessing parameters from accepted/rejected codes
+            'tuning': os.getenv('CAPTCHA_TUNING', 'true').lower() == 'true',
+            'tuning_file': os.getenv('CAPTCHA_TUNING_FILE', 'captcha_tuning.json'),
+            # Answer repeat CAPTCHAs from server-confirmed answers, matched by perceptual hash
+            'answer_cache': os.getenv('CAPTCHA_ANSWER_CACHE', 'true').lower() == 'true',
+            'answer_cache_file': os.getenv('CAPTCHA_ANSWER_CACHE_FILE', 'captcha_answers.json'),
+            'answer_cache_size': int(os.getenv('CAPTCHA_ANSWER_CACHE_SIZE', '5000')),
+            # Differing bits (of 256) up to which two images count as the same CAPTCHA
+            'answer_cache_distance': int(os.getenv('CAPTCHA_ANSWER_CACHE_DISTANCE', '6')),
+            # Folder to store every CAPTCHA with its guess and verdict (empty disables capture)
+            'capture_dir': os.getenv('CAPTCHA_CAPTURE_DIR', ''),
         },
         'database': {
             'enabled': os.getenv('DATABASE_ENABLED', 'true').lower() == 'true',
@@ -73,4 +205,29 @@ def load_config() -> Dict:
                        config['database']['user'], config['database']['password']]):
                 raise ValueError("Database is enabled but required connection parameters are missing")
     
-    return config
\ No newline at end of file
+    return config
+
+def describe_appointment(appointment: Dict) -> List[str]:
+    """
+    Describe what the checker will look for, for startup messages.
+    
+    Args:
+        appointment: The 'appointment' section of the configuration
+        
+    Returns:
+        One line per configured profile when APPOINTMENT_PROFILES is set,
+        otherwise one line per legacy field
+    """
+    if appointment.get('profiles'):
+        return [
+            f"Profile {number}: {profile['residence_city']}, {profile['idata_office']}, "
+            f"{profile['travel_purpose']}, {profile['service_type']}, {profile['num_persons']} persons"
+            for number, profile in enumerate(appointment['profiles'], 1)
+        ]
+    return [
+        f"City: {appointment['residence_city']}",
+        f"Offices: {', '.join(appointment['idata_offices'])}",
+        f"Purpose: {appointment['travel_purpose']}",
+        f"Service: {appointment['service_type']}",
+        f"Persons: {appointment['num_persons']}",
+    ]
\ No newline at end of file
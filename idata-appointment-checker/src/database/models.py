@@ -1,7 +1,8 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Column, Integer, BigInteger, DateTime, Boolean, create_engine
+from sqlalchemy import (Column, Integer, BigInteger, DateTime, Boolean, String, Text, ForeignKey,
+                        UniqueConstraint, create_engine)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.sql import func
@@ -22,6 +23,41 @@ class TelegramUser(Base):
     def __repr__(self):
         return f"<TelegramUser(chat_id={self.chat_id}, is_active={self.is_active}, subscribed_at={self.subscribed_at})>"
 
+class OutboxNotification(Base):
+    __tablename__ = 'notification_outbox'
+    
+    id = Column(String(32), primary_key=True)
+    kind = Column(String(32), nullable=False)
+    subject = Column(Text, nullable=False)
+    message = Column(Text, nullable=False)
+    telegram_text = Column(Text, nullable=False)
+    # pending until every recipient is served, then sent or failed
+    status = Column(String(16), default='pending', nullable=False, index=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    # Due time; a dispatcher claiming the row moves it forward so no other dispatcher takes it meanwhile
+    next_attempt_at = Column(DateTime, nullable=False, index=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    completed_at = Column(DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f"<OutboxNotification(id={self.id}, kind={self.kind}, status={self.status}, attempts={self.attempts})>"
+
+class OutboxDelivery(Base):
+    __tablename__ = 'notification_deliveries'
+    __table_args__ = (UniqueConstraint('notification_id', 'recipient', name='uq_notification_recipient'),)
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    notification_id = Column(String(32), ForeignKey('notification_outbox.id', ondelete='CASCADE'), nullable=False, index=True)
+    # Idempotency key within the notification: "telegram:<chat_id>" or "email:<address>"
+    # (the 6-character prefix plus an address of up to 320 characters)
+    recipient = Column(String(330), nullable=False)
+    outcome = Column(String(16), nullable=False)
+    delivered_at = Column(DateTime, default=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<OutboxDelivery(notification_id={self.notification_id}, recipient={self.recipient}, outcome={self.outcome})>"
+
 class DatabaseManager:
     def __init__(self, database_url: str):
         self.engine = create_engine(database_url, echo=False)
@@ -0,0 +1,443 @@
+import argparse
+import base64
+import io
+import logging
+import random
+import re
+import secrets
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+from PIL import Image, ImageDraw, ImageFont
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FIXTURE = Path(__file__).resolve().parent.parent.parent / 'page_source.html'
+LIVE_ORIGIN = 'https://it-tr-appointment.idata.com.tr'
+
+CAPTCHA_ALPHABET = 'ABCDEFGHJKLMNPRSTUVYZ23456789'
+CAPTCHA_LENGTH = 6
+
+RESULT_MODES = ('no_slots', 'slots', 'error')
+
+# Stands in for the site's jQuery bundle: submits the CAPTCHA form and closes dialogs
+FRONT_STUB_JS = """
+document.addEventListener('DOMContentLoaded', function () {
+    var button = document.getElementById('confirmationbtn');
+    if (button) {
+        button.addEventListener('click', function () {
+            var code = document.getElementById('mailConfirmCodeControl');
+            if (code && code.value.length == 6) {
+                document.querySelector('.goappointment').submit();
+            }
+        });
+    }
+    var confirm = document.querySelector('.swal2-confirm');
+    if (confirm) {
+        confirm.addEventListener('click', function () {
+            document.querySelector('.swal2-modal').style.display = 'none';
+        });
+    }
+});
+"""
+
+FORM_OPTIONS = {
+    'residence_city': ['İstanbul', 'Ankara', 'İzmir', 'Bursa', 'Antalya'],
+    'idata_office': ['Altunizade', 'Gayrettepe', 'Ankara', 'İzmir', 'Bursa', 'Antalya'],
+    'travel_purpose': ['Tourism', 'Business', 'Family Visit', 'Education'],
+    'service_type': ['Standard', 'VIP'],
+}
+
+FORM_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="tr">
+<head>
+<meta charset="utf-8">
+<meta name="csrf-token" content="{token}">
+<title>iDATA Randevu Formu</title>
+</head>
+<body>
+<div id="spinner-container"></div>
+<form method="post" action="/tr/appointment-form/result" class="appointment-form">
+<input type="hidden" name="_token" value="{token}">
+<select name="residence_city" id="residence-city">{residence_city}</select>
+<select name="idata_office" id="idata-office">{idata_office}</select>
+<select name="travel_purpose" id="travel-purpose">{travel_purpose}</select>
+<select name="service_type" id="service-type">{service_type}</select>
+<input type="number" name="num_persons" id="num-persons" value="1">
+<button type="submit" class="btn-check">Randevu Sorgula</button>
+</form>
+</body>
+</html>"""
+
+RESULT_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="tr">
+<head>
+<meta charset="utf-8">
+<title>iDATA Randevu Sonucu</title>
+</head>
+<body>
+<div id="spinner-container"></div>
+<h1>{office} - {city}</h1>
+{content}
+</body>
+</html>"""
+
+RESULT_CONTENT = {
+    'no_slots': '<div class="alert alert-info">Uygun randevu tarihi bulunmamaktadır.</div>',
+    'error': '<div class="alert alert-danger">İşlem sırasında bir hata oluştu, lütfen tekrar deneyin.</div>',
+}
+
+
+def render_captcha(text: str) -> bytes:
+    """
+    Draw a CAPTCHA image for ``text`` in the style of the live site.
+    
+    Returns:
+        PNG bytes
+    """
+    rng = random.Random(text)
+    image = Image.new('RGB', (180, 60), (240, 240, 240))
+    draw = ImageDraw.Draw(image)
+    
+    try:
+        font = ImageFont.load_default(size=34)
+    except (TypeError, OSError):
+        font = ImageFont.load_default()
+    
+    for _ in range(6):
+        draw.line(
+            [(rng.randint(0, 180), rng.randint(0, 60)), (rng.randint(0, 180), rng.randint(0, 60))],
+            fill=(rng.randint(120, 200),) * 3,
+            width=1
+        )
+    for index, char in enumerate(text):
+        draw.text((10 + index * 27, rng.randint(5, 15)), char, fill=(20, 20, 20), font=font)
+    
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class FakeIdataServer:
+    """Local stand-in for the IDATA appointment site, built from a recorded landing page."""
+    
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, result_mode: str = 'no_slots',
+                 office_modes: Optional[Dict[str, str]] = None, latency: Optional[Dict[str, float]] = None,
+                 captcha_mode: str = 'strict', captcha_reject_rate: float = 0.0,
+                 fixture_path: Optional[str] = None, seed: int = 0):
+        """
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free one)
+            result_mode: Result page served by default: 'no_slots', 'slots' or 'error'
+            office_modes: Result mode per office name, overriding ``result_mode``
+            latency: Seconds added per route: 'main_page', 'captcha_submit',
+                'appointment_form', 'results'
+            captcha_mode: 'strict' accepts only the right answer, 'any' accepts any
+                six-character code (for OCR-independent runs)
+            captcha_reject_rate: Fraction of otherwise accepted codes rejected anyway
+            fixture_path: Recorded landing page (defaults to page_source.html)
+            seed: Seed for CAPTCHA texts and rejections, for reproducible runs
+        """
+        if result_mode not in RESULT_MODES:
+            raise ValueError(f"Unknown result mode: {result_mode}")
+        
+        self.result_mode = result_mode
+        self.office_modes = dict(office_modes or {})
+        self.latency = dict(latency or {})
+        self.captcha_mode = captcha_mode
+        self.captcha_reject_rate = captcha_reject_rate
+        self.landing_template = self._load_landing_template(fixture_path or DEFAULT_FIXTURE)
+        
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.sessions: Dict[str, Dict] = {}
+        self.stats = {
+            'captchas_served': 0,
+            'captchas_accepted': 0,
+            'captchas_rejected': 0,
+            'forms_served': 0,
+            'results_served': 0,
+        }
+        
+        handler = type('FakeIdataHandler', (_FakeIdataHandler,), {'server_state': self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def base_url(self) -> str:
+        """Root URL to point the checker at."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def start(self) -> 'FakeIdataServer':
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='fake-idata', daemon=True)
+        self._thread.start()
+        logger.info(f"Fake IDATA server listening on {self.base_url}")
+        return self
+    
+    def stop(self):
+        """Stop serving and release the port."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+    
+    def answer_for(self, session_id: str) -> Optional[str]:
+        """The text of the CAPTCHA last served to a session."""
+        with self._lock:
+            return self.sessions.get(session_id, {}).get('answer')
+    
+    def _load_landing_template(self, path) -> str:
+        """Make the recorded landing page self-contained and CAPTCHA-replaceable."""
+        page = Path(path).read_text(encoding='utf-8')
+        
+        # Drop third-party assets so runs never leave the machine
+        page = re.sub(r'<script[^>]+src="https?://(?!it-tr-appointment)[^"]*"[^>]*></script>', '', page)
+        page = re.sub(r'<link[^>]+href="https?://(?!it-tr-appointment)[^"]*"[^>]*>', '', page)
+        page = page.replace(LIVE_ORIGIN, '')
+        
+        # Placeholders for the per-request CAPTCHA and CSRF token
+        page = re.sub(r'data:image/png;base64,[A-Za-z0-9+/=\\]+', 'data:image/png;base64,{{CAPTCHA}}', page)
+        page = re.sub(r'("data:image/png;base64," \+ ")[A-Za-z0-9+/=\\]+(")', r'\1{{CAPTCHA}}\2', page)
+        page = re.sub(r'(name="_token" value=")[^"]*(")', r'\1{{TOKEN}}\2', page)
+        page = re.sub(r'(name="csrf-token" content=")[^"]*(")', r'\1{{TOKEN}}\2', page)
+        return page
+    
+    def new_session(self) -> str:
+        """Create an unauthenticated session and return its id."""
+        session_id = secrets.token_hex(16)
+        with self._lock:
+            self.sessions[session_id] = {
+                'authenticated': False,
+                'answer': None,
+                'flash_error': False,
+                'token': secrets.token_urlsafe(30),
+            }
+        return session_id
+    
+    def session(self, session_id: Optional[str]) -> Optional[Dict]:
+        """Look up a session by id."""
+        with self._lock:
+            return self.sessions.get(session_id) if session_id else None
+    
+    def render_landing(self, session: Dict) -> str:
+        """Landing page with a new CAPTCHA, showing the error dialog after a wrong code."""
+        with self._lock:
+            answer = ''.join(self._rng.choice(CAPTCHA_ALPHABET) for _ in range(CAPTCHA_LENGTH))
+            session['answer'] = answer
+            self.stats['captchas_served'] += 1
+            show_error, session['flash_error'] = session['flash_error'], False
+        
+        captcha = base64.b64encode(render_captcha(answer)).decode('ascii')
+        page = self.landing_template.replace('{{CAPTCHA}}', captcha).replace('{{TOKEN}}', session['token'])
+        if show_error:
+            page = page.replace(
+                '<div class="swal2-modal" style="display: none"',
+                '<div class="swal2-modal" style="display: block"'
+            ).replace('<h2></h2>', '<h2>Hata</h2>', 1).replace(
+                '<div class="swal2-content"></div>',
+                '<div class="swal2-content" style="display: block">Doğrulama kodunu hatalı girdiniz.</div>',
+                1
+            )
+        return page
+    
+    def check_captcha(self, session: Dict, code: str) -> bool:
+        """Validate a submitted code and update the session."""
+        code = (code or '').strip().upper()
+        with self._lock:
+            if self.captcha_mode == 'any':
+                accepted = len(code) == CAPTCHA_LENGTH
+            else:
+                accepted = bool(session['answer']) and code == session['answer']
+            if accepted and self._rng.random() < self.captcha_reject_rate:
+                accepted = False
+            
+            session['authenticated'] = accepted
+            session['flash_error'] = not accepted
+            self.stats['captchas_accepted' if accepted else 'captchas_rejected'] += 1
+        return accepted
+    
+    def render_form(self, session: Dict) -> str:
+        """The appointment form with static option lists."""
+        with self._lock:
+            self.stats['forms_served'] += 1
+        options = {
+            key: ''.join(f'<option value="{index + 1}">{value}</option>' for index, value in enumerate(values))
+            for key, values in FORM_OPTIONS.items()
+        }
+        return FORM_PAGE_TEMPLATE.format(token=session['token'], **options)
+    
+    def render_result(self, form: Dict[str, str]) -> str:
+        """Result page for a submitted form, according to the office's mode."""
+        office = self._option_text('idata_office', form.get('idata_office'))
+        city = self._option_text('residence_city', form.get('residence_city'))
+        mode = self.office_modes.get(office, self.result_mode)
+        
+        with self._lock:
+            self.stats['results_served'] += 1
+        
+        if mode == 'slots':
+            content = '<div class="results">' + ''.join(
+                f'<div class="slot">{day:02d}.12.2026 {hour:02d}:30</div>'
+                for day, hour in ((3, 9), (3, 11), (8, 14))
+            ) + '</div>'
+        else:
+            content = RESULT_CONTENT[mode]
+        return RESULT_PAGE_TEMPLATE.format(office=office, city=city, content=content)
+    
+    def _option_text(self, field: str, value: Optional[str]) -> str:
+        """Map a submitted option value back to its visible text."""
+        try:
+            return FORM_OPTIONS[field][int(value) - 1]
+        except (TypeError, ValueError, IndexError):
+            return value or ''
+    
+    def delay(self, route: str):
+        """Sleep for the latency configured for a route."""
+        seconds = self.latency.get(route, 0)
+        if seconds:
+            time.sleep(seconds)
+
+
+class _FakeIdataHandler(BaseHTTPRequestHandler):
+    """Routes requests to the FakeIdataServer it is bound to."""
+    
+    server_state: FakeIdataServer = None
+    protocol_version = 'HTTP/1.1'
+    
+    def log_message(self, format, *args):
+        logger.debug(f"fake-idata: {format % args}")
+    
+    def do_GET(self):
+        path = urlparse(self.path).path.rstrip('/')
+        session_id, session = self._session()
+        
+        if path in ('', '/tr'):
+            self.server_state.delay('main_page')
+            self._send_html(self.server_state.render_landing(session), session_id)
+        elif path == '/tr/appointment-form':
+            self.server_state.delay('appointment_form')
+            if session['authenticated']:
+                self._send_html(self.server_state.render_form(session), session_id)
+            else:
+                self._redirect('/tr', session_id)
+        elif path == '/front/javascript/front.index.js':
+            self._send(200, FRONT_STUB_JS.encode('utf-8'), 'application/javascript', session_id)
+        else:
+            self._send(404, b'Not found', 'text/plain', session_id)
+    
+    def do_POST(self):
+        path = urlparse(self.path).path.rstrip('/')
+        session_id, session = self._session()
+        form = self._read_form()
+        
+        if path == '/tr/appointment-form' and 'mailConfirmCode' in form:
+            self.server_state.delay('captcha_submit')
+            accepted = self.server_state.check_captcha(session, form['mailConfirmCode'])
+            self._redirect('/tr/appointment-form' if accepted else '/tr', session_id)
+        elif path == '/tr/appointment-form/result':
+            self.server_state.delay('results')
+            if session['authenticated']:
+                self._send_html(self.server_state.render_result(form), session_id)
+            else:
+                self._redirect('/tr', session_id)
+        else:
+            self._send(404, b'Not found', 'text/plain', session_id)
+    
+    def _session(self):
+        """Find the caller's session from its cookie, creating one if needed."""
+        cookie = SimpleCookie(self.headers.get('Cookie', ''))
+        session_id = cookie['idata_session'].value if 'idata_session' in cookie else None
+        session = self.server_state.session(session_id)
+        if session is None:
+            session_id = self.server_state.new_session()
+            session = self.server_state.session(session_id)
+        return session_id, session
+    
+    def _read_form(self) -> Dict[str, str]:
+        """Parse an urlencoded request body."""
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length).decode('utf-8') if length else ''
+        return {key: values[0] for key, values in parse_qs(body).items()}
+    
+    def _send_html(self, page: str, session_id: str):
+        self._send(200, page.encode('utf-8'), 'text/html; charset=utf-8', session_id)
+    
+    def _redirect(self, location: str, session_id: str):
+        self.send_response(303)
+        self.send_header('Location', location)
+        self.send_header('Content-Length', '0')
+        self._send_session_cookie(session_id)
+        self.end_headers()
+    
+    def _send(self, status: int, body: bytes, content_type: str, session_id: str):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self._send_session_cookie(session_id)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _send_session_cookie(self, session_id: str):
+        self.send_header('Set-Cookie', f'idata_session={session_id}; Path=/; HttpOnly')
+
+
+def parse_latency(value: str) -> Dict[str, float]:
+    """Parse "route=seconds,..." into a latency map."""
+    latency = {}
+    for item in value.split(','):
+        if '=' in item:
+            route, seconds = item.split('=', 1)
+            latency[route.strip()] = float(seconds)
+    return latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the IDATA appointment site")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--mode', choices=RESULT_MODES, default='no_slots', help="Result page to serve")
+    parser.add_argument('--office-mode', action='append', default=[], metavar='OFFICE=MODE',
+                        help="Result mode for one office (repeatable)")
+    parser.add_argument('--latency', default='', help="Per-route delays, e.g. main_page=0.3,results=1.5")
+    parser.add_argument('--captcha-mode', choices=('strict', 'any'), default='strict')
+    parser.add_argument('--captcha-reject-rate', type=float, default=0.0)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    office_modes = dict(item.split('=', 1) for item in args.office_mode)
+    
+    server = FakeIdataServer(
+        host=args.host,
+        port=args.port,
+        result_mode=args.mode,
+        office_modes=office_modes,
+        latency=parse_latency(args.latency),
+        captcha_mode=args.captcha_mode,
+        captcha_reject_rate=args.captcha_reject_rate
+    )
+    logger.info(f"Serving fake IDATA site on {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from ..utils.atomic_json import write_json
+
+logger = logging.getLogger(__name__)
+
+# Slots listed per profile in an alert
+MAX_LISTED_SLOTS = 5
+
+
+def profile_key(result: Dict) -> str:
+    """Stable key of the profile a check result belongs to."""
+    profile = result.get('profile') or {'idata_office': result.get('office', result.get('label', ''))}
+    return '|'.join(str(profile.get(field, '')) for field in
+                    ('residence_city', 'idata_office', 'travel_purpose', 'service_type', 'num_persons'))
+
+
+def is_inconclusive(result: Dict) -> bool:
+    """
+    Whether a check result says nothing about availability.
+    
+    Failed checks (CAPTCHA, timeouts, exceptions) and result pages showing
+    an error or not being the appointment page at all are inconclusive,
+    unless the page carries the site's explicit no-appointment message.
+    """
+    details = result.get('details') or {}
+    if details.get('error'):
+        return True
+    if result.get('available') or details.get('no_appointment_message'):
+        return False
+    return bool(details.get('error_messages') or details.get('page_issue'))
+
+
+def slot_fingerprint(slots: List[str]) -> str:
+    """Order-independent fingerprint of a set of slots."""
+    return hashlib.sha1('\n'.join(sorted(set(slots))).encode('utf-8')).hexdigest()
+
+
+class AvailabilityTracker:
+    """
+    Remembers the open slots of every profile so only changes are announced.
+    
+    Each check result is compared with the slot set seen before for the
+    same profile. New availability and newly opened slots are reported
+    right away; unchanged availability is reported again only every
+    ``reminder_minutes``. Checks that failed (CAPTCHA, timeouts, error
+    pages) say nothing about availability and leave the state untouched. The state is
+    persisted, so a restart does not re-announce slots already announced.
+    """
+    
+    def __init__(self, path: Optional[str] = "availability_state.json", reminder_minutes: float = 60):
+        """
+        Args:
+            path: JSON file the state persists to (None keeps it in memory)
+            reminder_minutes: Minutes after which unchanged availability is announced again (0 never)
+        """
+        self.path = path
+        self.reminder_seconds = reminder_minutes * 60
+        self._lock = threading.Lock()
+        self._state: Dict[str, Dict] = {}
+        self._load()
+    
+    def update(self, results: List[Dict]) -> List[Dict]:
+        """
+        Record the results of a check and get what is worth announcing.
+        
+        Args:
+            results: Per-profile results (``AppointmentChecker.last_results``)
+        
+        Returns:
+            Changes to announce, each with 'label', 'event' ('new', 'changed'
+            or 'reminder'), 'slots' (all open slots) and 'added' (slots not
+            open before)
+        """
+        now = time.time()
+        changes = []
+        
+        with self._lock:
+            seen = set()
+            changed_state = False
+            for result in results:
+                key = profile_key(result)
+                seen.add(key)
+                if is_inconclusive(result):
+                    # Neither proves nor disproves availability: keep what is known
+                    continue
+                details = result.get('details') or {}
+                
+                previous = self._state.get(key)
+                if not result.get('available'):
+                    if previous:
+                        logger.info(f"Slots at {result['label']} are gone")
+                        del self._state[key]
+                        changed_state = True
+                    continue
+                
+                slots = details.get('all_slots') or [result.get('message', '')]
+                fingerprint = slot_fingerprint(slots)
+                if previous is None:
+                    event, added = 'new', list(slots)
+                elif previous['fingerprint'] != fingerprint:
+                    known = set(previous['slots'])
+                    added = [slot for slot in slots if slot not in known]
+                    # Slots only disappearing is not news, but the smaller set is remembered
+                    event = 'changed' if added else None
+                elif self.reminder_seconds and now - previous['notified_at'] >= self.reminder_seconds:
+                    event, added = 'reminder', []
+                else:
+                    continue
+                
+                self._state[key] = {
+                    'label': result['label'],
+                    'fingerprint': fingerprint,
+                    'slots': list(slots),
+                    'first_seen': previous['first_seen'] if previous else now,
+                    'notified_at': now if event else previous['notified_at'],
+                }
+                changed_state = True
+                if event:
+                    changes.append({'label': result['label'], 'event': event, 'slots': list(slots), 'added': added})
+            
+            # Profiles no longer configured
+            for key in [key for key in self._state if key not in seen]:
+                del self._state[key]
+                changed_state = True
+            
+            if changed_state:
+                self._save()
+        
+        return changes
+    
+    def _load(self):
+        """Restore the state saved by an earlier run."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            self._state = {key: value for key, value in state.items()
+                           if isinstance(value, dict) and 'fingerprint' in value}
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable availability state: {e}")
+            self._state = {}
+    
+    def _save(self):
+        """Write the state to disk (called with the lock held)."""
+        if not self.path:
+            return
+        try:
+            write_json(self.path, self._state, ensure_ascii=False)
+        except OSError as e:
+            logger.warning(f"Failed to persist availability state: {e}")
+
+
+def format_changes(changes: List[Dict]) -> str:
+    """
+    Describe availability changes for an alert.
+    
+    Args:
+        changes: Result of ``AvailabilityTracker.update``
+    
+    Returns:
+        One line per profile
+    """
+    lines = []
+    for change in changes:
+        slots = change['slots']
+        if change['event'] == 'new':
+            line = f"🆕 {change['label']}: {len(slots)} slots open"
+            listed = slots
+        elif change['event'] == 'changed':
+            line = f"🔄 {change['label']}: {len(change['added'])} new slots, {len(slots)} open in total"
+            listed = change['added']
+        else:
+            line = f"⏰ {change['label']}: still {len(slots)} slots open"
+            listed = slots
+        line += f". Available times: {', '.join(listed[:MAX_LISTED_SLOTS])}"
+        if len(listed) > MAX_LISTED_SLOTS:
+            line += f" and {len(listed) - MAX_LISTED_SLOTS} more"
+        lines.append(line)
+    return '\n'.join(lines)
\ No newline at end of file
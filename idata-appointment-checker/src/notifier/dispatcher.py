@@ -0,0 +1,145 @@
+import logging
+import threading
+from typing import Callable, Dict, Optional, Set
+
+from .outbox import NotificationOutbox
+
+logger = logging.getLogger(__name__)
+
+# deliver(notification, served_recipients, record) -> None once every recipient is
+# served, else the reason some are still missing; record(outcomes) persists progress
+DeliverFunction = Callable[[Dict, Set[str], Callable[[Dict[str, str]], None]], Optional[str]]
+
+
+class OutboxDispatcher:
+    """
+    Background thread delivering the notifications of an outbox.
+    
+    Delivery is at-least-once: a notification leaves the outbox only after
+    every recipient has been recorded, and recipients are recorded as they
+    are served, so a crash resends at most the messages in flight. Partly
+    delivered notifications are retried with exponential backoff until
+    ``max_attempts`` is reached.
+    """
+    
+    def __init__(self, outbox: NotificationOutbox, deliver: DeliverFunction, interval_seconds: float = 5,
+                 max_attempts: int = 10, retry_base_seconds: float = 30, retry_max_seconds: float = 1800):
+        """
+        Args:
+            outbox: Outbox to drain
+            deliver: Sends one notification to the recipients not yet served
+            interval_seconds: Seconds between polls when not woken by a new notification
+            max_attempts: Delivery attempts before a notification is given up as failed
+            retry_base_seconds: Delay before the first retry, doubled on each further one
+            retry_max_seconds: Longest delay between retries
+        """
+        self.outbox = outbox
+        self.deliver = deliver
+        self.interval_seconds = interval_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.stats = {
+            'sent': 0,
+            'retried': 0,
+            'failed': 0,
+        }
+    
+    def start(self):
+        """Start the dispatcher thread, which first picks up anything left by an earlier run."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='notification-dispatcher', daemon=True)
+        self._thread.start()
+    
+    def wake(self):
+        """Deliver newly enqueued notifications now instead of at the next poll."""
+        self._wake.set()
+    
+    def stop(self, timeout: float = 30):
+        """
+        Stop after the notification being delivered; the rest stay in the outbox for the next start.
+        
+        Args:
+            timeout: Seconds to wait for the current delivery
+        """
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                logger.warning("Notification dispatcher still busy at shutdown; it will resume on restart")
+    
+    def run_once(self) -> int:
+        """
+        Deliver every notification that is due.
+        
+        Returns:
+            Number of notifications worked on
+        """
+        processed = 0
+        while not self._stop.is_set():
+            batch = self.outbox.claim_due()
+            if not batch:
+                break
+            for notification in batch:
+                if self._stop.is_set():
+                    # Unclaimed work is picked up again once its claim runs out or on restart
+                    break
+                self._dispatch(notification)
+                processed += 1
+        return processed
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get counters of sent, retried and failed notifications plus the outbox backlog."""
+        with self._lock:
+            stats = dict(self.stats)
+        stats['pending'] = self.outbox.pending_count()
+        return stats
+    
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Notification dispatcher error: {e}", exc_info=True)
+            self._wake.wait(self.interval_seconds)
+            self._wake.clear()
+    
+    def _dispatch(self, notification: Dict):
+        """Deliver one claimed notification and settle it in the outbox."""
+        notification_id = notification['id']
+        try:
+            served = self.outbox.served_recipients(notification_id)
+            error = self.deliver(notification, served, lambda outcomes: self.outbox.record(notification_id, outcomes))
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        
+        if error is None:
+            self.outbox.complete(notification_id)
+            self._count('sent')
+            logger.info(f"Delivered {notification['kind']} notification {notification_id}")
+            return
+        
+        attempts = notification['attempts'] + 1
+        if attempts >= self.max_attempts:
+            self.outbox.complete(notification_id, status='failed', error=error)
+            self._count('failed')
+            logger.error(f"Giving up on {notification['kind']} notification {notification_id} "
+                         f"after {attempts} attempts: {error}")
+            return
+        
+        delay = min(self.retry_max_seconds, self.retry_base_seconds * 2 ** (attempts - 1))
+        self.outbox.retry_later(notification_id, delay, error)
+        self._count('retried')
+        logger.warning(f"Notification {notification_id} incomplete ({error}), retrying in {delay:g}s")
+    
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
\ No newline at end of file
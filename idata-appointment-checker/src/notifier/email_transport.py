@@ -0,0 +1,215 @@
+import logging
+import smtplib
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Errors after which the SMTP session is gone and a fresh one may succeed
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+
+class SmtpTransport:
+    """
+    Sends email over one kept-alive SMTP session on a background worker.
+    
+    STARTTLS and login happen once per session instead of once per
+    message. The session is reused until it has been idle longer than
+    ``keepalive_seconds`` (servers drop idle clients after a few minutes)
+    and is re-established when the server has hung up. Recipients are sent
+    in BCC batches over the same session; a batch size of 1 sends each
+    recipient their own message addressed to them. All SMTP traffic runs on
+    a single worker thread, which also keeps the session from being used by
+    two threads at once.
+    """
+    
+    def __init__(self, smtp_server: str, smtp_port: int, username: str, password: str, from_email: str,
+                 bcc_batch_size: int = 50, keepalive_seconds: float = 240, timeout: float = 30):
+        """
+        Args:
+            smtp_server: SMTP host
+            smtp_port: SMTP port (STARTTLS)
+            username: SMTP login
+            password: SMTP password
+            from_email: Sender address
+            bcc_batch_size: Recipients per message; 1 sends one message per recipient
+            keepalive_seconds: Idle seconds after which the session is replaced instead of reused
+            timeout: Socket timeout in seconds
+        """
+        self.smtp_server = smtp_server
+        self.smtp_port = smtp_port
+        self.username = username
+        self.password = password
+        self.from_email = from_email
+        self.bcc_batch_size = max(1, bcc_batch_size)
+        self.keepalive_seconds = keepalive_seconds
+        self.timeout = timeout
+        
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='smtp')
+        self._closed = False
+        self._lock = threading.Lock()
+        self.stats = {
+            'connections': 0,
+            'messages': 0,
+            'delivered': 0,
+            'refused': 0,
+            'reconnects': 0,
+        }
+    
+    def warm_up(self) -> Future:
+        """Open the session in the background so the first alert does not wait for the TLS handshake."""
+        return self._executor.submit(self._warm_up)
+    
+    def submit(self, subject: str, text: str, html: Optional[str], recipients: List[str]) -> Future:
+        """
+        Queue an email on the worker.
+        
+        Args:
+            subject: Subject line
+            text: Plain text body
+            html: HTML body (None sends plain text only)
+            recipients: Addresses to deliver to
+        
+        Returns:
+            Future resolving to the report of ``send``
+        """
+        return self._executor.submit(self._send, subject, text, html, list(dict.fromkeys(recipients)))
+    
+    def send(self, subject: str, text: str, html: Optional[str], recipients: List[str],
+             timeout: Optional[float] = 120) -> Dict[str, List[str]]:
+        """
+        Send an email and wait for the result.
+        
+        Args:
+            subject: Subject line
+            text: Plain text body
+            html: HTML body (None sends plain text only)
+            recipients: Addresses to deliver to
+            timeout: Seconds to wait (None waits until done)
+        
+        Returns:
+            Dict with the 'delivered' addresses, the 'rejected' ones the
+            server refused permanently (5xx) and the ones that 'failed'
+            for reasons worth retrying
+        """
+        return self.submit(subject, text, html, recipients).result(timeout)
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get counters of SMTP sessions opened and messages and recipients sent."""
+        with self._lock:
+            return dict(self.stats)
+    
+    def close(self):
+        """Finish queued emails and end the SMTP session."""
+        if self._closed:
+            return
+        self._closed = True
+        self._executor.submit(self._disconnect)
+        self._executor.shutdown(wait=True)
+    
+    def _warm_up(self):
+        try:
+            self._session()
+        except Exception as e:
+            # Not fatal: the next send tries again
+            logger.warning(f"Could not open SMTP session to {self.smtp_server}: {e}")
+    
+    def _send(self, subject: str, text: str, html: Optional[str], recipients: List[str]) -> Dict[str, List[str]]:
+        """Send all batches of one email (runs on the worker)."""
+        report = {'delivered': [], 'rejected': [], 'failed': []}
+        for start in range(0, len(recipients), self.bcc_batch_size):
+            batch = recipients[start:start + self.bcc_batch_size]
+            message = self._build_message(subject, text, html, batch)
+            try:
+                refused = self._send_batch(message, batch)
+            except Exception as e:
+                logger.error(f"Failed to send email to {len(batch)} recipients: {e}")
+                report['failed'].extend(batch)
+                continue
+            
+            for address in batch:
+                if address not in refused:
+                    report['delivered'].append(address)
+                elif refused[address][0] >= 500:
+                    report['rejected'].append(address)
+                else:
+                    report['failed'].append(address)
+            with self._lock:
+                self.stats['messages'] += 1
+                self.stats['delivered'] += len(batch) - len(refused)
+                self.stats['refused'] += len(refused)
+            if refused:
+                logger.warning(f"SMTP server refused {', '.join(refused)}")
+        return report
+    
+    def _build_message(self, subject: str, text: str, html: Optional[str], batch: List[str]) -> MIMEMultipart:
+        """Build the message for one batch; a lone recipient is addressed directly, others are BCC."""
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = subject
+        msg['From'] = self.from_email
+        # BCC recipients only appear in the envelope, so the visible To is the sender
+        msg['To'] = batch[0] if len(batch) == 1 else self.from_email
+        msg.attach(MIMEText(text, 'plain', 'utf-8'))
+        if html:
+            msg.attach(MIMEText(html, 'html', 'utf-8'))
+        return msg
+    
+    def _send_batch(self, message: MIMEMultipart, batch: List[str]) -> Dict:
+        """
+        Send one message to a batch, reconnecting once if the session was lost.
+        
+        Returns:
+            Refused addresses mapped to the server's (code, reply)
+        """
+        for attempt in range(2):
+            try:
+                return self._session().send_message(message, from_addr=self.from_email, to_addrs=batch)
+            except smtplib.SMTPRecipientsRefused as e:
+                return e.recipients
+            except RECONNECT_ERRORS as e:
+                if attempt:
+                    raise
+                logger.info(f"SMTP session lost ({e}), reconnecting")
+                with self._lock:
+                    self.stats['reconnects'] += 1
+                self._disconnect()
+            finally:
+                self._last_used = time.monotonic()
+    
+    def _session(self) -> smtplib.SMTP:
+        """The open SMTP session, connecting and logging in if there is none (runs on the worker)."""
+        if self._smtp is not None and time.monotonic() - self._last_used > self.keepalive_seconds:
+            # The server has most likely dropped it already; a clean new session beats a failed send
+            self._disconnect()
+        
+        if self._smtp is None:
+            start = time.monotonic()
+            smtp = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.timeout)
+            try:
+                smtp.starttls()
+                smtp.login(self.username, self.password)
+            except Exception:
+                smtp.close()
+                raise
+            self._smtp = smtp
+            self._last_used = time.monotonic()
+            with self._lock:
+                self.stats['connections'] += 1
+            logger.debug(f"SMTP session to {self.smtp_server} opened in {time.monotonic() - start:.2f}s")
+        return self._smtp
+    
+    def _disconnect(self):
+        """End the SMTP session, if any (runs on the worker)."""
+        smtp, self._smtp = self._smtp, None
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
\ No newline at end of file
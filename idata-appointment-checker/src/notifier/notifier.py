@@ -1,14 +1,16 @@
-import asyncio
 import logging
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from typing import Dict, List, Optional
+import threading
+from typing import Callable, Dict, List, Optional, Set
 
 import requests
 
+from .email_transport import SmtpTransport
+
 logger = logging.getLogger(__name__)
 
+# Telegram chats sent to between two outbox progress records
+DELIVERY_BATCH_SIZE = 100
+
 
 class Notifier:
     """Handles notifications via Telegram and Email."""
@@ -21,21 +23,75 @@ class Notifier:
         if self.telegram_enabled:
             self.telegram_bot_token = config['telegram']['bot_token']
             self.telegram_chat_id = config['telegram'].get('chat_id', 0)
+            # Global send rate and concurrency of multi-user broadcasts
+            self.broadcast_options = {
+                'messages_per_second': config['telegram'].get('broadcast_rate', 25),
+                'max_concurrency': config['telegram'].get('broadcast_concurrency', 30),
+            }
+        
+        # Event loop, Bot and user store shared by all broadcasts, started on first use
+        self._runtime = None
+        self._runtime_lock = threading.Lock()
         
         if self.email_enabled:
             self.email_config = config['email']
+            self.email_recipients = [address.strip() for address in self.email_config['to_email'].split(',')
+                                     if address.strip()]
+            # One kept-alive SMTP session on a worker thread instead of a new login per email
+            self.email_transport = SmtpTransport(
+                self.email_config['smtp_server'],
+                self.email_config['smtp_port'],
+                self.email_config['smtp_username'],
+                self.email_config['smtp_password'],
+                self.email_config['from_email'],
+                bcc_batch_size=self.email_config.get('bcc_batch_size', 50),
+                keepalive_seconds=self.email_config.get('keepalive_seconds', 240)
+            )
+        
+        # Durable outbox and its dispatcher thread; without them notifications are sent synchronously
+        self.outbox = None
+        self.dispatcher = None
+        notifications_config = config.get('notifications', {})
+        if notifications_config.get('outbox', False) and (self.telegram_enabled or self.email_enabled):
+            from .dispatcher import OutboxDispatcher
+            from .outbox import NotificationOutbox
+            
+            self.outbox = NotificationOutbox(
+                database_url=self._database_url(),
+                path=notifications_config.get('outbox_file', 'notification_outbox.jsonl')
+            )
+            self.dispatcher = OutboxDispatcher(
+                self.outbox,
+                self._deliver,
+                interval_seconds=notifications_config.get('dispatch_interval_seconds', 5),
+                max_attempts=notifications_config.get('max_attempts', 10)
+            )
+    
+    def start(self):
+        """Start delivering queued notifications, including any left over from an earlier run."""
+        if self.email_enabled:
+            self.email_transport.warm_up()
+        if self.dispatcher:
+            self.dispatcher.start()
     
-    def send_notification(self, subject: str, message: str) -> bool:
+    def send_notification(self, subject: str, message: str, kind: str = 'notification') -> bool:
         """
         Send notification via all enabled channels.
         
+        With the outbox enabled the notification is only queued, and this
+        returns as soon as it is stored; the dispatcher delivers it.
+        
         Args:
             subject: Notification subject
             message: Notification message
+            kind: Notification type recorded in the outbox
             
         Returns:
-            True if at least one notification was sent successfully
+            True if the notification was queued or at least one channel sent it successfully
         """
+        if self._enqueue(kind, subject, message, f"🔔 *{subject}*\n\n{message}"):
+            return True
+        
         success = False
         
         if self.telegram_enabled:
@@ -43,7 +99,7 @@ class Notifier:
                 success = True
         
         if self.email_enabled:
-            if self._send_email(subject, message):
+            if self._send_email(subject, message)['delivered']:
                 success = True
         
         return success
@@ -65,26 +121,7 @@ class Notifier:
             
             # Try to send to multiple users first
             try:
-                from ..bot.bot_handler import send_message_to_all_users
-                
-                # Build database URL if available
-                database_url = None
-                if hasattr(self, 'config') and self.config.get('database', {}).get('enabled'):
-                    db_config = self.config['database']
-                    if db_config['url']:
-                        database_url = db_config['url']
-                    else:
-                        database_url = (
-                            f"postgresql://{db_config['user']}:{db_config['password']}"
-                            f"@{db_config['host']}:{db_config['port']}/{db_config['name']}"
-                        )
-                
-                result = asyncio.run(send_message_to_all_users(
-                    self.telegram_bot_token,
-                    full_message,
-                    database_url=database_url,
-                    users_file="users.json"
-                ))
+                result = self._telegram_runtime().broadcast(full_message)
                 if result > 0:
                     logger.info(f"Telegram notification sent to {result} users")
                     return True
@@ -113,24 +150,141 @@ class Notifier:
             logger.error(f"Failed to send Telegram notification: {e}")
             return False
     
-    def _send_email(self, subject: str, message: str) -> bool:
+    def _enqueue(self, kind: str, subject: str, message: str, telegram_text: str) -> bool:
+        """
+        Queue a notification for the dispatcher.
+        
+        Returns:
+            True if queued; False if there is no outbox or it could not store
+            the notification, in which case the caller sends it directly
+        """
+        if not self.outbox:
+            return False
+        
+        try:
+            self.outbox.enqueue(kind, subject, message, telegram_text)
+        except Exception as e:
+            logger.error(f"Failed to queue {kind} notification, sending it directly: {e}")
+            return False
+        
+        self.dispatcher.start()
+        self.dispatcher.wake()
+        return True
+    
+    def _deliver(self, notification: Dict, served: Set[str],
+                 record: Callable[[Dict[str, str]], None]) -> Optional[str]:
+        """
+        Send a queued notification to every recipient not served yet.
+        
+        Called by the dispatcher. Telegram chats are sent to in batches and
+        each batch is recorded before the next, so after a crash only the
+        batch in flight can be sent twice.
+        
+        Args:
+            notification: Outbox notification
+            served: Recipient keys already delivered to
+            record: Persists recipient key -> outcome
+            
+        Returns:
+            None when every recipient is served, else what is still missing
+        """
+        missing = []
+        
+        if self.telegram_enabled:
+            runtime = self._telegram_runtime()
+            chat_ids = runtime.subscribers()
+            if not chat_ids and self.telegram_chat_id:
+                # Fallback to single chat ID for backward compatibility
+                chat_ids = [self.telegram_chat_id]
+            if not chat_ids:
+                logger.warning("No Telegram recipients configured")
+            
+            pending = [chat_id for chat_id in chat_ids if f"telegram:{chat_id}" not in served]
+            failed = 0
+            for start in range(0, len(pending), DELIVERY_BATCH_SIZE):
+                batch = pending[start:start + DELIVERY_BATCH_SIZE]
+                report = runtime.send_to(batch, notification['telegram_text'])
+                outcomes = {f"telegram:{chat_id}": 'delivered' for chat_id in report['delivered_to']}
+                outcomes.update({f"telegram:{chat_id}": 'unreachable' for chat_id in report['unreachable']})
+                record(outcomes)
+                failed += len(batch) - len(outcomes)
+            if pending:
+                logger.info(f"Telegram {notification['kind']} notification sent to {len(pending) - failed} users")
+            if failed:
+                missing.append(f"{failed} Telegram chats failed")
+        
+        if self.email_enabled:
+            pending = [address for address in self.email_recipients if f"email:{address}" not in served]
+            if pending:
+                report = self._send_email(notification['subject'], notification['message'], pending)
+                outcomes = {f"email:{address}": 'delivered' for address in report['delivered']}
+                # Permanently refused addresses are not retried
+                outcomes.update({f"email:{address}": 'unreachable' for address in report['rejected']})
+                record(outcomes)
+                if report['failed']:
+                    missing.append(f"{len(report['failed'])} email recipients failed")
+        
+        return '; '.join(missing) or None
+    
+    def _database_url(self) -> Optional[str]:
+        """Database URL from the config, or None when the database is disabled."""
+        if not self.config.get('database', {}).get('enabled'):
+            return None
+        db_config = self.config['database']
+        if db_config['url']:
+            return db_config['url']
+        return (
+            f"postgresql://{db_config['user']}:{db_config['password']}"
+            f"@{db_config['host']}:{db_config['port']}/{db_config['name']}"
+        )
+    
+    def _telegram_runtime(self):
+        """
+        The long-lived broadcast runtime, created on first use.
+        
+        Returns:
+            NotifierRuntime shared by every Telegram notification of this notifier
+        """
+        with self._runtime_lock:
+            if self._runtime is None:
+                from .runtime import NotifierRuntime
+                
+                self._runtime = NotifierRuntime(
+                    self.telegram_bot_token,
+                    database_url=self._database_url(),
+                    users_file="users.json",
+                    **self.broadcast_options
+                )
+            return self._runtime
+    
+    def close(self):
+        """Stop the dispatcher and the Telegram runtime and release their connections."""
+        if self.dispatcher:
+            # Undelivered notifications stay in the outbox for the next start
+            self.dispatcher.stop()
+        with self._runtime_lock:
+            runtime, self._runtime = self._runtime, None
+        if runtime:
+            runtime.close()
+        if self.email_enabled:
+            self.email_transport.close()
+        if self.outbox:
+            self.outbox.close()
+    
+    def _send_email(self, subject: str, message: str, recipients: Optional[List[str]] = None) -> Dict[str, List[str]]:
         """
         Send notification via Email.
         
         Args:
             subject: Email subject
             message: Email message
+            recipients: Addresses to send to (defaults to every configured address)
             
         Returns:
-            True if sent successfully
+            SmtpTransport report: 'delivered', 'rejected' and 'failed' addresses
         """
+        recipients = self.email_recipients if recipients is None else recipients
         try:
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = self.email_config['from_email']
-            msg['To'] = self.email_config['to_email']
-            
             # Create HTML content
             html_content = f"""
             <html>
@@ -143,24 +297,18 @@ class Notifier:
             </html>
             """
             
-            # Attach parts
-            text_part = MIMEText(message, 'plain', 'utf-8')
-            html_part = MIMEText(html_content, 'html', 'utf-8')
-            msg.attach(text_part)
-            msg.attach(html_part)
-            
-            # Send email
-            with smtplib.SMTP(self.email_config['smtp_server'], self.email_config['smtp_port']) as server:
-                server.starttls()
-                server.login(self.email_config['smtp_username'], self.email_config['smtp_password'])
-                server.send_message(msg)
+            # Sent on the transport's worker over its kept-alive session
+            report = self.email_transport.send(subject, message, html_content, recipients)
             
-            logger.info("Email notification sent successfully")
-            return True
+            if report['delivered']:
+                logger.info(f"Email notification sent to {len(report['delivered'])}/{len(recipients)} recipients")
+            else:
+                logger.error("Failed to send email notification to any recipient")
+            return report
             
         except Exception as e:
             logger.error(f"Failed to send email notification: {e}")
-            return False
+            return {'delivered': [], 'rejected': [], 'failed': list(recipients)}
     
     def send_appointment_available_notification(self, details: str):
         """
@@ -172,7 +320,7 @@ class Notifier:
         subject = "✅ Italy Visa Appointments Available!"
         message = f"Great news! Italy visa appointments are now available.\n\n{details}\n\nAct quickly as appointments may fill up fast!"
         
-        self.send_notification(subject, message)
+        self.send_notification(subject, message, kind='appointment')
     
     def send_error_notification(self, error: str):
         """
@@ -184,7 +332,7 @@ class Notifier:
         subject = "❌ IDATA Appointment Checker Error"
         message = f"An error occurred while checking appointments:\n\n{error}\n\nPlease check the logs for more details."
         
-        self.send_notification(subject, message)
+        self.send_notification(subject, message, kind='error')
     
     def send_status_notification(self, status: str):
         """
@@ -195,31 +343,16 @@ class Notifier:
         """
         subject = "ℹ️ IDATA Appointment Checker Status"
         
+        # The status text already contains Telegram formatting, so it is sent as is
+        if self._enqueue('status', subject, status, status):
+            return
+        
         # For Telegram, we'll send the status message directly since it already contains formatting
         if self.telegram_enabled:
             try:
                 # Try to send to multiple users first
                 try:
-                    from ..bot.bot_handler import send_message_to_all_users
-                    
-                    # Build database URL if available
-                    database_url = None
-                    if hasattr(self, 'config') and self.config.get('database', {}).get('enabled'):
-                        db_config = self.config['database']
-                        if db_config['url']:
-                            database_url = db_config['url']
-                        else:
-                            database_url = (
-                                f"postgresql://{db_config['user']}:{db_config['password']}"
-                                f"@{db_config['host']}:{db_config['port']}/{db_config['name']}"
-                            )
-                    
-                    result = asyncio.run(send_message_to_all_users(
-                        self.telegram_bot_token,
-                        status,
-                        database_url=database_url,
-                        users_file="users.json"
-                    ))
+                    result = self._telegram_runtime().broadcast(status)
                     if result > 0:
                         logger.info(f"Telegram status notification sent to {result} users")
                     else:
@@ -0,0 +1,364 @@
+import json
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from ..database.models import DatabaseManager, OutboxDelivery, OutboxNotification
+from ..utils.atomic_json import atomic_open
+
+logger = logging.getLogger(__name__)
+
+# How long a claimed notification stays invisible to other dispatchers;
+# if its dispatcher dies, the notification becomes due again afterwards
+CLAIM_SECONDS = 600
+
+
+class NotificationOutbox:
+    """
+    Durable queue of notifications waiting to be delivered.
+    
+    Checks enqueue a notification and return at once; a dispatcher later
+    claims due notifications and records every recipient it served under a
+    (notification, recipient) key, so a restart resumes with the recipients
+    that are still missing and nobody is sent the same notification twice
+    on purpose. Notifications live in the database when one is configured,
+    otherwise in an append-only JSON lines file.
+    """
+    
+    def __init__(self, database_url: Optional[str] = None, path: str = "notification_outbox.jsonl"):
+        """
+        Args:
+            database_url: Database holding the outbox tables (None uses the file)
+            path: JSON lines file used without a database
+        """
+        self.path = path
+        self.db_manager = None
+        self._lock = threading.Lock()
+        # File backend state, rebuilt from the log on startup
+        self._notifications: Dict[str, Dict] = {}
+        self._deliveries: Dict[str, Dict[str, str]] = {}
+        
+        if database_url:
+            try:
+                self.db_manager = DatabaseManager(database_url)
+                self.db_manager.create_tables()
+                logger.info("Notification outbox stored in the database")
+            except Exception as e:
+                logger.error(f"Failed to open notification outbox in database: {e}")
+                logger.info("Falling back to notification outbox file")
+                self.db_manager = None
+        
+        if not self.db_manager:
+            self._load_file()
+    
+    def enqueue(self, kind: str, subject: str, message: str, telegram_text: str) -> str:
+        """
+        Store a notification for delivery.
+        
+        Args:
+            kind: Notification type, e.g. 'appointment', 'error' or 'status'
+            subject: Email subject
+            message: Email body
+            telegram_text: Markdown text sent to Telegram chats
+        
+        Returns:
+            Notification id
+        """
+        notification = {
+            'id': uuid.uuid4().hex,
+            'kind': kind,
+            'subject': subject,
+            'message': message,
+            'telegram_text': telegram_text,
+            'attempts': 0,
+            'next_attempt_at': datetime.now(),
+            'created_at': datetime.now(),
+        }
+        
+        if self.db_manager:
+            session = self.db_manager.get_session()
+            try:
+                session.add(OutboxNotification(status='pending', **notification))
+                session.commit()
+            except SQLAlchemyError:
+                session.rollback()
+                raise
+            finally:
+                session.close()
+        else:
+            with self._lock:
+                self._append({'op': 'enqueue', **notification})
+                self._notifications[notification['id']] = notification
+                self._deliveries[notification['id']] = {}
+        
+        logger.debug(f"Queued {kind} notification {notification['id']}")
+        return notification['id']
+    
+    def claim_due(self, limit: int = 10) -> List[Dict]:
+        """
+        Take the pending notifications that are due, oldest first.
+        
+        Claimed notifications are not due again for CLAIM_SECONDS, so
+        several dispatchers on one database never work on the same one.
+        
+        Args:
+            limit: Most notifications to claim
+        
+        Returns:
+            Notification dicts with 'id', 'kind', 'subject', 'message',
+            'telegram_text' and 'attempts'
+        """
+        now = datetime.now()
+        claimed_until = now + timedelta(seconds=CLAIM_SECONDS)
+        
+        if self.db_manager:
+            session = self.db_manager.get_session()
+            try:
+                rows = session.query(OutboxNotification).filter(
+                    OutboxNotification.status == 'pending',
+                    OutboxNotification.next_attempt_at <= now
+                ).order_by(OutboxNotification.created_at).limit(limit).with_for_update(skip_locked=True).all()
+                
+                claimed = []
+                for row in rows:
+                    row.next_attempt_at = claimed_until
+                    claimed.append({
+                        'id': row.id,
+                        'kind': row.kind,
+                        'subject': row.subject,
+                        'message': row.message,
+                        'telegram_text': row.telegram_text,
+                        'attempts': row.attempts,
+                    })
+                session.commit()
+                return claimed
+            except SQLAlchemyError as e:
+                session.rollback()
+                logger.error(f"Database error claiming notifications: {e}")
+                return []
+            finally:
+                session.close()
+        
+        with self._lock:
+            due = sorted((n for n in self._notifications.values() if n['next_attempt_at'] <= now),
+                         key=lambda n: n['created_at'])[:limit]
+            for notification in due:
+                notification['next_attempt_at'] = claimed_until
+            return [dict(notification) for notification in due]
+    
+    def served_recipients(self, notification_id: str) -> Set[str]:
+        """
+        Get the recipients a notification has already been delivered to.
+        
+        Args:
+            notification_id: Notification id
+        
+        Returns:
+            Recipient keys, e.g. {'telegram:123456', 'email'}
+        """
+        if self.db_manager:
+            session = self.db_manager.get_session()
+            try:
+                rows = session.query(OutboxDelivery.recipient).filter(
+                    OutboxDelivery.notification_id == notification_id
+                ).all()
+                return {row.recipient for row in rows}
+            finally:
+                session.close()
+        
+        with self._lock:
+            return set(self._deliveries.get(notification_id, {}))
+    
+    def record(self, notification_id: str, outcomes: Dict[str, str]):
+        """
+        Record recipients a notification has been dealt with.
+        
+        Args:
+            notification_id: Notification id
+            outcomes: Recipient key -> 'delivered' or 'unreachable'
+        """
+        if not outcomes:
+            return
+        
+        if self.db_manager:
+            session = self.db_manager.get_session()
+            try:
+                served = {row.recipient for row in session.query(OutboxDelivery.recipient).filter(
+                    OutboxDelivery.notification_id == notification_id
+                ).all()}
+                for recipient, outcome in outcomes.items():
+                    if recipient not in served:
+                        session.add(OutboxDelivery(notification_id=notification_id, recipient=recipient,
+                                                   outcome=outcome, delivered_at=datetime.now()))
+                session.commit()
+            except IntegrityError:
+                # Another dispatcher recorded some of them first; nothing is lost
+                session.rollback()
+            finally:
+                session.close()
+            return
+        
+        with self._lock:
+            if notification_id not in self._deliveries:
+                return
+            self._append({'op': 'record', 'id': notification_id, 'outcomes': outcomes})
+            self._deliveries[notification_id].update(outcomes)
+    
+    def complete(self, notification_id: str, status: str = 'sent', error: Optional[str] = None):
+        """
+        Take a notification out of the queue.
+        
+        Args:
+            notification_id: Notification id
+            status: 'sent', or 'failed' once retries are exhausted
+            error: Last delivery error
+        """
+        if self.db_manager:
+            self._update_db(notification_id, status=status, last_error=error, completed_at=datetime.now())
+            return
+        
+        with self._lock:
+            if self._notifications.pop(notification_id, None) is None:
+                return
+            self._deliveries.pop(notification_id, None)
+            if self._notifications:
+                self._append({'op': 'complete', 'id': notification_id, 'status': status})
+            else:
+                # Nothing left to resume: start the log afresh instead of letting it grow
+                self._rewrite()
+    
+    def retry_later(self, notification_id: str, delay_seconds: float, error: Optional[str] = None):
+        """
+        Put a partly delivered notification back in the queue.
+        
+        Args:
+            notification_id: Notification id
+            delay_seconds: Seconds until the next attempt
+            error: Delivery error of this attempt
+        """
+        next_attempt_at = datetime.now() + timedelta(seconds=delay_seconds)
+        
+        if self.db_manager:
+            session = self.db_manager.get_session()
+            try:
+                row = session.get(OutboxNotification, notification_id)
+                if row:
+                    row.attempts += 1
+                    row.next_attempt_at = next_attempt_at
+                    row.last_error = error
+                    session.commit()
+            except SQLAlchemyError as e:
+                session.rollback()
+                logger.error(f"Database error rescheduling notification {notification_id}: {e}")
+            finally:
+                session.close()
+            return
+        
+        with self._lock:
+            notification = self._notifications.get(notification_id)
+            if notification is None:
+                return
+            notification['attempts'] += 1
+            notification['next_attempt_at'] = next_attempt_at
+            self._append({'op': 'retry', 'id': notification_id, 'attempts': notification['attempts'],
+                          'next_attempt_at': next_attempt_at.isoformat(), 'error': error})
+    
+    def pending_count(self) -> int:
+        """Get the number of notifications not yet fully delivered."""
+        if self.db_manager:
+            session = self.db_manager.get_session()
+            try:
+                return session.query(OutboxNotification).filter(OutboxNotification.status == 'pending').count()
+            except SQLAlchemyError as e:
+                logger.error(f"Database error counting pending notifications: {e}")
+                return 0
+            finally:
+                session.close()
+        
+        with self._lock:
+            return len(self._notifications)
+    
+    def close(self):
+        """Close the database connection."""
+        if self.db_manager:
+            self.db_manager.close()
+    
+    def _update_db(self, notification_id: str, **values):
+        """Set columns of one notification row."""
+        session = self.db_manager.get_session()
+        try:
+            session.query(OutboxNotification).filter(OutboxNotification.id == notification_id).update(values)
+            session.commit()
+        except SQLAlchemyError as e:
+            session.rollback()
+            logger.error(f"Database error updating notification {notification_id}: {e}")
+        finally:
+            session.close()
+    
+    def _append(self, event: Dict):
+        """Durably append one event to the log (called with the lock held)."""
+        line = json.dumps(event, default=lambda value: value.isoformat(), ensure_ascii=False)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+    
+    def _rewrite(self):
+        """Replace the log with one holding only the pending notifications (called with the lock held)."""
+        with atomic_open(self.path, fsync=True) as f:
+            for notification_id, notification in self._notifications.items():
+                f.write(json.dumps({'op': 'enqueue', **notification}, default=lambda value: value.isoformat(),
+                                   ensure_ascii=False) + '\n')
+                outcomes = self._deliveries.get(notification_id)
+                if outcomes:
+                    f.write(json.dumps({'op': 'record', 'id': notification_id, 'outcomes': outcomes}) + '\n')
+    
+    def _load_file(self):
+        """Replay the log left by an earlier run and compact it."""
+        if not os.path.exists(self.path):
+            return
+        
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for number, line in enumerate(f, 1):
+                try:
+                    event = json.loads(line)
+                    self._apply(event)
+                except (ValueError, KeyError, TypeError) as e:
+                    # A line cut short by a crash mid-write; everything before it is intact
+                    logger.warning(f"Skipping unreadable outbox line {number}: {e}")
+        
+        now = datetime.now()
+        for notification in self._notifications.values():
+            # Claims do not survive a restart
+            notification['next_attempt_at'] = min(notification['next_attempt_at'], now)
+        
+        if self._notifications:
+            logger.info(f"Resuming {len(self._notifications)} undelivered notifications")
+        with self._lock:
+            self._rewrite()
+    
+    def _apply(self, event: Dict):
+        """Apply one log event to the in-memory state."""
+        op = event['op']
+        notification_id = event['id']
+        if op == 'enqueue':
+            notification = {key: value for key, value in event.items() if key != 'op'}
+            notification['created_at'] = datetime.fromisoformat(notification['created_at'])
+            notification['next_attempt_at'] = datetime.fromisoformat(notification['next_attempt_at'])
+            self._notifications[notification_id] = notification
+            self._deliveries.setdefault(notification_id, {})
+        elif notification_id not in self._notifications:
+            return
+        elif op == 'record':
+            self._deliveries[notification_id].update(event['outcomes'])
+        elif op == 'retry':
+            self._notifications[notification_id]['attempts'] = event['attempts']
+            self._notifications[notification_id]['next_attempt_at'] = datetime.fromisoformat(event['next_attempt_at'])
+        elif op == 'complete':
+            del self._notifications[notification_id]
+            del self._deliveries[notification_id]
\ No newline at end of file
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Iterable, List, Optional
+
+from ..bot.bot_handler import broadcast_to_users, create_broadcast_bot
+from ..bot.broadcast import GLOBAL_MESSAGES_PER_SECOND, Broadcaster
+from ..bot.user_manager import UserManager
+
+logger = logging.getLogger(__name__)
+
+
+class NotifierRuntime:
+    """
+    Long-lived home of the Telegram broadcast machinery.
+    
+    One background thread runs an event loop for the life of the process
+    and owns one Bot with its HTTP connection pool, one Broadcaster (so
+    rate-limit state carries over between notifications) and one
+    UserManager with its database engine. Synchronous code hands messages
+    to it from any thread; nothing is set up again per notification.
+    """
+    
+    def __init__(self, bot_token: str, database_url: Optional[str] = None, users_file: str = "users.json",
+                 messages_per_second: float = GLOBAL_MESSAGES_PER_SECOND, max_concurrency: int = 30):
+        """
+        Args:
+            bot_token: Telegram bot token
+            database_url: Subscriber database (None stores subscribers in users_file)
+            users_file: JSON subscriber list used without a database
+            messages_per_second: Global broadcast send rate
+            max_concurrency: Sends in flight at once
+        """
+        self.bot_token = bot_token
+        self.messages_per_second = messages_per_second
+        self.max_concurrency = max_concurrency
+        self.user_manager = UserManager(database_url=database_url, users_file=users_file)
+        
+        self._bot = None
+        self._broadcaster: Optional[Broadcaster] = None
+        self._lock = threading.Lock()
+        self.stats = {
+            'broadcasts': 0,
+            'delivered': 0,
+            'failed': 0,
+        }
+        
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name='notifier-loop', daemon=True)
+        self._thread.start()
+    
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+    
+    def submit(self, message: str) -> Future:
+        """
+        Queue a broadcast to all subscribers without waiting for it.
+        
+        Args:
+            message: Markdown message text
+        
+        Returns:
+            Future resolving to the number of subscribers reached
+        """
+        return asyncio.run_coroutine_threadsafe(self._broadcast(message), self._loop)
+    
+    def broadcast(self, message: str, timeout: Optional[float] = 300) -> int:
+        """
+        Send a message to all subscribers and wait for the result.
+        
+        Args:
+            message: Markdown message text
+            timeout: Seconds to wait (None waits until done)
+        
+        Returns:
+            Number of subscribers the message reached
+        
+        Raises:
+            Exception: Whatever the broadcast raised (e.g. an invalid token)
+        """
+        return self.submit(message).result(timeout)
+    
+    def subscribers(self) -> List[int]:
+        """Get the chat ids of all active subscribers."""
+        return self.user_manager.get_all_users()
+    
+    def send_to(self, chat_ids: Iterable[int], message: str, timeout: Optional[float] = 300) -> Dict:
+        """
+        Send a message to the given chats and wait for the result.
+        
+        Subscribers that turn out to have blocked the bot are unsubscribed.
+        
+        Args:
+            chat_ids: Recipients
+            message: Markdown message text
+            timeout: Seconds to wait (None waits until done)
+        
+        Returns:
+            Broadcaster report, including 'delivered_to' and 'unreachable' chat ids
+        """
+        future = asyncio.run_coroutine_threadsafe(self._send_to(list(chat_ids), message), self._loop)
+        return future.result(timeout)
+    
+    async def _get_broadcaster(self) -> Broadcaster:
+        """The Broadcaster, with its Bot created and initialized on first use."""
+        if self._bot is None:
+            # Created on first use so startup never waits on Telegram
+            bot = create_broadcast_bot(self.bot_token, self.max_concurrency)
+            await bot.initialize()
+            self._broadcaster = Broadcaster(bot, messages_per_second=self.messages_per_second,
+                                            max_concurrency=self.max_concurrency)
+            self._bot = bot
+        return self._broadcaster
+    
+    async def _send_to(self, chat_ids: List[int], message: str) -> Dict:
+        """Send to specific chats on the runtime's loop."""
+        broadcaster = await self._get_broadcaster()
+        report = await broadcaster.send_all(chat_ids, message)
+        loop = asyncio.get_running_loop()
+        for chat_id in report['unreachable']:
+            if await loop.run_in_executor(None, self.user_manager.remove_user, chat_id):
+                logger.info(f"Removed inactive user {chat_id}")
+        with self._lock:
+            self.stats['delivered'] += report['delivered']
+        return report
+    
+    async def _broadcast(self, message: str) -> int:
+        """Run one broadcast on the runtime's loop."""
+        start = time.monotonic()
+        try:
+            broadcaster = await self._get_broadcaster()
+            delivered = await broadcast_to_users(broadcaster, self.user_manager, message)
+        except Exception:
+            with self._lock:
+                self.stats['failed'] += 1
+            raise
+        
+        with self._lock:
+            self.stats['broadcasts'] += 1
+            self.stats['delivered'] += delivered
+        logger.debug(f"Broadcast to {delivered} subscribers took {time.monotonic() - start:.2f}s")
+        return delivered
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get counters of broadcasts and delivered messages since startup."""
+        with self._lock:
+            return dict(self.stats)
+    
+    def close(self, timeout: float = 10):
+        """Close the Bot's connections and stop the event loop."""
+        if not self._thread.is_alive():
+            return
+        if self._bot is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(self._bot.shutdown(), self._loop).result(timeout)
+            except Exception as e:
+                logger.debug(f"Error shutting down notifier bot: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            self._loop.close()
+        if self.user_manager.db_manager:
+            self.user_manager.db_manager.close()
\ No newline at end of file
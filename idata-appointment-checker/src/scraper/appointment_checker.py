@@ -1,21 +1,35 @@
+import base64
 import logging
+import threading
 import time
-from typing import Dict, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
+import requests
+from lxml import etree
 from selenium import webdriver
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import Select, WebDriverWait
+from selenium.webdriver.support.ui import Select
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 import shutil
 import os
 
+from src.captcha.corpus import CaptchaCorpus
+from src.captcha.service import CaptchaService
 from src.captcha.solver import CaptchaSolver
+from src.scraper import captcha_retry
+from src.scraper.captcha_retry import CaptchaRetryPolicy
+from src.scraper.driver_pool import DriverPool
+from src.scraper.http_checker import HttpAppointmentClient, HttpFlowError
+from src.scraper.image_capture import read_displayed_image
+from src.scraper.resource_blocker import ResourceBlocker
+from src.scraper.result_parser import NO_APPOINTMENT_TEXT, parse_result_page
+from src.scraper.session_store import SessionStore
+from src.scraper.waits import PageWaiter
 
 logger = logging.getLogger(__name__)
 
@@ -26,22 +40,131 @@ class AppointmentChecker:
     BASE_URL = "https://it-tr-appointment.idata.com.tr"
     MAIN_PAGE = "/tr"
     APPOINTMENT_FORM = "/tr/appointment-form"
-    NO_APPOINTMENT_TEXT = "Uygun randevu tarihi bulunmamaktadır"
+    NO_APPOINTMENT_TEXT = NO_APPOINTMENT_TEXT
+    _DIALOG_VISIBLE_JS = """
+        var modal = document.querySelector('.swal2-modal');
+        return !!modal && modal.style.display !== 'none';
+    """
+    _DISMISS_DIALOG_JS = """
+        var button = document.querySelector('.swal2-confirm');
+        if (button) { button.click(); }
+    """
+    # innerText skips <script>, whose language strings always contain "yanlış"
+    _VISIBLE_TEXT_JS = "return document.body ? document.body.innerText.toLowerCase() : '';"
+    CAPTCHA_ERROR_WORDS = ("hatalı", "yanlış", "geçersiz")
+    # Controls that load a new CAPTCHA in place; the page is reloaded when there is none
+    CAPTCHA_REFRESH_SELECTOR = (
+        ".captcha-refresh, .refreshCaptcha, #refreshCaptcha, #captcha-refresh, "
+        "a[onclick*='aptcha'], button[onclick*='aptcha'], i.fa-refresh"
+    )
     
-    def __init__(self, headless: bool = True):
+    def __init__(self, headless: bool = True, config: Optional[Dict] = None):
         self.headless = headless
+        self._local = threading.local()
         self.driver = None
-        self.captcha_solver = CaptchaSolver()
-        self.form_data = {
+        # Solve in worker processes when checks run concurrently, otherwise inline
+        service_workers = (config or {}).get('captcha', {}).get('service_workers', 0)
+        if service_workers:
+            self.captcha_solver = CaptchaService(config, workers=service_workers)
+        else:
+            self.captcha_solver = CaptchaSolver(config)
+        # Opt-in: keep every CAPTCHA with its guess and verdict for solver benchmarks
+        capture_dir = (config or {}).get('captcha', {}).get('capture_dir')
+        self.captcha_corpus = CaptchaCorpus(capture_dir) if capture_dir else None
+        self.form_data = (config or {}).get('appointment') or {
             'residence_city': 'İstanbul',
             'idata_offices': ['Altunizade', 'Gayrettepe'],
             'travel_purpose': 'Tourism',
             'service_type': 'Standard',
             'num_persons': '3'
         }
+        self.profiles = self._build_profiles()
+        # Labels only need more than the office name when profiles differ elsewhere
+        self._uniform_profiles = len({
+            (p['residence_city'], p['travel_purpose'], p['service_type'], p['num_persons'])
+            for p in self.profiles
+        }) <= 1
+        
+        scraper_config = (config or {}).get('scraper', {})
+        # Lets benchmarks point the checker at a local stand-in (src/devtools/fake_idata.py)
+        self.BASE_URL = scraper_config.get('base_url') or self.BASE_URL
+        self.concurrency = max(1, scraper_config.get('check_concurrency', 1))
+        self.office_timeout = scraper_config.get('office_timeout_seconds', 300)
+        self.step_timeouts = scraper_config.get('step_timeouts', {})
+        self.last_results: List[dict] = []
+        
+        # Wrong OCR guesses are retried on the same session instead of failing the office
+        self.captcha_retry = CaptchaRetryPolicy(
+            max_attempts=scraper_config.get('captcha_max_attempts', 3),
+            time_budget_seconds=scraper_config.get('captcha_time_budget_seconds', 60),
+            max_skips=scraper_config.get('captcha_max_skips', 2)
+        )
+        
+        self.resource_blocker = None
+        if scraper_config.get('block_resources', True):
+            self.resource_blocker = ResourceBlocker(
+                block_types=scraper_config.get('blocked_resource_types'),
+                deny_patterns=scraper_config.get('blocked_url_patterns'),
+                allow_patterns=scraper_config.get('allowed_url_patterns')
+            )
+        
+        # Every concurrent worker needs its own browser session
+        self.driver_pool = DriverPool(
+            self._create_driver,
+            size=max(scraper_config.get('driver_pool_size', 1), self.concurrency),
+            max_uses=scraper_config.get('driver_max_uses', 25),
+            reset_cookies=scraper_config.get('driver_reset_cookies', True),
+            reset_storage=scraper_config.get('driver_reset_storage', True)
+        )
+        
+        self.session_store = None
+        if scraper_config.get('session_persistence', True):
+            self.session_store = SessionStore(
+                path=scraper_config.get('session_file', 'session_state.json'),
+                max_age_minutes=scraper_config.get('session_max_age_minutes', 20)
+            )
+        
+        # Optional browserless backend; Selenium remains the fallback
+        self.http_client = None
+        if scraper_config.get('backend', 'selenium') == 'http':
+            self.http_client = HttpAppointmentClient(
+                self.BASE_URL,
+                self.MAIN_PAGE,
+                self.APPOINTMENT_FORM,
+                self.captcha_solver,
+                session_store=self.session_store,
+                captcha_retry=self.captcha_retry,
+                captcha_corpus=self.captcha_corpus,
+                timeout=scraper_config.get('http_timeout_seconds', 15),
+                pool_size=max(4, self.concurrency),
+                cooldown_minutes=scraper_config.get('http_cooldown_minutes', 30)
+            )
     
-    def _init_driver(self):
-        """Initialize Selenium WebDriver."""
+    @property
+    def driver(self):
+        """WebDriver used by the current worker thread."""
+        return getattr(self._local, 'driver', None)
+    
+    @driver.setter
+    def driver(self, value):
+        self._local.driver = value
+    
+    @property
+    def waiter(self) -> Optional[PageWaiter]:
+        """Page waiter bound to the current worker thread's driver."""
+        return getattr(self._local, 'waiter', None)
+    
+    @waiter.setter
+    def waiter(self, value: Optional[PageWaiter]):
+        self._local.waiter = value
+    
+    def _create_driver(self):
+        """
+        Create a new Selenium WebDriver.
+        
+        Returns:
+            Configured Chrome/Chromium WebDriver
+        """
         options = Options()
         if self.headless:
             options.add_argument('--headless')
@@ -51,69 +174,71 @@ class AppointmentChecker:
         options.add_experimental_option("excludeSwitches", ["enable-automation"])
         options.add_experimental_option('useAutomationExtension', False)
         options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+        if self.resource_blocker:
+            # Network events feed the per-check blocked/transferred statistics
+            options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+            options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
         
         # Try to find Chrome/Chromium driver
         chrome_driver_path = shutil.which('chromedriver')
         chromium_driver_path = shutil.which('chromium-driver')
         
         if chrome_driver_path:
-            self.driver = webdriver.Chrome(options=options)
+            driver = webdriver.Chrome(options=options)
         elif chromium_driver_path:
             # For Docker/Linux environments with Chromium
             service = Service(executable_path=chromium_driver_path)
             options.binary_location = shutil.which('chromium') or shutil.which('chromium-browser') or '/usr/bin/chromium'
-            self.driver = webdriver.Chrome(service=service, options=options)
+            driver = webdriver.Chrome(service=service, options=options)
         else:
             # Fallback: try without specifying driver path
             try:
-                self.driver = webdriver.Chrome(options=options)
+                driver = webdriver.Chrome(options=options)
             except WebDriverException:
                 raise WebDriverException("Neither Chrome nor Chromium driver found. Please install Chrome/Chromium and its driver.")
         
-        self.driver.implicitly_wait(10)
+        # Readiness is handled by explicit waits (see PageWaiter); an implicit
+        # wait would add its full timeout to every optional element lookup
+        driver.implicitly_wait(0)
+        
+        if self.resource_blocker:
+            try:
+                self.resource_blocker.apply(driver)
+            except Exception as e:
+                logger.warning(f"Resource blocking not available: {e}")
+        return driver
     
-    def _close_driver(self):
-        """Close Selenium WebDriver."""
-        if self.driver:
-            self.driver.quit()
-            self.driver = None
+    def close(self):
+        """Shut down all pooled browsers and HTTP connections."""
+        self.driver_pool.close()
+        if self.http_client:
+            self.http_client.close()
+        self.captcha_solver.close()
     
     def check_appointments(self) -> Tuple[bool, Optional[str]]:
         """
-        Check for appointment availability for all configured offices.
+        Check for appointment availability for all configured profiles.
+        
+        Each worker authenticates once and evaluates its share of the profile
+        matrix by re-submitting the appointment form. Workers run concurrently
+        when ``check_concurrency`` is above 1. Per-profile results of the latest
+        run are kept in ``self.last_results``.
         
         Returns:
             Tuple of (is_available, message)
         """
-        all_results = []
         available_offices = []
         
         logger.info("=" * 60)
         logger.info("STARTING APPOINTMENT CHECK SESSION")
         logger.info("=" * 60)
         
-        for office in self.form_data['idata_offices']:
-            logger.info(f"\n🏢 CHECKING OFFICE: {office}")
-            logger.info("-" * 40)
-            
-            try:
-                result = self._check_single_office(office)
-                all_results.append(result)
-                
-                if result['available']:
-                    available_offices.append(office)
-                    logger.info(f"✅ APPOINTMENTS AVAILABLE at {office}!")
-                else:
-                    logger.info(f"❌ No appointments at {office}")
-                    
-            except Exception as e:
-                logger.error(f"❌ Error checking {office}: {e}")
-                all_results.append({
-                    'office': office,
-                    'available': False,
-                    'message': f"Error: {str(e)}",
-                    'details': {}
-                })
+        all_results = self._check_profiles(self.profiles)
+        self.last_results = all_results
+        
+        for result in all_results:
+            if result['available']:
+                available_offices.append(result['label'])
         
         # Summary
         logger.info("\n" + "=" * 60)
@@ -121,109 +246,562 @@ class AppointmentChecker:
         logger.info("=" * 60)
         
         for result in all_results:
-            office = result['office']
             status = "✅ AVAILABLE" if result['available'] else "❌ NOT AVAILABLE"
-            logger.info(f"{office}: {status}")
+            duration = result.get('duration_seconds')
+            logger.info(f"{result['label']}: {status}" + (f" ({duration}s)" if duration is not None else ""))
             if result['available']:
                 logger.info(f"  └─ Details: {result['message']}")
         
+        pool_stats = self.driver_pool.get_stats()
+        logger.info(
+            f"Browser pool: {pool_stats['created']} started, {pool_stats['reused']} reused, "
+            f"{pool_stats['recycled']} recycled, {pool_stats['idle']} idle"
+        )
+        
+        network = [result['details']['network'] for result in all_results if 'network' in result.get('details', {})]
+        if network:
+            logger.info(
+                f"Network: {sum(n['requests_blocked'] for n in network)} requests blocked, "
+                f"{sum(n['bytes_transferred'] for n in network) / 1024:.0f} KB transferred"
+            )
+        
+        captcha_stats = self.captcha_retry.get_stats()
+        if captcha_stats['authentications']:
+            logger.info(
+                f"CAPTCHA: {captcha_stats['succeeded']}/{captcha_stats['authentications']} authentications "
+                f"succeeded in {captcha_stats['attempts']} attempts "
+                f"({captcha_stats['rejected']} rejected, {captcha_stats['unsolved']} unsolved, "
+                f"{captcha_stats['skipped']} held back as implausible)"
+            )
+            if self.captcha_solver.tuner:
+                arm, rate = self.captcha_solver.tuner.best()
+                logger.info(f"CAPTCHA tuning: best preprocessing {arm} (estimated {rate:.0%} accepted)")
+            if self.captcha_solver.answer_cache:
+                cache_stats = self.captcha_solver.answer_cache.get_stats()
+                logger.info(
+                    f"CAPTCHA answer cache: {cache_stats['hits']}/{cache_stats['lookups']} hits "
+                    f"({cache_stats['hit_rate']:.0%}), {cache_stats['entries']} known images"
+                )
+            if isinstance(self.captcha_solver, CaptchaService):
+                metrics = self.captcha_solver.get_metrics()
+                logger.info(
+                    f"CAPTCHA service: {metrics['solved']} solved, max queue depth {metrics['max_queue_depth']}, "
+                    f"latency p50 {metrics['latency_p50_ms']:.0f} ms / p95 {metrics['latency_p95_ms']:.0f} ms "
+                    f"(queue wait p95 {metrics['queue_wait_p95_ms']:.0f} ms)"
+                )
+        
         if available_offices:
             return True, f"Appointments available at: {', '.join(available_offices)}"
         else:
             return False, "No appointments available at any office"
     
-    def _check_single_office(self, office_name: str) -> dict:
+    def _build_profiles(self) -> List[Dict[str, str]]:
+        """
+        Build the profile matrix from the configuration.
+        
+        Explicit ``profiles`` win; otherwise every configured office is
+        combined with the single city, purpose, service type and person count.
+        
+        Returns:
+            List of profiles keyed like HttpAppointmentClient.FORM_FIELDS
+        """
+        if self.form_data.get('profiles'):
+            return [dict(profile) for profile in self.form_data['profiles']]
+        
+        return [
+            {
+                'residence_city': self.form_data['residence_city'],
+                'idata_office': office.strip(),
+                'travel_purpose': self.form_data['travel_purpose'],
+                'service_type': self.form_data['service_type'],
+                'num_persons': str(self.form_data['num_persons']),
+            }
+            for office in self.form_data['idata_offices'] if office.strip()
+        ]
+    
+    def _profile_label(self, profile: Dict[str, str]) -> str:
+        """Short name of a profile: the office, plus the other fields when profiles differ in them."""
+        if self._uniform_profiles:
+            return profile['idata_office']
+        return (
+            f"{profile['idata_office']} ({profile['residence_city']}, {profile['travel_purpose']}, "
+            f"{profile['service_type']}, {profile['num_persons']} persons)"
+        )
+    
+    def _profile_result(self, profile: Dict[str, str], available: bool, message: str, details: dict) -> dict:
+        """Build the result dictionary of one profile check."""
+        return {
+            'office': profile['idata_office'],
+            'label': self._profile_label(profile),
+            'profile': dict(profile),
+            'available': available,
+            'message': message,
+            'details': details
+        }
+    
+    def _check_profiles(self, profiles: List[Dict[str, str]]) -> List[dict]:
         """
-        Check appointments for a single office.
+        Check profiles on a bounded worker pool, each worker in its own browser session.
+        
+        Profiles are split into one batch per worker so every batch needs a
+        single authentication.
         
         Args:
-            office_name: Name of the IDATA office to check
+            profiles: Profiles to check
             
         Returns:
-            Dictionary with check results
+            List of per-profile result dictionaries, in the order of ``profiles``
         """
+        results: Dict[int, dict] = {}
+        started: Dict[int, float] = {}
+        
+        workers = min(self.concurrency, len(profiles)) or 1
+        batches = [list(range(len(profiles)))[worker::workers] for worker in range(workers)]
+        
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='office-check')
         try:
-            self._init_driver()
+            futures = {
+                executor.submit(self._check_batch_task, batch_index, [profiles[i] for i in batch], started): batch_index
+                for batch_index, batch in enumerate(batches)
+            }
+            pending = set(futures)
             
+            while pending:
+                done, pending = wait(pending, timeout=1, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    batch = batches[futures[future]]
+                    try:
+                        for index, result in zip(batch, future.result()):
+                            results[index] = result
+                    except Exception as e:
+                        logger.error(f"❌ Error checking batch {futures[future] + 1}: {e}")
+                        for index in batch:
+                            results[index] = self._profile_result(
+                                profiles[index], False, f"Error: {str(e)}", {'error': str(e)}
+                            )
+                
+                # Enforce the per-profile timeout from the moment a worker picked the batch up
+                now = time.monotonic()
+                for future in list(pending):
+                    batch_index = futures[future]
+                    budget = self.office_timeout * len(batches[batch_index])
+                    if batch_index in started and now - started[batch_index] > budget:
+                        logger.error(f"❌ Timed out checking batch {batch_index + 1} after {budget}s")
+                        for index in batches[batch_index]:
+                            results[index] = self._profile_result(
+                                profiles[index],
+                                False,
+                                f"Error: timed out after {self.office_timeout} seconds",
+                                {'error': 'timeout'}
+                            )
+                        pending.discard(future)
+        finally:
+            # Timed out workers keep running in the background and return their browser when done
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        return [results[index] for index in range(len(profiles))]
+    
+    def _check_batch_task(self, batch_index: int, profiles: List[Dict[str, str]],
+                          started: Dict[int, float]) -> List[dict]:
+        """
+        Worker entry point for checking a batch of profiles.
+        
+        Args:
+            batch_index: Position of the batch
+            profiles: Profiles of this batch
+            started: Shared map of batch index to worker start time
+            
+        Returns:
+            List of result dictionaries, in the order of ``profiles``
+        """
+        started[batch_index] = time.monotonic()
+        results = self._check_batch(profiles)
+        
+        for result in results:
+            if result['available']:
+                logger.info(f"✅ APPOINTMENTS AVAILABLE at {result['label']}!")
+            else:
+                logger.info(f"❌ No appointments at {result['label']}")
+        
+        return results
+    
+    def _check_batch(self, profiles: List[Dict[str, str]]) -> List[dict]:
+        """
+        Check profiles one after another in one authenticated session.
+        
+        Args:
+            profiles: Profiles to check
+            
+        Returns:
+            List of result dictionaries, in the order of ``profiles``
+        """
+        results: List[dict] = []
+        
+        if self.http_client and self.http_client.is_available():
+            for profile in profiles:
+                start = time.monotonic()
+                result = self._check_profile_http(profile)
+                if result is None:
+                    logger.info("🌐 Falling back to browser check...")
+                    break
+                result['duration_seconds'] = round(time.monotonic() - start, 2)
+                results.append(result)
+        
+        remaining = profiles[len(results):]
+        if not remaining:
+            return results
+        
+        try:
+            with self.driver_pool.driver() as driver:
+                self.driver = driver
+                authenticated = False
+                for profile in remaining:
+                    start = time.monotonic()
+                    logger.info(f"\n🏢 CHECKING: {self._profile_label(profile)}")
+                    logger.info("-" * 40)
+                    
+                    self.waiter = PageWaiter(driver, self.step_timeouts)
+                    if self.resource_blocker:
+                        self.resource_blocker.reset_stats(driver)
+                    result = self._run_profile_check(profile, authenticated)
+                    result['details']['step_timings'] = dict(self.waiter.timings)
+                    if self.resource_blocker:
+                        result['details']['network'] = self.resource_blocker.collect_stats(driver)
+                    result['duration_seconds'] = round(time.monotonic() - start, 2)
+                    results.append(result)
+                    
+                    authenticated = 'access_mode' in result['details']
+        except Exception as e:
+            logger.error(f"Error checking profiles: {e}", exc_info=True)
+            for profile in profiles[len(results):]:
+                results.append(self._profile_result(profile, False, f"Error: {str(e)}", {'error': str(e)}))
+        finally:
+            self.driver = None
+            self.waiter = None
+        
+        return results
+    
+    def _check_profile_http(self, profile: Dict[str, str]) -> Optional[dict]:
+        """
+        Check a single profile over the browserless HTTP flow.
+        
+        Args:
+            profile: Form values of the profile
+            
+        Returns:
+            Dictionary with check results, or None if the caller should fall back to Selenium
+        """
+        label = self._profile_label(profile)
+        try:
+            logger.info(f"⚡ Checking {label} over HTTP...")
+            page = self.http_client.fetch_result_page(profile)
+        except HttpFlowError as e:
+            self.http_client.disable(str(e))
+            return None
+        except (ValueError, etree.LxmlError) as e:
+            # Empty or garbled pages and undecodable CAPTCHA data URLs (binascii.Error is a ValueError)
+            self.http_client.disable(f"unreadable response: {e}")
+            return None
+        except requests.RequestException as e:
+            logger.warning(f"HTTP check failed for {label}: {e}")
+            return None
+        
+        if page is None:
+            return self._profile_result(
+                profile, False, "Failed to solve CAPTCHA", {'error': 'CAPTCHA solving failed', 'backend': 'http'}
+            )
+        
+        page_content, page_url, page_title, response_time = page
+        is_available, message, details = self._analyze_result_page(
+            page_content, page_url, page_title, response_time
+        )
+        details['backend'] = 'http'
+        self._log_result(label, is_available, message, details)
+        
+        return self._profile_result(profile, is_available, message, details)
+    
+    def _log_result(self, label: str, is_available: bool, message: str, details: dict):
+        """Log the outcome of a single profile check."""
+        logger.info(f"📊 RESULT FOR {label}:")
+        logger.info(f"   • Status: {'AVAILABLE' if is_available else 'NOT AVAILABLE'}")
+        logger.info(f"   • Message: {message}")
+        if details:
+            for key, value in details.items():
+                logger.info(f"   • {key}: {value}")
+    
+    def _run_profile_check(self, profile: Dict[str, str], authenticated: bool = False) -> dict:
+        """
+        Run the check flow for a single profile on the current driver.
+        
+        Args:
+            profile: Form values of the profile
+            authenticated: Whether this browser already reached the form in this batch
+            
+        Returns:
+            Dictionary with check results
+        """
+        label = self._profile_label(profile)
+        try:
             # Log the inputs for this attempt
             logger.info(f"📋 INPUT PARAMETERS:")
-            logger.info(f"   • Residence City: {self.form_data['residence_city']}")
-            logger.info(f"   • IDATA Office: {office_name}")
-            logger.info(f"   • Travel Purpose: {self.form_data['travel_purpose']}")
-            logger.info(f"   • Service Type: {self.form_data['service_type']}")
-            logger.info(f"   • Number of Persons: {self.form_data['num_persons']}")
+            logger.info(f"   • Residence City: {profile['residence_city']}")
+            logger.info(f"   • IDATA Office: {profile['idata_office']}")
+            logger.info(f"   • Travel Purpose: {profile['travel_purpose']}")
+            logger.info(f"   • Service Type: {profile['service_type']}")
+            logger.info(f"   • Number of Persons: {profile['num_persons']}")
             
-            # Navigate to main page
-            logger.info("🌐 Navigating to main page...")
-            main_url = urljoin(self.BASE_URL, self.MAIN_PAGE)
-            self.driver.get(main_url)
-            time.sleep(3)
-            
-            # Solve captcha
-            logger.info("🔐 Solving CAPTCHA...")
-            if not self._solve_captcha():
-                return {
-                    'office': office_name,
-                    'available': False,
-                    'message': "Failed to solve CAPTCHA",
-                    'details': {'error': 'CAPTCHA solving failed'}
-                }
+            # Reach the appointment form via this batch's session, a saved session or the CAPTCHA
+            self._local.captcha_attempts = []
+            access_mode = self._open_appointment_form(reuse_session=authenticated)
+            if not access_mode:
+                return self._profile_result(profile, False, "Failed to solve CAPTCHA", {
+                    'error': 'CAPTCHA solving failed',
+                    **self._captcha_attempt_details()
+                })
             
-            # Navigate to appointment form
-            logger.info("📝 Navigating to appointment form...")
-            form_url = urljoin(self.BASE_URL, self.APPOINTMENT_FORM)
-            self.driver.get(form_url)
-            time.sleep(3)
-            
-            # Fill appointment form for this specific office
-            logger.info(f"✏️  Filling appointment form for {office_name}...")
-            if not self._fill_appointment_form_for_office(office_name):
-                return {
-                    'office': office_name,
-                    'available': False,
-                    'message': "Failed to fill appointment form",
-                    'details': {'error': 'Form filling failed'}
-                }
+            # Fill appointment form for this profile
+            logger.info(f"✏️  Filling appointment form for {label}...")
+            if not self._fill_appointment_form(profile):
+                return self._profile_result(
+                    profile, False, "Failed to fill appointment form",
+                    {'error': 'Form filling failed', 'access_mode': access_mode}
+                )
             
             # Check availability
             logger.info("🔍 Checking appointment availability...")
             is_available, message, details = self._check_availability_detailed()
+            details['access_mode'] = access_mode
+            details['backend'] = 'selenium'
+            details.update(self._captcha_attempt_details())
+            
+            # Keep the saved session fresh while the server still accepts it
+            if self.session_store:
+                self.session_store.save(self.driver.get_cookies())
             
             # Log the result
-            logger.info(f"📊 RESULT FOR {office_name}:")
-            logger.info(f"   • Status: {'AVAILABLE' if is_available else 'NOT AVAILABLE'}")
-            logger.info(f"   • Message: {message}")
-            if details:
-                for key, value in details.items():
-                    logger.info(f"   • {key}: {value}")
-            
-            return {
-                'office': office_name,
-                'available': is_available,
-                'message': message,
-                'details': details
-            }
+            self._log_result(label, is_available, message, details)
+            
+            return self._profile_result(profile, is_available, message, details)
             
         except Exception as e:
-            logger.error(f"Error checking {office_name}: {e}", exc_info=True)
-            return {
-                'office': office_name,
-                'available': False,
-                'message': f"Error: {str(e)}",
-                'details': {'error': str(e)}
-            }
-        finally:
-            self._close_driver()
+            logger.error(f"Error checking {label}: {e}", exc_info=True)
+            return self._profile_result(profile, False, f"Error: {str(e)}", {'error': str(e)})
+    
+    def _open_appointment_form(self, reuse_session: bool = False) -> Optional[str]:
+        """
+        Navigate to the appointment form, skipping the CAPTCHA while a saved
+        session is still accepted by the server.
+        
+        Args:
+            reuse_session: Try the browser's current session first, e.g. for the
+                next profile of a batch
+        
+        Returns:
+            'reused', 'session' or 'captcha' depending on how the form was reached, None on failure
+        """
+        form_url = urljoin(self.BASE_URL, self.APPOINTMENT_FORM)
+        
+        if reuse_session:
+            with self.waiter.step('appointment_form'):
+                self.driver.get(form_url)
+                self.waiter.until_page_ready()
+            
+            if self._is_on_appointment_form():
+                return 'reused'
+            logger.info("🔐 Session ended during the batch, authenticating again")
+        
+        if self.session_store and self._restore_session():
+            logger.info("🍪 Restored saved session, going straight to appointment form...")
+            with self.waiter.step('appointment_form'):
+                self.driver.get(form_url)
+                self.waiter.until_page_ready()
+            
+            if self._is_on_appointment_form():
+                return 'session'
+            
+            logger.info("🍪 Saved session expired, falling back to CAPTCHA")
+            self.session_store.invalidate()
+        
+        # Navigate to main page (an expired session may already have been redirected there)
+        if not self.driver.find_elements(By.NAME, "mailConfirmCode"):
+            logger.info("🌐 Navigating to main page...")
+            main_url = urljoin(self.BASE_URL, self.MAIN_PAGE)
+            with self.waiter.step('main_page'):
+                self.driver.get(main_url)
+                self.waiter.until_page_ready()
+        
+        # Solve captcha
+        logger.info("🔐 Solving CAPTCHA...")
+        if not self._solve_captcha():
+            return None
+        
+        if self.session_store:
+            self.session_store.save(self.driver.get_cookies())
+        
+        # Navigate to appointment form
+        logger.info("📝 Navigating to appointment form...")
+        with self.waiter.step('appointment_form'):
+            self.driver.get(form_url)
+            self.waiter.until_page_ready()
+        
+        return 'captcha'
+    
+    def _restore_session(self) -> bool:
+        """
+        Load saved session cookies into the current browser.
+        
+        Returns:
+            True if a saved session was restored
+        """
+        cookies = self.session_store.load()
+        if not cookies:
+            return False
+        
+        try:
+            for cookie in cookies:
+                params = {
+                    'name': cookie['name'],
+                    'value': cookie['value'],
+                    'domain': cookie.get('domain'),
+                    'path': cookie.get('path', '/'),
+                    'secure': cookie.get('secure', False),
+                    'httpOnly': cookie.get('httpOnly', False),
+                }
+                if cookie.get('expiry'):
+                    params['expires'] = cookie['expiry']
+                if cookie.get('sameSite'):
+                    params['sameSite'] = cookie['sameSite']
+                # CDP can set cookies for a domain without loading one of its pages first
+                self.driver.execute_cdp_cmd('Network.setCookie', params)
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to restore saved session: {e}")
+            return False
+    
+    def _is_on_appointment_form(self) -> bool:
+        """Check that the browser shows the appointment form rather than the CAPTCHA page."""
+        return (
+            "appointment-form" in self.driver.current_url
+            and not self.driver.find_elements(By.NAME, "mailConfirmCode")
+        )
     
     def _solve_captcha(self) -> bool:
         """
-        Find and solve CAPTCHA on the page.
+        Solve the CAPTCHA, requesting and solving a fresh one on the same
+        session after a rejected or unreadable code.
         
         Returns:
-            True if solved successfully, False otherwise
+            True if a code was accepted, False otherwise
+        """
+        accepted, attempts = self.captcha_retry.run(self._captcha_attempt)
+        self._local.captcha_attempts = attempts
+        if not accepted:
+            logger.error(f"CAPTCHA not accepted after {len(attempts)} attempts")
+        return accepted
+    
+    def _captcha_attempt(self, number: int, may_skip: bool = False) -> str:
+        """
+        Run one CAPTCHA attempt for the retry policy.
+        
+        Args:
+            number: 1-based attempt number
+            may_skip: Whether an implausible reading may be skipped instead of submitted
+            
+        Returns:
+            Outcome of the attempt (see src.scraper.captcha_retry)
+        """
+        if number > 1:
+            try:
+                self._refresh_captcha()
+            except Exception as e:
+                logger.error(f"Failed to load a fresh CAPTCHA: {e}")
+                return captcha_retry.ERROR
+        
+        self._local.captcha_capture = None
+        self._local.captcha_solution = None
+        outcome = self._submit_captcha_once(may_skip)
+        if outcome in (captcha_retry.ACCEPTED, captcha_retry.REJECTED):
+            # Lets the solver learn which preprocessing settings get codes accepted
+            self.captcha_solver.report_outcome(self._local.captcha_solution, outcome == captcha_retry.ACCEPTED)
+        capture = self._local.captcha_capture
+        if self.captcha_corpus and capture:
+            self.captcha_corpus.record(outcome=outcome, source='selenium', **capture)
+        return outcome
+    
+    def _refresh_captcha(self):
+        """Make sure a CAPTCHA that has not been tried yet is on the page."""
+        # Close the error dialog so it does not cover the form
+        self.driver.execute_script(self._DISMISS_DIALOG_JS)
+        
+        previous_src = getattr(self._local, 'captcha_src', None)
+        image_selector = "img.imageCaptcha, img[alt='CAPTCHA Resmi']"
+        images = self.driver.find_elements(By.CSS_SELECTOR, image_selector)
+        if images and previous_src and images[0].get_attribute('src') != previous_src:
+            # The rejected submission already rendered a new CAPTCHA
+            return
+        
+        # A refresh control swaps the image without reloading the page
+        refresh = self.driver.find_elements(By.CSS_SELECTOR, self.CAPTCHA_REFRESH_SELECTOR)
+        if images and previous_src and refresh:
+            try:
+                with self.waiter.step('captcha_image'):
+                    refresh[0].click()
+                    self.waiter.until(
+                        lambda driver: any(
+                            image.get_attribute('src') != previous_src
+                            for image in driver.find_elements(By.CSS_SELECTOR, image_selector)
+                        ),
+                        "CAPTCHA refresh did not load a new image"
+                    )
+                logger.info("🔄 Refreshed CAPTCHA in place")
+                return
+            except WebDriverException as e:
+                logger.debug(f"CAPTCHA refresh control did not work: {e}")
+        
+        logger.info("🔄 Reloading main page for a new CAPTCHA...")
+        with self.waiter.step('main_page'):
+            self.driver.get(urljoin(self.BASE_URL, self.MAIN_PAGE))
+            self.waiter.until_page_ready()
+    
+    def _captcha_attempt_details(self) -> dict:
+        """Summarize the CAPTCHA attempts of the current office check for its result details."""
+        attempts = getattr(self._local, 'captcha_attempts', None)
+        if not attempts:
+            return {}
+        return {
+            'captcha_attempts': len(attempts),
+            'captcha_outcomes': [entry['outcome'] for entry in attempts]
+        }
+    
+    def _submit_captcha_once(self, may_skip: bool = False) -> str:
+        """
+        Find, solve and submit the CAPTCHA currently on the page.
+        
+        Args:
+            may_skip: Leave the code unsubmitted when the solver does not find it plausible
+        
+        Returns:
+            Outcome of the attempt (see src.scraper.captcha_retry)
         """
         try:
-            wait = WebDriverWait(self.driver, 10)
+            # Try other selectors if the alt="CAPTCHA Resmi" image is missing
+            captcha_selectors = [
+                "img[alt*='CAPTCHA']",
+                "img[alt*='captcha']",
+                "img[src*='captcha']",
+                ".captcha-image",
+                "#captcha-image"
+            ]
+            
+            # Wait until any of the CAPTCHA image variants is in the DOM
+            with self.waiter.step('captcha_image'):
+                try:
+                    self.waiter.until_element_present(
+                        (By.CSS_SELECTOR, ", ".join(["img[alt='CAPTCHA Resmi']"] + captcha_selectors))
+                    )
+                except TimeoutException:
+                    pass
             
             # Find CAPTCHA image - it has alt="CAPTCHA Resmi"
             captcha_img = None
@@ -231,15 +809,6 @@ class AppointmentChecker:
                 captcha_img = self.driver.find_element(By.CSS_SELECTOR, "img[alt='CAPTCHA Resmi']")
                 logger.info("Found CAPTCHA image with alt='CAPTCHA Resmi'")
             except:
-                # Try other selectors
-                captcha_selectors = [
-                    "img[alt*='CAPTCHA']",
-                    "img[alt*='captcha']",
-                    "img[src*='captcha']",
-                    ".captcha-image",
-                    "#captcha-image"
-                ]
-                
                 for selector in captcha_selectors:
                     try:
                         captcha_img = self.driver.find_element(By.CSS_SELECTOR, selector)
@@ -251,27 +820,46 @@ class AppointmentChecker:
             if not captcha_img:
                 logger.error("No CAPTCHA image found on page")
                 self.driver.save_screenshot("no_captcha_debug.png")
-                return False
+                return captcha_retry.ERROR
             
             # Get CAPTCHA image source
             img_src = captcha_img.get_attribute('src')
+            self._local.captcha_src = img_src
             logger.info(f"CAPTCHA image source type: {'base64' if img_src.startswith('data:') else 'URL'}")
             
             if img_src.startswith('data:'):
                 # Base64 encoded image
-                base64_data = img_src.split(',')[1]
-                captcha_text = self.captcha_solver.solve_from_base64(base64_data)
+                img_data = base64.b64decode(img_src.split(',')[1])
             else:
-                # Download image
-                img_data = self.captcha_solver.download_captcha_image(img_src)
-                if img_data:
-                    captcha_text = self.captcha_solver.solve_captcha(img_data)
-                else:
-                    return False
+                # Read the image the browser already loaded: no extra request, and
+                # always the CAPTCHA this session is showing
+                img_data = read_displayed_image(self.driver, captcha_img)
+                if not img_data:
+                    logger.warning("Could not read CAPTCHA from the browser, downloading it")
+                    img_data = self.captcha_solver.download_captcha_image(img_src)
+                if not img_data:
+                    return captcha_retry.UNSOLVED
+            
+            solve_start = time.perf_counter()
+            solution = self.captcha_solver.solve_captcha_detailed(img_data)
+            captcha_text = solution['text'] if solution else None
+            self._local.captcha_solution = solution
+            self._local.captcha_capture = {
+                'image_data': img_data,
+                'guess': captcha_text,
+                'solve_seconds': time.perf_counter() - solve_start,
+                'confidence': solution['confidence'] if solution else None,
+            }
             
             if not captcha_text:
                 logger.error("Failed to solve CAPTCHA")
-                return False
+                return captcha_retry.UNSOLVED
+            
+            if may_skip and not solution.get('plausible', True):
+                # A fresh CAPTCHA is cheaper than a rejected submission
+                logger.warning(f"Not submitting CAPTCHA {captcha_text} (confidence {solution['confidence']:.2f}, "
+                               f"{'valid' if solution['length_valid'] else 'wrong'} length)")
+                return captcha_retry.SKIPPED
             
             logger.info(f"CAPTCHA solved: {captcha_text}")
             
@@ -286,7 +874,7 @@ class AppointmentChecker:
                     logger.info("Found CAPTCHA input field by placeholder")
                 except:
                     logger.error("No CAPTCHA input field found")
-                    return False
+                    return captcha_retry.ERROR
             
             # Enter the CAPTCHA code
             code_input.clear()
@@ -323,27 +911,42 @@ class AppointmentChecker:
             if not submit_btn:
                 logger.error("No submit button found")
                 self.driver.save_screenshot("no_button_debug.png")
-                return False
-            
-            submit_btn.click()
-            logger.info("Clicked submit button")
+                return captcha_retry.ERROR
             
-            time.sleep(5)  # Wait for page to load
+            with self.waiter.step('captcha_submit'):
+                submit_btn.click()
+                logger.info("Clicked submit button")
+                
+                # Done when we reach the form, the page reloads or an error dialog opens
+                try:
+                    self.waiter.until(
+                        lambda driver: "appointment-form" in driver.current_url
+                        or EC.staleness_of(captcha_img)(driver)
+                        or driver.execute_script(self._DIALOG_VISIBLE_JS),
+                        "No response to CAPTCHA submission"
+                    )
+                except TimeoutException:
+                    logger.warning("No response to CAPTCHA submission within step budget")
+                self.waiter.until_page_ready()
             
             # Check if we successfully moved to the appointment form
             current_url = self.driver.current_url
             if "appointment-form" in current_url:
                 logger.info("Successfully moved to appointment form page")
-                return True
+                return captcha_retry.ACCEPTED
             
-            # Check for error messages
-            page_source = self.driver.page_source.lower()
-            if "hatalı" in page_source or "yanlış" in page_source or "geçersiz" in page_source:
-                logger.warning("CAPTCHA might be incorrect, will retry")
-                return False
+            # Check for error messages the user would actually see
+            visible_text = self.driver.execute_script(self._VISIBLE_TEXT_JS) or ''
+            if (
+                self.driver.execute_script(self._DIALOG_VISIBLE_JS)
+                or any(word in visible_text for word in self.CAPTCHA_ERROR_WORDS)
+                or self.driver.find_elements(By.NAME, "mailConfirmCode")
+            ):
+                logger.warning(f"CAPTCHA {captcha_text} was rejected")
+                return captcha_retry.REJECTED
             
             logger.info("CAPTCHA submitted successfully")
-            return True
+            return captcha_retry.ACCEPTED
             
         except Exception as e:
             logger.error(f"Failed to solve CAPTCHA: {e}")
@@ -352,68 +955,90 @@ class AppointmentChecker:
                 logger.info("Error screenshot saved as captcha_error_debug.png")
             except:
                 pass
-            return False
+            return captcha_retry.ERROR
     
-    def _fill_appointment_form_for_office(self, office_name: str) -> bool:
+    def _fill_appointment_form(self, profile: Dict[str, str]) -> bool:
         """
-        Fill the appointment form with predefined data for a specific office.
+        Fill the appointment form with the values of a profile.
         
         Args:
-            office_name: Name of the IDATA office to select
+            profile: Form values keyed like HttpAppointmentClient.FORM_FIELDS
             
         Returns:
             True if filled successfully, False otherwise
         """
         try:
-            wait = WebDriverWait(self.driver, 10)
-            
             logger.info(f"🔧 Filling form fields...")
             
             # Select residence city
-            logger.info(f"   └─ Setting residence city: {self.form_data['residence_city']}")
-            city_select = Select(wait.until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "select[name*='city'], select[name*='sehir'], #residence-city"))
-            ))
-            city_select.select_by_visible_text(self.form_data['residence_city'])
-            time.sleep(1)
-            
-            # Select IDATA office
+            logger.info(f"   └─ Setting residence city: {profile['residence_city']}")
+            with self.waiter.step('form_field'):
+                self._select_when_ready(
+                    "select[name*='city'], select[name*='sehir'], #residence-city",
+                    profile['residence_city']
+                )
+                self.waiter.until_spinner_hidden()
+            
+            # Select IDATA office (options may be loaded after the city changes)
+            office_name = profile['idata_office']
             logger.info(f"   └─ Setting IDATA office: {office_name}")
-            office_select = Select(self.driver.find_element(By.CSS_SELECTOR, "select[name*='office'], select[name*='ofis'], #idata-office"))
-            try:
-                office_select.select_by_visible_text(office_name)
-                logger.info(f"   ✅ Successfully selected office: {office_name}")
-            except Exception as e:
-                logger.error(f"   ❌ Failed to select office {office_name}: {e}")
-                return False
-            time.sleep(1)
+            with self.waiter.step('form_field'):
+                try:
+                    self._select_when_ready(
+                        "select[name*='office'], select[name*='ofis'], #idata-office",
+                        office_name
+                    )
+                    logger.info(f"   ✅ Successfully selected office: {office_name}")
+                except Exception as e:
+                    logger.error(f"   ❌ Failed to select office {office_name}: {e}")
+                    return False
+                self.waiter.until_spinner_hidden()
             
             # Select travel purpose
-            logger.info(f"   └─ Setting travel purpose: {self.form_data['travel_purpose']}")
-            purpose_select = Select(self.driver.find_element(By.CSS_SELECTOR, "select[name*='purpose'], select[name*='amac'], #travel-purpose"))
-            purpose_select.select_by_visible_text(self.form_data['travel_purpose'])
-            time.sleep(1)
+            logger.info(f"   └─ Setting travel purpose: {profile['travel_purpose']}")
+            with self.waiter.step('form_field'):
+                self._select_when_ready(
+                    "select[name*='purpose'], select[name*='amac'], #travel-purpose",
+                    profile['travel_purpose']
+                )
+                self.waiter.until_spinner_hidden()
             
             # Select service type
-            logger.info(f"   └─ Setting service type: {self.form_data['service_type']}")
-            service_select = Select(self.driver.find_element(By.CSS_SELECTOR, "select[name*='service'], select[name*='hizmet'], #service-type"))
-            service_select.select_by_visible_text(self.form_data['service_type'])
-            time.sleep(1)
+            logger.info(f"   └─ Setting service type: {profile['service_type']}")
+            with self.waiter.step('form_field'):
+                self._select_when_ready(
+                    "select[name*='service'], select[name*='hizmet'], #service-type",
+                    profile['service_type']
+                )
+                self.waiter.until_spinner_hidden()
             
             # Enter number of persons
-            logger.info(f"   └─ Setting number of persons: {self.form_data['num_persons']}")
-            persons_input = self.driver.find_element(By.CSS_SELECTOR, "input[name*='person'], input[name*='kisi'], #num-persons")
-            persons_input.clear()
-            persons_input.send_keys(self.form_data['num_persons'])
-            time.sleep(1)
+            logger.info(f"   └─ Setting number of persons: {profile['num_persons']}")
+            with self.waiter.step('form_field'):
+                persons_input = self.waiter.until_element_present(
+                    (By.CSS_SELECTOR, "input[name*='person'], input[name*='kisi'], #num-persons")
+                )
+                persons_input.clear()
+                persons_input.send_keys(profile['num_persons'])
             
             # Submit form
             logger.info("   └─ Submitting form...")
-            submit_btn = self.driver.find_element(By.CSS_SELECTOR, "button[type='submit'], input[type='submit'], .btn-submit, .btn-check")
-            submit_btn.click()
+            with self.waiter.step('form_submit'):
+                submit_btn = self.driver.find_element(By.CSS_SELECTOR, "button[type='submit'], input[type='submit'], .btn-submit, .btn-check")
+                submit_btn.click()
+                
+                # Results are either a new page or rendered in place after an AJAX call
+                try:
+                    self.waiter.until(
+                        lambda driver: EC.staleness_of(submit_btn)(driver)
+                        or driver.execute_script(self._DIALOG_VISIBLE_JS),
+                        "Form submission did not navigate"
+                    )
+                except TimeoutException:
+                    pass
+                self.waiter.until_page_ready()
             
             logger.info("✅ Appointment form submitted successfully")
-            time.sleep(5)
             
             return True
             
@@ -421,6 +1046,28 @@ class AppointmentChecker:
             logger.error(f"❌ Failed to fill appointment form: {e}")
             return False
     
+    def _select_when_ready(self, css_selector: str, text: str) -> Select:
+        """
+        Wait until a select offers the option ``text`` and choose it.
+        
+        Args:
+            css_selector: CSS selector of the select element
+            text: Visible text of the option to choose
+            
+        Returns:
+            The Select wrapper that was changed
+        """
+        def option_available(driver):
+            for element in driver.find_elements(By.CSS_SELECTOR, css_selector):
+                select = Select(element)
+                if any(option.text.strip() == text for option in select.options):
+                    return select
+            return False
+        
+        select = self.waiter.until(option_available, f"Option '{text}' not available")
+        select.select_by_visible_text(text)
+        return select
+    
     def _check_availability_detailed(self) -> Tuple[bool, str, dict]:
         """
         Check if appointments are available based on page content with detailed results.
@@ -430,97 +1077,61 @@ class AppointmentChecker:
         """
         try:
             # Wait for results to load
-            time.sleep(5)
-            
-            # Get page source
-            page_content = self.driver.page_source
-            soup = BeautifulSoup(page_content, 'html.parser')
-            
-            details = {
-                'page_url': self.driver.current_url,
-                'page_title': self.driver.title,
-                'response_time': '5 seconds',
-                'slots_found': 0,
-                'error_messages': []
-            }
+            with self.waiter.step('results'):
+                self.waiter.until_page_ready()
+            response_time = self.waiter.timings.get('form_submit', 0) + self.waiter.timings.get('results', 0)
+            
+            return self._analyze_result_page(
+                self.driver.page_source,
+                self.driver.current_url,
+                self.driver.title,
+                response_time
+            )
             
+        except Exception as e:
+            logger.error(f"Failed to check availability: {e}")
+            return False, f"Error checking availability: {str(e)}", {'error': str(e)}
+    
+    def _analyze_result_page(self, page_content: str, page_url: str, page_title: str,
+                             response_time: float) -> Tuple[bool, str, dict]:
+        """
+        Decide availability from the HTML of the form result page.
+        
+        Args:
+            page_content: HTML of the result page
+            page_url: URL the result page was served from
+            page_title: Title of the result page
+            response_time: Seconds between form submission and a ready result page
+            
+        Returns:
+            Tuple of (is_available, message, details)
+        """
+        details = {}
+        try:
             logger.info(f"   └─ Analyzing response page...")
-            logger.info(f"   └─ Current URL: {details['page_url']}")
-            logger.info(f"   └─ Page title: {details['page_title']}")
+            logger.info(f"   └─ Current URL: {page_url}")
+            logger.info(f"   └─ Page title: {page_title}")
+            
+            is_available, message, details = parse_result_page(
+                page_content, page_url, page_title, response_time
+            )
             
-            # Check for no appointment message
-            if self.NO_APPOINTMENT_TEXT in page_content:
+            if 'no_appointment_message' in details or message == "No appointments available":
                 logger.info(f"   └─ Found 'no appointments' message")
-                # Try to find the full message
-                no_appt_element = soup.find(text=lambda text: text and self.NO_APPOINTMENT_TEXT in text)
-                if no_appt_element:
-                    full_message = no_appt_element.strip()
-                    details['no_appointment_message'] = full_message
-                    return False, full_message, details
-                return False, "No appointments available", details
-            
-            # Check for error messages
-            error_keywords = ['hata', 'error', 'başarısız', 'failed', 'geçersiz', 'invalid']
-            for keyword in error_keywords:
-                if keyword in page_content.lower():
-                    error_elements = soup.find_all(text=lambda text: text and keyword.lower() in text.lower())
-                    for error in error_elements[:3]:  # Get first 3 error messages
-                        details['error_messages'].append(error.strip())
             
             if details['error_messages']:
                 logger.info(f"   └─ Found error messages: {details['error_messages']}")
             
-            # Check for time slots
-            time_slot_selectors = [
-                ['div', 'button', 'a'],  # Tags to search
-                ['slot', 'time', 'saat', 'randevu', 'tarih', 'date']  # Keywords in classes
-            ]
-            
-            time_slots = []
-            for tags in [time_slot_selectors[0]]:
-                for tag in tags:
-                    elements = soup.find_all(tag)
-                    for elem in elements:
-                        class_attr = elem.get('class', [])
-                        if any(keyword in str(class_attr).lower() for keyword in time_slot_selectors[1]):
-                            slot_text = elem.get_text(strip=True)
-                            if slot_text and len(slot_text) > 3:  # Filter out empty or very short texts
-                                time_slots.append(slot_text)
-            
-            # Also check for calendar-like structures
-            calendar_slots = soup.find_all(['td', 'div'], class_=lambda x: x and any(
-                word in str(x).lower() for word in ['available', 'mevcut', 'uygun', 'calendar']
-            ))
-            
-            for slot in calendar_slots:
-                slot_text = slot.get_text(strip=True)
-                if slot_text and len(slot_text) > 3:
-                    time_slots.append(slot_text)
-            
-            # Remove duplicates and filter
-            time_slots = list(set(time_slots))
-            details['slots_found'] = len(time_slots)
-            
-            if time_slots:
-                logger.info(f"   └─ Found {len(time_slots)} potential time slots!")
-                available_times = time_slots[:5]  # Get first 5 slots
-                details['available_slots'] = available_times
-                
-                message = f"Appointments available! Found {len(time_slots)} slots"
-                if available_times:
-                    message += f". Available times: {', '.join(available_times)}"
-                
-                logger.info(f"   └─ Available slots: {available_times}")
-                return True, message, details
-            
-            # Check if we're on the right page
-            if 'appointment' not in details['page_url'].lower():
-                details['page_issue'] = 'Not on appointment page'
+            if is_available:
+                logger.info(f"   └─ Found {details['slots_found']} potential time slots!")
+                logger.info(f"   └─ Available slots: {details['available_slots']}")
+            elif 'page_issue' in details:
                 logger.info(f"   └─ Warning: May not be on appointment results page")
             
-            # If no clear indication, assume no availability
-            logger.info(f"   └─ No appointment slots detected")
-            return False, "No appointment slots found", details
+            if message == "No appointment slots found":
+                logger.info(f"   └─ No appointment slots detected")
+            
+            return is_available, message, details
             
         except Exception as e:
             logger.error(f"Failed to check availability: {e}")
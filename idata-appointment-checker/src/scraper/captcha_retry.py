@@ -0,0 +1,106 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Outcomes an attempt callable may report
+ACCEPTED = 'accepted'
+REJECTED = 'rejected'
+UNSOLVED = 'unsolved'
+ERROR = 'error'
+# The reading looked wrong, so it was not submitted
+SKIPPED = 'skipped'
+
+
+class CaptchaRetryPolicy:
+    """Re-solves fresh CAPTCHAs on the same session until one is accepted or the budget runs out."""
+    
+    def __init__(self, max_attempts: int = 3, time_budget_seconds: float = 60, max_skips: int = 0):
+        """
+        Args:
+            max_attempts: Maximum CAPTCHA submissions per authentication
+            time_budget_seconds: No new attempt is started after this many seconds
+            max_skips: Implausible readings per authentication that may be replaced
+                by a fresh CAPTCHA without being submitted (they do not count as attempts)
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.time_budget_seconds = time_budget_seconds
+        self.max_skips = max(0, max_skips)
+        
+        self._lock = threading.Lock()
+        self.stats = {
+            'authentications': 0,
+            'succeeded': 0,
+            'attempts': 0,
+            ACCEPTED: 0,
+            REJECTED: 0,
+            UNSOLVED: 0,
+            ERROR: 0,
+            SKIPPED: 0,
+        }
+    
+    def run(self, attempt: Callable[[int, bool], str]) -> Tuple[bool, List[Dict]]:
+        """
+        Call ``attempt`` until it reports an accepted CAPTCHA.
+        
+        Args:
+            attempt: Callable taking the 1-based attempt number and whether it
+                may skip an implausible reading, returning one of ACCEPTED,
+                REJECTED, UNSOLVED, ERROR or SKIPPED. It is responsible for
+                bringing up a fresh CAPTCHA before solving when the number is above 1.
+        
+        Returns:
+            Tuple of (accepted, attempt log); each log entry has the attempt
+            number, its outcome and its duration in seconds
+        """
+        attempts: List[Dict] = []
+        start = time.monotonic()
+        submissions = skips = 0
+        
+        while submissions < self.max_attempts:
+            number = len(attempts) + 1
+            # Once the budget is spent, the reading in hand is submitted whatever it looks like
+            may_skip = skips < self.max_skips and time.monotonic() - start < self.time_budget_seconds
+            attempt_start = time.monotonic()
+            outcome = attempt(number, may_skip)
+            attempts.append({
+                'attempt': number,
+                'outcome': outcome,
+                'seconds': round(time.monotonic() - attempt_start, 2),
+            })
+            
+            if outcome == ACCEPTED:
+                break
+            if outcome == SKIPPED:
+                skips += 1
+                logger.info(f"🔁 CAPTCHA reading looks wrong, solving a fresh one before submitting ({skips}/{self.max_skips})")
+                continue
+            
+            submissions += 1
+            elapsed = time.monotonic() - start
+            if submissions < self.max_attempts:
+                if elapsed >= self.time_budget_seconds:
+                    logger.warning(f"CAPTCHA time budget of {self.time_budget_seconds:g}s used up after {number} attempts")
+                    break
+                logger.info(f"🔁 CAPTCHA {outcome}, retrying with a fresh one ({submissions + 1}/{self.max_attempts})")
+        
+        accepted = bool(attempts) and attempts[-1]['outcome'] == ACCEPTED
+        self._record(accepted, attempts)
+        return accepted, attempts
+    
+    def _record(self, accepted: bool, attempts: List[Dict]):
+        """Add one authentication to the running statistics."""
+        with self._lock:
+            self.stats['authentications'] += 1
+            self.stats['attempts'] += len(attempts)
+            if accepted:
+                self.stats['succeeded'] += 1
+            for entry in attempts:
+                self.stats[entry['outcome']] = self.stats.get(entry['outcome'], 0) + 1
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get counters of authentications and attempt outcomes since startup."""
+        with self._lock:
+            return dict(self.stats)
\ No newline at end of file
@@ -0,0 +1,201 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from selenium.common.exceptions import WebDriverException
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledDriver:
+    """A WebDriver instance together with its pool bookkeeping."""
+    
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.created_at = time.monotonic()
+
+
+class DriverPool:
+    """Keeps a bounded number of warm WebDriver instances alive between checks."""
+    
+    def __init__(self, driver_factory: Callable, size: int = 1, max_uses: int = 25,
+                 reset_cookies: bool = True, reset_storage: bool = True):
+        """
+        Args:
+            driver_factory: Callable returning a new, ready-to-use WebDriver
+            size: Maximum number of browsers alive at the same time
+            max_uses: Number of checkouts after which a browser is recycled
+            reset_cookies: Clear cookies when a browser is returned to the pool
+            reset_storage: Clear local/session storage when a browser is returned
+        """
+        self.driver_factory = driver_factory
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        self.reset_cookies = reset_cookies
+        self.reset_storage = reset_storage
+        
+        self._idle: List[_PooledDriver] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._closed = False
+        self.stats = {
+            'created': 0,
+            'reused': 0,
+            'recycled': 0,
+            'discarded': 0,
+        }
+    
+    @contextmanager
+    def driver(self, timeout: Optional[float] = None):
+        """
+        Check out a warm driver for the duration of the ``with`` block.
+        
+        Args:
+            timeout: Seconds to wait for a free browser (None waits forever)
+        
+        Yields:
+            Selenium WebDriver instance
+        """
+        if self._closed:
+            raise RuntimeError("Driver pool is closed")
+        
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError(f"No browser became available within {timeout} seconds")
+        
+        pooled = None
+        try:
+            pooled = self._checkout()
+            pooled.uses += 1
+            yield pooled.driver
+        finally:
+            if pooled:
+                self._checkin(pooled)
+            self._slots.release()
+    
+    def _checkout(self) -> _PooledDriver:
+        """Take a healthy idle driver from the pool or start a new one."""
+        while True:
+            with self._lock:
+                pooled = self._idle.pop() if self._idle else None
+            
+            if pooled is None:
+                break
+            
+            if self._is_healthy(pooled.driver):
+                self._count('reused')
+                logger.debug(f"Reusing warm browser (use #{pooled.uses + 1})")
+                return pooled
+            
+            logger.warning("Discarding unhealthy browser from pool")
+            self._count('discarded')
+            self._quit(pooled)
+        
+        start = time.monotonic()
+        pooled = _PooledDriver(self.driver_factory())
+        self._count('created')
+        logger.info(f"Started new browser for pool in {time.monotonic() - start:.1f}s")
+        return pooled
+    
+    def _checkin(self, pooled: _PooledDriver):
+        """Reset a driver and return it to the pool, or retire it."""
+        if self._closed:
+            self._quit(pooled)
+            return
+        
+        if pooled.uses >= self.max_uses:
+            logger.info(f"Recycling browser after {pooled.uses} uses")
+            self._count('recycled')
+            self._quit(pooled)
+            return
+        
+        if not self._reset(pooled.driver):
+            self._count('discarded')
+            self._quit(pooled)
+            return
+        
+        with self._lock:
+            self._idle.append(pooled)
+    
+    def _is_healthy(self, driver) -> bool:
+        """Check that the browser process and its session still respond."""
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+    
+    def _reset(self, driver) -> bool:
+        """
+        Clear per-check browser state so the next user starts clean.
+        
+        Returns:
+            True if the browser is still usable afterwards
+        """
+        try:
+            # Close popups or extra tabs opened during the check
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            
+            if self.reset_storage:
+                try:
+                    driver.execute_script(
+                        "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}"
+                    )
+                except WebDriverException:
+                    pass
+            
+            if self.reset_cookies:
+                try:
+                    # Clears cookies for every domain, not only the current page
+                    driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+                except Exception:
+                    driver.delete_all_cookies()
+            
+            # Leave the site so no background requests keep running while idle
+            driver.get('about:blank')
+            return True
+        
+        except Exception as e:
+            logger.warning(f"Failed to reset browser state: {e}")
+            return False
+    
+    def _quit(self, pooled: _PooledDriver):
+        """Quit a browser, ignoring errors from already-dead sessions."""
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logger.debug(f"Error while quitting browser: {e}")
+    
+    def idle_count(self) -> int:
+        """Number of warm browsers waiting in the pool."""
+        with self._lock:
+            return len(self._idle)
+    
+    def get_stats(self) -> Dict:
+        """Get pool usage counters."""
+        with self._lock:
+            stats = dict(self.stats, idle=len(self._idle))
+        stats['size'] = self.size
+        return stats
+    
+    def _count(self, key: str):
+        # Workers check drivers out and in concurrently
+        with self._lock:
+            self.stats[key] += 1
+    
+    def close(self):
+        """Quit all idle browsers; browsers in use are quit when returned."""
+        self._closed = True
+        with self._lock:
+            idle, self._idle = self._idle, []
+        
+        for pooled in idle:
+            self._quit(pooled)
+        
+        if idle:
+            logger.info(f"Closed {len(idle)} pooled browser(s)")
\ No newline at end of file
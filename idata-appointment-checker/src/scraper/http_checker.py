@@ -0,0 +1,388 @@
+import base64
+import logging
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import requests
+from lxml import html as lxml_html
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.scraper import captcha_retry
+from src.scraper.captcha_retry import CaptchaRetryPolicy
+
+logger = logging.getLogger(__name__)
+
+
+class HttpFlowError(Exception):
+    """Raised when a page does not look like the HTTP flow expects; callers fall back to Selenium."""
+
+
+class HttpAppointmentClient:
+    """Runs the IDATA CAPTCHA and appointment form flow over plain HTTP, without a browser."""
+    
+    USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+    
+    # The page script overwrites the <img class="imageCaptcha"> src with the real CAPTCHA
+    CAPTCHA_SCRIPT_PATTERN = re.compile(
+        r"""imageCaptcha['"]\)\.setAttribute\(\s*["']src["']\s*,\s*["'](data:image/[^"']*)["']\s*\+\s*["']([^"']+)["']"""
+    )
+    CAPTCHA_IMAGE_XPATH = (
+        "//img[contains(@class, 'imageCaptcha') or contains(translate(@alt, 'CAPTCH', 'captch'), 'captcha')"
+        " or contains(@src, 'captcha')]"
+    )
+    
+    # Same partial name/id matches the Selenium flow uses for the form fields
+    FORM_FIELDS = {
+        'residence_city': ('select', ['city', 'sehir'], 'residence-city'),
+        'idata_office': ('select', ['office', 'ofis'], 'idata-office'),
+        'travel_purpose': ('select', ['purpose', 'amac'], 'travel-purpose'),
+        'service_type': ('select', ['service', 'hizmet'], 'service-type'),
+        'num_persons': ('input', ['person', 'kisi'], 'num-persons'),
+    }
+    
+    def __init__(self, base_url: str, main_page: str, form_page: str, captcha_solver,
+                 session_store=None, captcha_retry: Optional[CaptchaRetryPolicy] = None,
+                 captcha_corpus=None, timeout: float = 15, pool_size: int = 4,
+                 cooldown_minutes: float = 30):
+        """
+        Args:
+            base_url: IDATA site root
+            main_page: Path of the CAPTCHA landing page
+            form_page: Path of the appointment form
+            captcha_solver: CaptchaSolver used for the CAPTCHA image
+            session_store: Optional SessionStore shared with the Selenium flow
+            captcha_retry: Retry policy for rejected CAPTCHAs (defaults to a single attempt)
+            captcha_corpus: Optional CaptchaCorpus that records every submitted CAPTCHA
+            timeout: Per-request timeout in seconds
+            pool_size: Number of keep-alive connections kept per host
+            cooldown_minutes: How long to stay on Selenium after the HTTP flow broke
+        """
+        self.base_url = base_url
+        self.main_url = urljoin(base_url, main_page)
+        self.form_url = urljoin(base_url, form_page)
+        self.captcha_solver = captcha_solver
+        self.session_store = session_store
+        self.captcha_retry = captcha_retry or CaptchaRetryPolicy(max_attempts=1)
+        self.captcha_corpus = captcha_corpus
+        self._last_capture: Optional[Dict] = None
+        self._last_solution: Optional[Dict] = None
+        self.timeout = timeout
+        self.cooldown_seconds = cooldown_minutes * 60
+        
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'User-Agent': self.USER_AGENT,
+            'Accept-Language': 'tr-TR,tr;q=0.9,en;q=0.8',
+        })
+        
+        self._auth_lock = threading.Lock()
+        self._authenticated = False
+        self._disabled_until = 0.0
+    
+    def is_available(self) -> bool:
+        """Whether the HTTP flow should be tried (it is paused for a while after breaking)."""
+        return time.monotonic() >= self._disabled_until
+    
+    def disable(self, reason: str):
+        """Pause the HTTP flow for the cooldown period."""
+        self._disabled_until = time.monotonic() + self.cooldown_seconds
+        logger.warning(f"HTTP fast path disabled for {self.cooldown_seconds / 60:.0f} minutes: {reason}")
+    
+    def fetch_result_page(self, form_values: Dict[str, str]) -> Optional[Tuple[str, str, str, float]]:
+        """
+        Authenticate if needed, submit the appointment form and return the result page.
+        
+        Args:
+            form_values: Visible texts keyed like FORM_FIELDS
+        
+        Returns:
+            Tuple of (html, url, title, response_time) or None if the CAPTCHA was rejected
+        
+        Raises:
+            HttpFlowError: If the site responded with something the flow cannot handle
+            requests.RequestException: On network errors
+        """
+        form_page = self._open_form_page()
+        if form_page is None:
+            return None
+        
+        response, document = form_page
+        action, method, payload = self._build_form_payload(response.url, document, form_values)
+        
+        start = time.monotonic()
+        if method == 'get':
+            result = self.session.get(action, params=payload, timeout=self.timeout)
+        else:
+            result = self.session.post(action, data=payload, headers={'Referer': response.url},
+                                       timeout=self.timeout)
+        response_time = time.monotonic() - start
+        result.raise_for_status()
+        
+        title = lxml_html.fromstring(result.content).findtext('.//title') or ''
+        return result.text, result.url, title.strip(), response_time
+    
+    def _open_form_page(self):
+        """
+        Load the appointment form, solving the CAPTCHA first if the session is not authenticated.
+        
+        Returns:
+            Tuple of (response, parsed document), or None if the CAPTCHA was rejected
+        """
+        with self._auth_lock:
+            if not self._authenticated:
+                self._load_saved_session()
+            
+            response = self.session.get(self.form_url, timeout=self.timeout)
+            response.raise_for_status()
+            document = lxml_html.fromstring(response.content)
+            
+            if self._is_form_page(response.url, document):
+                self._authenticated = True
+                return response, document
+            
+            self._authenticated = False
+            logger.info("🔐 Solving CAPTCHA over HTTP...")
+            page = {'response': response, 'document': document, 'fresh': True}
+            
+            def attempt(number: int, may_skip: bool = False) -> str:
+                self._last_capture = None
+                self._last_solution = None
+                outcome = submit(number, may_skip)
+                if outcome in (captcha_retry.ACCEPTED, captcha_retry.REJECTED):
+                    self.captcha_solver.report_outcome(self._last_solution, outcome == captcha_retry.ACCEPTED)
+                if self.captcha_corpus and self._last_capture:
+                    self.captcha_corpus.record(outcome=outcome, source='http', **self._last_capture)
+                return outcome
+            
+            def submit(number: int, may_skip: bool) -> str:
+                if not page['fresh']:
+                    # OCR is deterministic, so an unreadable image needs replacing
+                    page['response'] = self.session.get(self.main_url, timeout=self.timeout)
+                    page['response'].raise_for_status()
+                    page['document'] = lxml_html.fromstring(page['response'].content)
+                
+                result = self._submit_captcha(page['response'], page['document'], may_skip)
+                if result is None:
+                    page['fresh'] = False
+                    # A code was read but held back as implausible
+                    if self._last_solution and self._last_solution['text']:
+                        return captcha_retry.SKIPPED
+                    return captcha_retry.UNSOLVED
+                
+                # A rejected code comes back as the landing page with a new CAPTCHA
+                page['response'] = result
+                page['document'] = lxml_html.fromstring(result.content)
+                page['fresh'] = True
+                if self._is_form_page(result.url, page['document']):
+                    return captcha_retry.ACCEPTED
+                logger.warning("CAPTCHA was not accepted over HTTP")
+                return captcha_retry.REJECTED
+            
+            accepted, _ = self.captcha_retry.run(attempt)
+            if not accepted:
+                return None
+            
+            self._authenticated = True
+            self._save_session()
+            return page['response'], page['document']
+    
+    def _is_form_page(self, url: str, document) -> bool:
+        """Check that a page is the appointment form and not the CAPTCHA landing page."""
+        return 'appointment-form' in url and not document.xpath("//input[@name='mailConfirmCode']")
+    
+    def _submit_captcha(self, response: requests.Response, document,
+                        may_skip: bool = False) -> Optional[requests.Response]:
+        """
+        Solve the CAPTCHA on a landing page and post the code.
+        
+        Args:
+            response: Landing page response
+            document: Parsed landing page
+            may_skip: Do not post a code the solver does not find plausible
+        
+        Returns:
+            Response after the POST, or None if OCR produced no text or the code was held back
+        """
+        if not document.xpath("//input[@name='mailConfirmCode']"):
+            # Expired sessions may land anywhere; start from the CAPTCHA page
+            response = self.session.get(self.main_url, timeout=self.timeout)
+            response.raise_for_status()
+            document = lxml_html.fromstring(response.content)
+        
+        forms = document.xpath("//form[.//input[@name='mailConfirmCode']]")
+        if not forms:
+            raise HttpFlowError("CAPTCHA form not found on landing page")
+        form = forms[0]
+        
+        token = self._extract_csrf_token(document, form)
+        captcha_data_url = self._extract_captcha_data_url(response.text, document)
+        
+        image_data = base64.b64decode(captcha_data_url.split(',', 1)[-1])
+        solve_start = time.perf_counter()
+        solution = self.captcha_solver.solve_captcha_detailed(image_data)
+        captcha_text = solution['text'] if solution else None
+        self._last_solution = solution
+        self._last_capture = {
+            'image_data': image_data,
+            'guess': captcha_text,
+            'solve_seconds': time.perf_counter() - solve_start,
+            'confidence': solution['confidence'] if solution else None,
+        }
+        if not captcha_text:
+            logger.error("Failed to solve CAPTCHA")
+            return None
+        if may_skip and not solution.get('plausible', True):
+            logger.warning(f"Not submitting CAPTCHA {captcha_text} (confidence {solution['confidence']:.2f}, "
+                           f"{'valid' if solution['length_valid'] else 'wrong'} length)")
+            return None
+        logger.info(f"CAPTCHA solved: {captcha_text}")
+        
+        payload = self._form_defaults(form)
+        payload['_token'] = token
+        payload['mailConfirmCode'] = captcha_text
+        
+        action = urljoin(response.url, form.get('action') or self.form_url)
+        result = self.session.post(action, data=payload, headers={
+            'Referer': response.url,
+            'X-CSRF-TOKEN': token,
+        }, timeout=self.timeout)
+        result.raise_for_status()
+        return result
+    
+    def _extract_csrf_token(self, document, form) -> str:
+        """Read the Laravel CSRF token from the form or the csrf-token meta tag."""
+        values = form.xpath(".//input[@name='_token']/@value") or document.xpath(
+            "//meta[@name='csrf-token']/@content"
+        )
+        if not values:
+            raise HttpFlowError("CSRF token not found")
+        return values[0]
+    
+    def _extract_captcha_data_url(self, page_text: str, document) -> str:
+        """Find the CAPTCHA as a data URL, preferring the value the page script assigns."""
+        match = self.CAPTCHA_SCRIPT_PATTERN.search(page_text)
+        if match:
+            return match.group(1) + match.group(2).replace('\\/', '/')
+        
+        for src in document.xpath(self.CAPTCHA_IMAGE_XPATH + "/@src"):
+            if src.startswith('data:'):
+                return src
+        
+        raise HttpFlowError("No inline CAPTCHA image found")
+    
+    def _build_form_payload(self, page_url: str, document,
+                            form_values: Dict[str, str]) -> Tuple[str, str, Dict[str, str]]:
+        """
+        Map visible option texts to form values.
+        
+        Returns:
+            Tuple of (action URL, method, payload)
+        """
+        form = None
+        for candidate in document.xpath("//form"):
+            if self._find_field(candidate, 'residence_city') is not None:
+                form = candidate
+                break
+        if form is None:
+            raise HttpFlowError("Appointment form not found")
+        
+        payload = self._form_defaults(form)
+        for key, (tag, _, _) in self.FORM_FIELDS.items():
+            field = self._find_field(form, key)
+            if field is None:
+                raise HttpFlowError(f"Form field for {key} not found")
+            
+            name = field.get('name')
+            if not name:
+                raise HttpFlowError(f"Form field for {key} has no name")
+            
+            if tag == 'input':
+                payload[name] = form_values[key]
+                continue
+            
+            value = self._option_value(field, form_values[key])
+            if value is None:
+                # Dependent dropdowns filled by JavaScript cannot be handled without a browser
+                raise HttpFlowError(f"Option '{form_values[key]}' not offered for {key}")
+            payload[name] = value
+        
+        action = urljoin(page_url, form.get('action') or page_url)
+        method = (form.get('method') or 'post').lower()
+        return action, method, payload
+    
+    def _find_field(self, form, key: str):
+        """Find a form field by the partial name / id conventions in FORM_FIELDS."""
+        tag, name_parts, element_id = self.FORM_FIELDS[key]
+        for element in form.iter(tag):
+            name = (element.get('name') or '').lower()
+            if element.get('id') == element_id or any(part in name for part in name_parts):
+                return element
+        return None
+    
+    def _option_value(self, select, text: str) -> Optional[str]:
+        """Return the value of the option whose visible text is ``text``."""
+        for option in select.iter('option'):
+            if option.text_content().strip() == text:
+                value = option.get('value')
+                return value if value is not None else text
+        return None
+    
+    def _form_defaults(self, form) -> Dict[str, str]:
+        """Collect the values a browser would submit for untouched inputs."""
+        payload = {}
+        for element in form.iter('input'):
+            name = element.get('name')
+            input_type = (element.get('type') or 'text').lower()
+            if not name or input_type in ('submit', 'button', 'image', 'file'):
+                continue
+            if input_type in ('checkbox', 'radio') and element.get('checked') is None:
+                continue
+            payload[name] = element.get('value') or ''
+        return payload
+    
+    def _load_saved_session(self):
+        """Import cookies of a session authenticated by either backend."""
+        if not self.session_store:
+            return
+        cookies = self.session_store.load()
+        for cookie in cookies or []:
+            self.session.cookies.set(
+                cookie['name'],
+                cookie['value'],
+                domain=cookie.get('domain'),
+                path=cookie.get('path', '/')
+            )
+    
+    def _save_session(self):
+        """Export cookies in the format used by Selenium and SessionStore."""
+        if not self.session_store:
+            return
+        cookies: List[Dict] = []
+        for cookie in self.session.cookies:
+            entry = {
+                'name': cookie.name,
+                'value': cookie.value,
+                'domain': cookie.domain,
+                'path': cookie.path,
+                'secure': cookie.secure,
+                'httpOnly': cookie.has_nonstandard_attr('HttpOnly'),
+            }
+            if cookie.expires:
+                entry['expiry'] = cookie.expires
+            cookies.append(entry)
+        self.session_store.save(cookies)
+    
+    def close(self):
+        """Close pooled HTTP connections."""
+        self.session.close()
\ No newline at end of file
@@ -0,0 +1,75 @@
+import base64
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Re-encodes the decoded pixels of a loaded <img>; null if unloaded or the canvas is cross-origin tainted
+_CANVAS_EXPORT_JS = """
+    var img = arguments[0];
+    if (!img.complete || !img.naturalWidth) { return null; }
+    try {
+        var canvas = document.createElement('canvas');
+        canvas.width = img.naturalWidth;
+        canvas.height = img.naturalHeight;
+        canvas.getContext('2d').drawImage(img, 0, 0);
+        return canvas.toDataURL('image/png');
+    } catch (e) {
+        return null;
+    }
+"""
+
+
+def _from_resource_cache(driver, url: str) -> Optional[bytes]:
+    """Original bytes of a resource the page loaded, from the browser's resource tree."""
+    driver.execute_cdp_cmd('Page.enable', {})
+    tree = driver.execute_cdp_cmd('Page.getResourceTree', {})
+    frame_id = tree['frameTree']['frame']['id']
+    resource = driver.execute_cdp_cmd('Page.getResourceContent', {'frameId': frame_id, 'url': url})
+    content = resource.get('content')
+    if not content:
+        return None
+    return base64.b64decode(content) if resource.get('base64Encoded') else content.encode('latin-1')
+
+
+def _from_canvas(driver, element) -> Optional[bytes]:
+    """Pixels of a loaded image, exported as PNG through a canvas."""
+    data_url = driver.execute_script(_CANVAS_EXPORT_JS, element)
+    if not data_url or ',' not in data_url:
+        return None
+    return base64.b64decode(data_url.split(',', 1)[1])
+
+
+def read_displayed_image(driver, element) -> Optional[bytes]:
+    """
+    Read the bytes of an image the browser has already loaded, without a new request.
+    
+    A separate download would go out without the browser's cookies and can
+    be served a different image than the one on screen (e.g. a new CAPTCHA).
+    Tries, in order: the cached response body over the DevTools protocol,
+    a canvas export of the decoded pixels, and a screenshot of the element.
+    
+    Args:
+        driver: Selenium WebDriver showing the image
+        element: The <img> WebElement
+    
+    Returns:
+        Image bytes, or None if every method failed
+    """
+    url = element.get_attribute('src')
+    methods = [
+        ('resource cache', lambda: _from_resource_cache(driver, url)),
+        ('canvas', lambda: _from_canvas(driver, element)),
+        ('element screenshot', lambda: element.screenshot_as_png),
+    ]
+    
+    for name, read in methods:
+        try:
+            image_data = read()
+        except Exception as e:
+            logger.debug(f"Could not read image via {name}: {e}")
+            continue
+        if image_data:
+            logger.debug(f"Read {len(image_data)} byte image via {name}")
+            return image_data
+    return None
\ No newline at end of file
@@ -0,0 +1,120 @@
+import json
+import logging
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ResourceBlocker:
+    """Stops the scraping browser from downloading resources that do not affect availability."""
+    
+    # URL patterns per resource type, in Chrome DevTools wildcard syntax
+    TYPE_PATTERNS = {
+        'image': ['*.png*', '*.jpg*', '*.jpeg*', '*.gif*', '*.svg*', '*.ico*', '*.webp*', '*.bmp*'],
+        'font': ['*fonts.googleapis.com*', '*fonts.gstatic.com*', '*.woff*', '*.ttf*', '*.otf*', '*.eot*'],
+        'stylesheet': ['*.css*'],
+        'media': ['*.mp4*', '*.webm*', '*.mp3*', '*.ogg*', '*.wav*'],
+        'analytics': [
+            '*googletagmanager.com*',
+            '*google-analytics.com*',
+            '*doubleclick.net*',
+            '*facebook.net*',
+            '*hotjar.com*',
+            '*clarity.ms*',
+        ],
+    }
+    DEFAULT_TYPES = ('image', 'font', 'media', 'analytics')
+    DEFAULT_ALLOWED = ('*captcha*',)
+    
+    def __init__(self, block_types: Optional[Iterable[str]] = None,
+                 deny_patterns: Optional[Iterable[str]] = None,
+                 allow_patterns: Optional[Iterable[str]] = None):
+        """
+        Args:
+            block_types: Keys of TYPE_PATTERNS to block (defaults to DEFAULT_TYPES)
+            deny_patterns: Extra URL patterns to block
+            allow_patterns: URL patterns that are never blocked (defaults to DEFAULT_ALLOWED)
+        """
+        block_types = self.DEFAULT_TYPES if block_types is None else block_types
+        self.deny_patterns: List[str] = []
+        for block_type in block_types:
+            if block_type not in self.TYPE_PATTERNS:
+                logger.warning(f"Unknown resource type to block: {block_type}")
+                continue
+            self.deny_patterns.extend(self.TYPE_PATTERNS[block_type])
+        self.deny_patterns.extend(deny_patterns or [])
+        
+        self.allow_patterns = list(self.DEFAULT_ALLOWED if allow_patterns is None else allow_patterns)
+    
+    def apply(self, driver):
+        """
+        Install the block list on a freshly started browser.
+        
+        The browser also records network events in its performance log so
+        ``collect_stats`` can report what was blocked and downloaded.
+        """
+        if not self.deny_patterns:
+            return
+        
+        driver.execute_cdp_cmd('Network.enable', {})
+        try:
+            # Chrome evaluates these in order, so allow entries take precedence
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {
+                'urlPatterns': (
+                    [{'urlPattern': pattern, 'block': False} for pattern in self.allow_patterns]
+                    + [{'urlPattern': pattern, 'block': True} for pattern in self.deny_patterns]
+                )
+            })
+        except Exception:
+            # Older Chrome only takes a plain deny list. The IDATA CAPTCHA is an
+            # inline data: URL and never touches the network, so it stays loadable.
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.deny_patterns})
+            if self.allow_patterns:
+                logger.debug("Browser does not support allow patterns for blocked URLs")
+        
+        logger.debug(f"Blocking {len(self.deny_patterns)} URL patterns in browser")
+    
+    def reset_stats(self, driver):
+        """Discard network events recorded before the current check."""
+        self._read_log(driver)
+    
+    def collect_stats(self, driver) -> Dict[str, int]:
+        """
+        Summarize the network traffic since the last call.
+        
+        Returns:
+            Dictionary with requests issued, blocked and completed and the
+            bytes transferred over the network
+        """
+        stats = {
+            'requests': 0,
+            'requests_blocked': 0,
+            'requests_completed': 0,
+            'bytes_transferred': 0,
+        }
+        for entry in self._read_log(driver):
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, TypeError, ValueError):
+                continue
+            
+            method = message.get('method')
+            params = message.get('params', {})
+            if method == 'Network.requestWillBeSent':
+                stats['requests'] += 1
+            elif method == 'Network.loadingFailed' and params.get('blockedReason'):
+                stats['requests_blocked'] += 1
+            elif method == 'Network.loadingFinished':
+                stats['requests_completed'] += 1
+                stats['bytes_transferred'] += int(params.get('encodedDataLength', 0))
+        return stats
+    
+    def _read_log(self, driver) -> List[Dict]:
+        """Drain the browser's performance log."""
+        if not self.deny_patterns:
+            return []
+        try:
+            return driver.get_log('performance')
+        except Exception as e:
+            logger.debug(f"Performance log unavailable: {e}")
+            return []
\ No newline at end of file
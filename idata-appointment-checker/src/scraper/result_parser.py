@@ -0,0 +1,130 @@
+import re
+from typing import Dict, List, Tuple
+
+from lxml import html as lxml_html
+
+NO_APPOINTMENT_TEXT = "Uygun randevu tarihi bulunmamaktadır"
+
+# One precompiled alternation per question instead of one scan per keyword
+ERROR_PATTERN = re.compile(r'hata|error|başarısız|failed|geçersiz|invalid', re.IGNORECASE)
+SLOT_CLASS_PATTERN = re.compile(r'slot|time|saat|randevu|tarih|date')
+CALENDAR_CLASS_PATTERN = re.compile(r'available|mevcut|uygun|calendar')
+
+SLOT_TAGS = frozenset(['div', 'button', 'a'])
+CALENDAR_TAGS = frozenset(['td', 'div'])
+SKIPPED_TEXT_TAGS = frozenset(['script', 'style'])
+MAX_ERRORS_PER_KEYWORD = 3
+MIN_SLOT_TEXT_LENGTH = 4
+
+
+def _element_text(element) -> str:
+    """Concatenate the stripped text fragments of an element (like BeautifulSoup's get_text(strip=True))."""
+    return ''.join(fragment.strip() for fragment in element.itertext())
+
+
+def parse_result_page(page_content: str, page_url: str = '', page_title: str = '',
+                      response_time: float = 0.0) -> Tuple[bool, str, Dict]:
+    """
+    Decide appointment availability from a result page in a single pass over the document.
+    
+    Args:
+        page_content: HTML of the result page
+        page_url: URL the page was served from
+        page_title: Title of the page
+        response_time: Seconds between form submission and a ready result page
+    
+    Returns:
+        Tuple of (is_available, message, details). ``details`` contains the page
+        metadata, ``slots_found``, ``available_slots`` (first five), ``all_slots``
+        in document order and up to three ``error_messages`` per keyword.
+    """
+    details = {
+        'page_url': page_url,
+        'page_title': page_title,
+        'response_time': f"{response_time:.2f} seconds",
+        'slots_found': 0,
+        'error_messages': []
+    }
+    
+    if isinstance(page_content, str) and page_content.lstrip().startswith('<?xml'):
+        # lxml refuses str input that carries an encoding declaration
+        page_content = page_content.encode('utf-8')
+    
+    # Cheap substring test avoids looking for the message in every text node
+    look_for_no_appointment = (
+        NO_APPOINTMENT_TEXT in page_content if isinstance(page_content, str)
+        else NO_APPOINTMENT_TEXT.encode('utf-8') in page_content
+    )
+    
+    root = lxml_html.fromstring(page_content)
+    
+    error_counts: Dict[str, int] = {}
+    seen_errors = set()
+    slots: Dict[str, None] = {}
+    
+    def scan_text(text):
+        """Check one text node for the no-appointment message and error keywords."""
+        if look_for_no_appointment and NO_APPOINTMENT_TEXT in text:
+            return text.strip()
+        
+        matched = False
+        for keyword in {match.group(0).lower() for match in ERROR_PATTERN.finditer(text)}:
+            if error_counts.get(keyword, 0) < MAX_ERRORS_PER_KEYWORD:
+                error_counts[keyword] = error_counts.get(keyword, 0) + 1
+                matched = True
+        
+        stripped = text.strip()
+        if matched and stripped not in seen_errors:
+            seen_errors.add(stripped)
+            details['error_messages'].append(stripped)
+        return None
+    
+    for element in root.iter():
+        tag = element.tag
+        if not isinstance(tag, str):
+            # Comments and processing instructions: only their tail is page text
+            if element.tail:
+                no_appointment = scan_text(element.tail)
+                if no_appointment:
+                    details['no_appointment_message'] = no_appointment
+                    return False, no_appointment, details
+            continue
+        
+        for text in (None if tag in SKIPPED_TEXT_TAGS else element.text, element.tail):
+            if text:
+                no_appointment = scan_text(text)
+                if no_appointment:
+                    details['no_appointment_message'] = no_appointment
+                    return False, no_appointment, details
+        
+        class_attr = element.get('class')
+        if not class_attr:
+            continue
+        
+        class_attr = class_attr.lower()
+        if (tag in SLOT_TAGS and SLOT_CLASS_PATTERN.search(class_attr)) or (
+                tag in CALENDAR_TAGS and CALENDAR_CLASS_PATTERN.search(class_attr)):
+            slot_text = _element_text(element)
+            if len(slot_text) >= MIN_SLOT_TEXT_LENGTH:
+                slots[slot_text] = None
+    
+    if look_for_no_appointment:
+        # Present in the markup but not as page text (e.g. inside an attribute)
+        return False, "No appointments available", details
+    
+    all_slots: List[str] = list(slots)
+    details['slots_found'] = len(all_slots)
+    
+    if all_slots:
+        available_times = all_slots[:5]
+        details['available_slots'] = available_times
+        details['all_slots'] = all_slots
+        
+        message = f"Appointments available! Found {len(all_slots)} slots"
+        message += f". Available times: {', '.join(available_times)}"
+        return True, message, details
+    
+    if 'appointment' not in page_url.lower():
+        details['page_issue'] = 'Not on appointment page'
+    
+    return False, "No appointment slots found", details
\ No newline at end of file
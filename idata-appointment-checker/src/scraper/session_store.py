@@ -0,0 +1,101 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from src.utils.atomic_json import write_json
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore:
+    """Persists authenticated IDATA session cookies so later checks can skip the CAPTCHA."""
+    
+    def __init__(self, path: str = "session_state.json", max_age_minutes: float = 20):
+        """
+        Args:
+            path: JSON file the session state is written to
+            max_age_minutes: Age after which a saved session is no longer trusted
+        """
+        self.path = path
+        self.max_age_seconds = max_age_minutes * 60
+        self._lock = threading.Lock()
+        self._state: Optional[Dict] = None
+        self._loaded = False
+    
+    def save(self, cookies: List[Dict]):
+        """
+        Save the cookies of an authenticated browser session.
+        
+        Args:
+            cookies: Cookies as returned by ``driver.get_cookies()``
+        """
+        if not cookies:
+            return
+        
+        state = {
+            'saved_at': time.time(),
+            'cookies': cookies,
+        }
+        
+        with self._lock:
+            self._state = state
+            self._loaded = True
+            try:
+                write_json(self.path, state)
+            except OSError as e:
+                logger.warning(f"Failed to persist session state: {e}")
+        
+        logger.debug(f"Saved session with {len(cookies)} cookies")
+    
+    def load(self) -> Optional[List[Dict]]:
+        """
+        Get the saved cookies if the session is still considered valid.
+        
+        Returns:
+            List of unexpired cookies, or None if there is no usable session
+        """
+        with self._lock:
+            if not self._loaded:
+                self._state = self._read_file()
+                self._loaded = True
+            state = self._state
+        
+        if not state or not state.get('cookies'):
+            return None
+        
+        now = time.time()
+        if now - state.get('saved_at', 0) > self.max_age_seconds:
+            logger.info("Saved session is older than the maximum age")
+            return None
+        
+        cookies = [
+            cookie for cookie in state['cookies']
+            if not cookie.get('expiry') or cookie['expiry'] > now
+        ]
+        return cookies or None
+    
+    def invalidate(self):
+        """Forget the saved session, e.g. after the server rejected it."""
+        with self._lock:
+            self._state = None
+            self._loaded = True
+            try:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+            except OSError as e:
+                logger.warning(f"Failed to remove session state file: {e}")
+    
+    def _read_file(self) -> Optional[Dict]:
+        """Read session state from disk."""
+        try:
+            if not os.path.exists(self.path):
+                return None
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+                return data if isinstance(data, dict) else None
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable session state file: {e}")
+            return None
\ No newline at end of file
@@ -0,0 +1,142 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, Tuple
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+logger = logging.getLogger(__name__)
+
+
+class PageWaiter:
+    """Waits for explicit page readiness conditions within per-step time budgets."""
+    
+    # Seconds each named step may take before its waits give up
+    DEFAULT_TIMEOUTS = {
+        'main_page': 15,
+        'captcha_image': 10,
+        'captcha_submit': 15,
+        'appointment_form': 15,
+        'form_field': 5,
+        'form_submit': 20,
+        'results': 20,
+    }
+    DEFAULT_TIMEOUT = 10
+    POLL_FREQUENCY = 0.1
+    SPINNER_SELECTOR = '#spinner-container'
+    NETWORK_IDLE_SECONDS = 0.5
+    
+    _SPINNER_HIDDEN_JS = """
+        var spinner = document.querySelector(arguments[0]);
+        return !spinner || !spinner.classList.contains('active');
+    """
+    _NETWORK_STATE_JS = """
+        var pending = window.jQuery ? window.jQuery.active : 0;
+        return [document.readyState, pending, performance.getEntriesByType('resource').length];
+    """
+    
+    def __init__(self, driver, timeouts: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            driver: Selenium WebDriver to wait on
+            timeouts: Per-step budgets in seconds, overriding DEFAULT_TIMEOUTS
+        """
+        self.driver = driver
+        self.timeouts = dict(self.DEFAULT_TIMEOUTS)
+        self.timeouts.update(timeouts or {})
+        self.timings: Dict[str, float] = {}
+        self._deadline: Optional[float] = None
+    
+    @contextmanager
+    def step(self, name: str, budget: Optional[float] = None):
+        """
+        Time a named step; waits inside the block share the step's budget.
+        
+        Args:
+            name: Step name, also used to look up its budget
+            budget: Explicit budget in seconds (defaults to the configured one)
+        """
+        if budget is None:
+            budget = self.timeouts.get(name, self.DEFAULT_TIMEOUT)
+        
+        start = time.monotonic()
+        outer_deadline = self._deadline
+        self._deadline = start + budget
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - start
+            self._deadline = outer_deadline
+            self.timings[name] = round(self.timings.get(name, 0) + elapsed, 3)
+            logger.info(f"   ⏱️  {name} took {elapsed:.2f}s (budget {budget:g}s)")
+    
+    def _remaining(self) -> float:
+        """Seconds left in the current step budget."""
+        if self._deadline is None:
+            return self.DEFAULT_TIMEOUT
+        return max(self.POLL_FREQUENCY, self._deadline - time.monotonic())
+    
+    def until(self, condition: Callable, message: str = ""):
+        """
+        Wait until ``condition(driver)`` returns a truthy value.
+        
+        Raises:
+            TimeoutException: If the current step budget runs out first
+        """
+        wait = WebDriverWait(
+            self.driver,
+            self._remaining(),
+            poll_frequency=self.POLL_FREQUENCY,
+            ignored_exceptions=(WebDriverException,)
+        )
+        return wait.until(condition, message)
+    
+    def until_element_present(self, locator: Tuple[str, str]):
+        """Wait for an element to be attached to the DOM and return it."""
+        return self.until(EC.presence_of_element_located(locator), f"Element {locator[1]} not present")
+    
+    def until_url_contains(self, fragment: str):
+        """Wait for the current URL to contain ``fragment``."""
+        return self.until(EC.url_contains(fragment), f"URL did not reach {fragment}")
+    
+    def until_url_changes(self, old_url: str):
+        """Wait for navigation away from ``old_url``."""
+        return self.until(EC.url_changes(old_url), "URL did not change")
+    
+    def until_spinner_hidden(self):
+        """Wait for the site's loading overlay to be dismissed."""
+        return self.until(
+            lambda driver: driver.execute_script(self._SPINNER_HIDDEN_JS, self.SPINNER_SELECTOR),
+            "Loading spinner still visible"
+        )
+    
+    def until_network_idle(self, idle_seconds: Optional[float] = None):
+        """
+        Wait until the document is loaded, no jQuery AJAX call is in flight and
+        no new resources were fetched for ``idle_seconds``.
+        """
+        idle_seconds = self.NETWORK_IDLE_SECONDS if idle_seconds is None else idle_seconds
+        state = {'count': -1, 'since': time.monotonic()}
+        
+        def network_idle(driver):
+            ready_state, pending, resource_count = driver.execute_script(self._NETWORK_STATE_JS)
+            now = time.monotonic()
+            if ready_state != 'complete' or pending or resource_count != state['count']:
+                state['count'] = resource_count
+                state['since'] = now
+                return False
+            return now - state['since'] >= idle_seconds
+        
+        return self.until(network_idle, "Network did not become idle")
+    
+    def until_page_ready(self):
+        """Wait for spinner dismissal and network idle; never raises on timeout."""
+        try:
+            self.until_spinner_hidden()
+            self.until_network_idle()
+            return True
+        except TimeoutException:
+            logger.warning("   ⚠️  Page not idle within step budget, continuing")
+            return False
\ No newline at end of file
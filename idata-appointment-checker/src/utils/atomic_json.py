@@ -0,0 +1,53 @@
+import json
+import os
+from contextlib import contextmanager
+from typing import Any, IO, Iterator
+
+
+@contextmanager
+def atomic_open(path: str, mode: str = 'w', fsync: bool = False) -> Iterator[IO]:
+    """
+    Open a file for writing that replaces ``path`` only once it is complete.
+    
+    The content goes to ``<path>.tmp``, which is renamed over ``path`` when
+    the block exits, so a crash mid-write leaves the previous version in
+    place instead of a truncated file.
+    
+    Args:
+        path: File to replace
+        mode: 'w' for text (UTF-8) or 'wb' for bytes
+        fsync: Flush the data to disk before the rename
+    
+    Raises:
+        OSError: If the file cannot be written (``path`` is left untouched)
+    """
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, mode, encoding=None if 'b' in mode else 'utf-8') as f:
+            yield f
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_json(path: str, data: Any, **dump_kwargs):
+    """
+    Atomically replace a JSON file.
+    
+    Args:
+        path: File to write
+        data: JSON-serializable value
+        **dump_kwargs: Passed to ``json.dump`` (e.g. indent)
+    
+    Raises:
+        OSError: If the file cannot be written (``path`` is left untouched)
+    """
+    with atomic_open(path) as f:
+        json.dump(data, f, **dump_kwargs)
\ No newline at end of file
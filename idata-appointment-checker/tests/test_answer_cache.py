@@ -0,0 +1,86 @@
+import numpy as np
+
+from src.captcha.answer_cache import HASH_SIZE, AnswerCache, image_hash
+
+
+def make_key(seed: int) -> str:
+    """Random 256-bit hash as hex."""
+    return np.random.default_rng(seed).integers(0, 256, HASH_SIZE * HASH_SIZE // 8, dtype=np.uint8).tobytes().hex()
+
+
+def flip_bits(key: str, *bits: int) -> str:
+    """The same hash with some bits flipped."""
+    data = bytearray(bytes.fromhex(key))
+    for bit in bits:
+        data[bit // 8] ^= 1 << (bit % 8)
+    return data.hex()
+
+
+def test_exact_hit_and_miss():
+    cache = AnswerCache(path=None)
+    cache.put(make_key(1), 'ABC123')
+    
+    assert cache.get(make_key(1)) == 'ABC123'
+    assert cache.get(make_key(2)) is None
+    assert cache.get_stats()['hits'] == 1
+
+
+def test_near_match_within_distance():
+    cache = AnswerCache(path=None, max_distance=6)
+    key = make_key(1)
+    cache.put(key, 'ABC123')
+    
+    assert cache.get(flip_bits(key, 3, 70, 200)) == 'ABC123'
+    assert cache.get(flip_bits(key, *range(0, 80, 10))) is None
+
+
+def test_repeated_near_hits_keep_answers_apart():
+    cache = AnswerCache(path=None, max_distance=6)
+    keys = [make_key(seed) for seed in range(3)]
+    for number, key in enumerate(keys):
+        cache.put(key, f"ANSWER{number}")
+    
+    # The first near hit moves key 0 to the end of the LRU order
+    assert cache.get(flip_bits(keys[0], 5)) == 'ANSWER0'
+    assert cache.get(flip_bits(keys[1], 9)) == 'ANSWER1'
+    assert cache.get(flip_bits(keys[2], 17)) == 'ANSWER2'
+    assert cache.get(flip_bits(keys[0], 33)) == 'ANSWER0'
+
+
+def test_discard_removes_near_match():
+    cache = AnswerCache(path=None)
+    key = make_key(1)
+    cache.put(key, 'ABC123')
+    cache.discard(flip_bits(key, 1))
+    
+    assert cache.get(key) is None
+    assert cache.get_stats()['discarded'] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = AnswerCache(path=None, max_entries=2)
+    cache.put(make_key(1), 'ONE')
+    cache.put(make_key(2), 'TWO')
+    cache.get(make_key(1))
+    cache.put(make_key(3), 'THREE')
+    
+    assert cache.get(make_key(2)) is None
+    assert cache.get(make_key(1)) == 'ONE'
+    assert cache.get_stats()['evicted'] == 1
+
+
+def test_entries_persist(tmp_path):
+    path = str(tmp_path / 'answers.json')
+    AnswerCache(path=path).put(make_key(1), 'ABC123')
+    
+    assert AnswerCache(path=path).get(make_key(1)) == 'ABC123'
+
+
+def test_image_hash_tolerates_small_noise():
+    rng = np.random.default_rng(0)
+    gray = (rng.random((40, 120)) * 255).astype(np.uint8)
+    noisy = np.clip(gray.astype(np.int16) + rng.integers(-3, 4, gray.shape), 0, 255).astype(np.uint8)
+    
+    distance = bin(int(image_hash(gray), 16) ^ int(image_hash(noisy), 16)).count('1')
+    assert len(image_hash(gray)) == HASH_SIZE * HASH_SIZE // 4
+    assert distance <= 6
\ No newline at end of file
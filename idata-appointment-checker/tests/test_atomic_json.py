@@ -0,0 +1,33 @@
+import json
+
+import pytest
+
+from src.utils.atomic_json import atomic_open, write_json
+
+
+def test_write_json_replaces_the_file(tmp_path):
+    path = tmp_path / 'state.json'
+    write_json(str(path), {'a': 1})
+    write_json(str(path), {'a': 2}, indent=2)
+    
+    assert json.loads(path.read_text()) == {'a': 2}
+    assert [p.name for p in tmp_path.iterdir()] == ['state.json']
+
+
+def test_failed_write_keeps_the_previous_version(tmp_path):
+    path = tmp_path / 'state.json'
+    write_json(str(path), {'a': 1})
+    
+    with pytest.raises(TypeError):
+        write_json(str(path), {'a': object()})
+    
+    assert json.loads(path.read_text()) == {'a': 1}
+    assert [p.name for p in tmp_path.iterdir()] == ['state.json']
+
+
+def test_atomic_open_writes_bytes(tmp_path):
+    path = tmp_path / 'image.png'
+    with atomic_open(str(path), 'wb', fsync=True) as f:
+        f.write(b'\x89PNG')
+    
+    assert path.read_bytes() == b'\x89PNG'
\ No newline at end of file
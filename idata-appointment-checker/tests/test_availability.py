@@ -0,0 +1,131 @@
+import pytest
+
+from src.notifier import availability
+from src.notifier.availability import AvailabilityTracker, format_changes
+from src.scraper.appointment_checker import AppointmentChecker
+from src.scraper.result_parser import parse_result_page
+
+PROFILE = {
+    'residence_city': 'İstanbul',
+    'idata_office': 'Altunizade',
+    'travel_purpose': 'Tourism',
+    'service_type': 'Standard',
+    'num_persons': '1',
+}
+
+SLOTS_PAGE = '<html><body>{}</body></html>'
+NO_SLOTS_PAGE = '<html><body><p>Uygun randevu tarihi bulunmamaktadır</p></body></html>'
+ERROR_PAGE = '<html><body><div class="alert alert-danger">İşlem sırasında bir hata oluştu.</div></body></html>'
+
+
+def page_result(page: str, url: str = 'https://example.test/appointment') -> dict:
+    """Profile result for a result page, as AppointmentChecker builds it."""
+    available, message, details = parse_result_page(page, url)
+    return {'label': 'Altunizade', 'profile': dict(PROFILE), 'available': available,
+            'message': message, 'details': details}
+
+
+def slots_result(*slots: str) -> dict:
+    return page_result(SLOTS_PAGE.format(''.join(f'<div class="slot">{slot}</div>' for slot in slots)))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(availability.time, 'time', lambda: now[0])
+    return now
+
+
+def events(tracker, result):
+    return [change['event'] for change in tracker.update([result])]
+
+
+def test_new_slots_are_announced_once(clock):
+    tracker = AvailabilityTracker(path=None, reminder_minutes=0)
+    
+    assert events(tracker, slots_result('10:00', '10:30')) == ['new']
+    assert events(tracker, slots_result('10:30', '10:00')) == []
+
+
+def test_only_added_slots_count_as_change(clock):
+    tracker = AvailabilityTracker(path=None, reminder_minutes=0)
+    tracker.update([slots_result('10:00', '10:30')])
+    
+    assert events(tracker, slots_result('10:00')) == []
+    changes = tracker.update([slots_result('10:00', '11:00')])
+    assert [(change['event'], change['added']) for change in changes] == [('changed', ['11:00'])]
+
+
+def test_reminder_after_cadence(clock):
+    tracker = AvailabilityTracker(path=None, reminder_minutes=60)
+    tracker.update([slots_result('10:00')])
+    
+    clock[0] += 59 * 60
+    assert events(tracker, slots_result('10:00')) == []
+    clock[0] += 60
+    assert events(tracker, slots_result('10:00')) == ['reminder']
+    clock[0] += 30 * 60
+    assert events(tracker, slots_result('10:00')) == []
+
+
+def test_closed_slots_are_announced_again_when_reopened(clock):
+    tracker = AvailabilityTracker(path=None, reminder_minutes=0)
+    tracker.update([slots_result('10:00')])
+    
+    assert events(tracker, page_result(NO_SLOTS_PAGE)) == []
+    assert events(tracker, slots_result('10:00')) == ['new']
+
+
+@pytest.mark.parametrize('inconclusive', [
+    page_result(ERROR_PAGE),
+    page_result('<html><body><p>Welcome</p></body></html>', 'https://example.test/'),
+    {'label': 'Altunizade', 'profile': dict(PROFILE), 'available': False, 'message': 'Failed to solve CAPTCHA',
+     'details': {'error': 'CAPTCHA solving failed'}},
+])
+def test_failed_checks_keep_the_state(clock, inconclusive):
+    tracker = AvailabilityTracker(path=None, reminder_minutes=0)
+    tracker.update([slots_result('10:00', '10:30')])
+    
+    assert events(tracker, inconclusive) == []
+    assert events(tracker, slots_result('10:00', '10:30')) == []
+
+
+def test_crashed_batch_keeps_the_state(clock, monkeypatch):
+    checker = AppointmentChecker(config={
+        'appointment': {'profiles': [PROFILE]},
+        'scraper': {'session_persistence': False, 'block_resources': False},
+        'captcha': {'tuning': False, 'answer_cache': False, 'ensemble': False},
+    })
+    
+    def crash(profiles):
+        raise RuntimeError("worker died")
+    
+    monkeypatch.setattr(checker, '_check_batch', crash)
+    try:
+        [crashed] = checker._check_profiles([PROFILE])
+    finally:
+        checker.close()
+    tracker = AvailabilityTracker(path=None, reminder_minutes=0)
+    tracker.update([slots_result('10:00', '10:30')])
+    
+    assert events(tracker, crashed) == []
+    assert events(tracker, slots_result('10:00', '10:30')) == []
+
+
+def test_state_survives_restart(clock, tmp_path):
+    path = str(tmp_path / 'availability.json')
+    AvailabilityTracker(path=path).update([slots_result('10:00')])
+    
+    assert events(AvailabilityTracker(path=path), slots_result('10:00')) == []
+
+
+def test_format_changes_lists_added_slots():
+    text = format_changes([
+        {'label': 'Altunizade', 'event': 'changed', 'slots': ['10:00', '11:00'], 'added': ['11:00']},
+        {'label': 'Gayrettepe', 'event': 'new', 'slots': [f"{hour}:00" for hour in range(9, 17)], 'added': []},
+    ])
+    
+    assert text.splitlines() == [
+        "🔄 Altunizade: 1 new slots, 2 open in total. Available times: 11:00",
+        "🆕 Gayrettepe: 8 slots open. Available times: 9:00, 10:00, 11:00, 12:00, 13:00 and 3 more",
+    ]
\ No newline at end of file
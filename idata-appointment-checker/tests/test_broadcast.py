@@ -0,0 +1,106 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from telegram.error import Forbidden, RetryAfter, TimedOut
+
+from src.bot import broadcast
+from src.bot.broadcast import Broadcaster, TokenBucket
+
+
+class FakeClock:
+    """Virtual monotonic clock for a single task; sleeping advances it instead of waiting."""
+    
+    def __init__(self):
+        self.now = 0.0
+        self._sleep = asyncio.sleep
+    
+    def monotonic(self):
+        return self.now
+    
+    async def sleep(self, seconds):
+        self.now += seconds
+        await self._sleep(0)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(broadcast, 'time', SimpleNamespace(monotonic=clock.monotonic))
+    monkeypatch.setattr(broadcast.asyncio, 'sleep', clock.sleep)
+    return clock
+
+
+class FakeBot:
+    """Bot whose send_message raises the scripted errors per chat before succeeding."""
+    
+    def __init__(self, errors=None):
+        self.errors = {chat_id: list(chat_errors) for chat_id, chat_errors in (errors or {}).items()}
+        self.sent = []
+    
+    async def send_message(self, chat_id, text, parse_mode=None):
+        pending = self.errors.get(chat_id)
+        if pending:
+            raise pending.pop(0)
+        self.sent.append((chat_id, time.monotonic()))
+
+
+def acquire_times(clock, bucket, count):
+    async def run():
+        times = []
+        for _ in range(count):
+            await bucket.acquire()
+            times.append(round(clock.now, 3))
+        return times
+    return asyncio.run(run())
+
+
+def test_bucket_paces_evenly(clock):
+    assert acquire_times(clock, TokenBucket(rate=10), 4) == [0.0, 0.1, 0.2, 0.3]
+
+
+def test_bucket_allows_a_burst_up_to_capacity(clock):
+    assert acquire_times(clock, TokenBucket(rate=10, capacity=3), 5) == [0.0, 0.0, 0.0, 0.1, 0.2]
+
+
+def test_pause_holds_tokens_back_and_drops_the_burst(clock):
+    bucket = TokenBucket(rate=10, capacity=3)
+    bucket.pause(2)
+    
+    times = acquire_times(clock, bucket, 3)
+    assert times[0] >= 2.0
+    assert all(later - earlier >= 0.1 - 1e-9 for earlier, later in zip(times, times[1:]))
+
+
+def test_broadcast_report():
+    bot = FakeBot(errors={
+        2: [Forbidden("Forbidden: bot was blocked by the user")],
+        3: [TimedOut()],
+        4: [TimedOut(), TimedOut(), TimedOut()],
+    })
+    broadcaster = Broadcaster(bot, messages_per_second=1000, per_chat_interval=0.01, max_retries=2)
+    
+    report = asyncio.run(broadcaster.send_all([1, 2, 3, 4, 1], 'hello'))
+    
+    assert report['recipients'] == 4
+    assert sorted(report['delivered_to']) == [1, 3]
+    assert report['delivered'] == 2
+    assert report['unreachable'] == [2]
+    assert report['failed'] == 1
+    assert report['retries'] == 3
+    assert [chat_id for chat_id, _ in bot.sent].count(1) == 1
+
+
+def test_retry_after_pauses_everyone_without_using_up_retries():
+    bot = FakeBot(errors={1: [RetryAfter(0.2)]})
+    broadcaster = Broadcaster(bot, messages_per_second=1000, per_chat_interval=0.01, max_retries=0)
+    
+    start = time.monotonic()
+    report = asyncio.run(broadcaster.send_all([1, 2, 3], 'hello'))
+    
+    assert report['delivered'] == 3
+    assert report['rate_limited'] == 1
+    assert report['retries'] == 0
+    assert sorted(chat_id for chat_id, _ in bot.sent) == [1, 2, 3]
+    assert min(sent_at for _, sent_at in bot.sent) - start >= 0.2
\ No newline at end of file
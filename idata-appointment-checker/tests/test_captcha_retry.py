@@ -0,0 +1,88 @@
+import pytest
+
+from src.scraper import captcha_retry
+from src.scraper.captcha_retry import ACCEPTED, ERROR, REJECTED, SKIPPED, UNSOLVED, CaptchaRetryPolicy
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(captcha_retry.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def scripted(*outcomes, clock=None, seconds=0.0):
+    """Attempt callable replaying ``outcomes`` and recording whether it was allowed to skip."""
+    calls = []
+    
+    def attempt(number, may_skip):
+        calls.append((number, may_skip))
+        if clock is not None:
+            clock[0] += seconds
+        return outcomes[len(calls) - 1]
+    
+    return attempt, calls
+
+
+def outcomes(log):
+    return [entry['outcome'] for entry in log]
+
+
+def test_retries_until_accepted(clock):
+    attempt, calls = scripted(REJECTED, UNSOLVED, ACCEPTED)
+    accepted, log = CaptchaRetryPolicy(max_attempts=3).run(attempt)
+    
+    assert accepted
+    assert outcomes(log) == [REJECTED, UNSOLVED, ACCEPTED]
+    assert [number for number, _ in calls] == [1, 2, 3]
+
+
+def test_gives_up_after_max_attempts(clock):
+    attempt, _ = scripted(REJECTED, ERROR, REJECTED, ACCEPTED)
+    accepted, log = CaptchaRetryPolicy(max_attempts=3).run(attempt)
+    
+    assert not accepted
+    assert outcomes(log) == [REJECTED, ERROR, REJECTED]
+
+
+def test_time_budget_stops_further_attempts(clock):
+    attempt, _ = scripted(REJECTED, REJECTED, ACCEPTED, clock=clock, seconds=30)
+    accepted, log = CaptchaRetryPolicy(max_attempts=5, time_budget_seconds=50).run(attempt)
+    
+    assert not accepted
+    assert outcomes(log) == [REJECTED, REJECTED]
+
+
+def test_skips_do_not_count_as_submissions(clock):
+    attempt, calls = scripted(SKIPPED, SKIPPED, REJECTED, ACCEPTED)
+    accepted, log = CaptchaRetryPolicy(max_attempts=2, max_skips=2).run(attempt)
+    
+    assert accepted
+    assert outcomes(log) == [SKIPPED, SKIPPED, REJECTED, ACCEPTED]
+    # Once the skips are used up the reading in hand has to be submitted
+    assert [may_skip for _, may_skip in calls] == [True, True, False, False]
+
+
+def test_no_skipping_once_the_budget_is_spent(clock):
+    attempt, calls = scripted(SKIPPED, ACCEPTED, clock=clock, seconds=61)
+    accepted, _ = CaptchaRetryPolicy(max_attempts=1, time_budget_seconds=60, max_skips=3).run(attempt)
+    
+    assert accepted
+    assert [may_skip for _, may_skip in calls] == [True, False]
+
+
+def test_stats_add_up_over_authentications(clock):
+    policy = CaptchaRetryPolicy(max_attempts=2, max_skips=1)
+    policy.run(scripted(SKIPPED, REJECTED, ACCEPTED)[0])
+    policy.run(scripted(UNSOLVED, REJECTED)[0])
+    
+    assert policy.get_stats() == {
+        'authentications': 2,
+        'succeeded': 1,
+        'attempts': 5,
+        ACCEPTED: 1,
+        REJECTED: 2,
+        UNSOLVED: 1,
+        ERROR: 0,
+        SKIPPED: 1,
+    }
\ No newline at end of file
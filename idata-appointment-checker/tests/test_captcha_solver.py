@@ -0,0 +1,84 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.captcha import solver as solver_module
+from src.captcha.base import CaptchaSolverBase
+from src.captcha.ocr_engine import OcrEngine
+from src.captcha.solver import CaptchaSolver
+
+
+class FakeEngine(OcrEngine):
+    name = 'fake'
+
+
+class FakeTuner:
+    """Hands out one arm and records the verdicts it is credited with."""
+    
+    def __init__(self):
+        self.reports = []
+    
+    def choose(self):
+        return 't140_b3_s2', dict(CaptchaSolver.DEFAULT_PARAMS)
+    
+    def report(self, name, accepted):
+        self.reports.append((name, accepted))
+
+
+@pytest.fixture
+def image_data():
+    image = np.full((40, 120), 255, dtype=np.uint8)
+    cv2.putText(image, 'AB12CD', (5, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.9, 0, 2)
+    return cv2.imencode('.png', image)[1].tobytes()
+
+
+def make_solver(monkeypatch, readings, ensemble=True):
+    """Solver whose variants read as given in ``readings`` (variant -> text)."""
+    monkeypatch.setattr(solver_module, 'create_ocr_engine', lambda name: FakeEngine())
+    solver = CaptchaSolver({'captcha': {'ensemble': ensemble, 'tuning': False, 'answer_cache': False, 'length': 6}})
+    solver.tuner = FakeTuner()
+    monkeypatch.setattr(solver, '_recognize',
+                        lambda variant, image: solver._candidate(variant, [(readings[variant], 90.0)]))
+    return solver
+
+
+def test_arm_credited_when_answer_is_the_tuned_reading(monkeypatch, image_data):
+    readings = dict.fromkeys(CaptchaSolver.ENSEMBLE_VARIANTS, 'AB12CD')
+    solver = make_solver(monkeypatch, readings)
+    
+    result = solver.solve_captcha_detailed(image_data)
+    solver.report_outcome(result, accepted=True)
+    
+    assert result['text'] == 'AB12CD'
+    assert solver.tuner.reports == [('t140_b3_s2', True)]
+
+
+def test_arm_not_credited_when_other_variants_outvote_it(monkeypatch, image_data):
+    readings = dict.fromkeys(CaptchaSolver.ENSEMBLE_VARIANTS, 'AB12CD')
+    readings['fixed'] = 'XB12CD'
+    solver = make_solver(monkeypatch, readings)
+    
+    result = solver.solve_captcha_detailed(image_data)
+    solver.report_outcome(result, accepted=False)
+    
+    assert result['text'] == 'AB12CD'
+    assert result['tuning_arm'] is None
+    assert solver.tuner.reports == []
+
+
+def test_single_variant_mode_always_credits_the_arm(monkeypatch, image_data):
+    solver = make_solver(monkeypatch, {'fixed': 'AB12'}, ensemble=False)
+    
+    result = solver.solve_captcha_detailed(image_data)
+    solver.report_outcome(result, accepted=False)
+    
+    assert not result['plausible']
+    assert solver.tuner.reports == [('t140_b3_s2', False)]
+
+
+def test_solver_without_solve_captcha_detailed_cannot_be_created():
+    class Incomplete(CaptchaSolverBase):
+        pass
+    
+    with pytest.raises(TypeError):
+        Incomplete({'tuning': False, 'answer_cache': False})
\ No newline at end of file
@@ -0,0 +1,99 @@
+import pytest
+from lxml import html as lxml_html
+
+from src.config import _parse_profiles, describe_appointment
+from src.scraper.http_checker import HttpAppointmentClient, HttpFlowError
+
+FORM_URL = 'https://example.test/tr/appointment-form'
+
+FORM_PAGE = """
+<html><body>
+  <form id="search"><input name="q"></form>
+  <form action="/tr/appointment-result" method="POST">
+    <input type="hidden" name="_token" value="csrf123">
+    <select name="residenceCity" id="residence-city">
+      <option value="">Seçiniz</option>
+      <option value="34">İstanbul</option>
+      <option value="6">Ankara</option>
+    </select>
+    <select name="officeId" id="idata-office">
+      <option value="12">Altunizade</option>
+      <option value="14">Gayrettepe</option>
+    </select>
+    <select name="travelPurpose"><option value="1">Tourism</option></select>
+    <select name="serviceType"><option>Standard</option><option>VIP</option></select>
+    <input type="number" name="personCount" value="1">
+    <input type="checkbox" name="kvkk" value="1" checked>
+    <input type="checkbox" name="newsletter" value="1">
+    <input type="submit" name="send" value="Ara">
+  </form>
+</body></html>
+"""
+
+PROFILE = {
+    'residence_city': 'İstanbul',
+    'idata_office': 'Gayrettepe',
+    'travel_purpose': 'Tourism',
+    'service_type': 'VIP',
+    'num_persons': '2',
+}
+
+
+@pytest.fixture
+def client():
+    return HttpAppointmentClient('https://example.test/', '/', '/tr/appointment-form', captcha_solver=None)
+
+
+def test_profiles_are_parsed_from_the_environment_format():
+    profiles = _parse_profiles(' İstanbul|Altunizade|Tourism|Standard|1 ; Ankara | Ankara Ofis|Business|VIP|2;')
+    
+    assert profiles == [
+        {'residence_city': 'İstanbul', 'idata_office': 'Altunizade', 'travel_purpose': 'Tourism',
+         'service_type': 'Standard', 'num_persons': '1'},
+        {'residence_city': 'Ankara', 'idata_office': 'Ankara Ofis', 'travel_purpose': 'Business',
+         'service_type': 'VIP', 'num_persons': '2'},
+    ]
+    assert _parse_profiles('') == []
+
+
+def test_incomplete_profile_is_rejected():
+    with pytest.raises(ValueError):
+        _parse_profiles('İstanbul|Altunizade|Tourism')
+
+
+def test_startup_description_lists_the_profiles_that_are_checked():
+    legacy = {'residence_city': 'İstanbul', 'idata_offices': ['Altunizade', 'Gayrettepe'],
+              'travel_purpose': 'Tourism', 'service_type': 'Standard', 'num_persons': '3', 'profiles': []}
+    
+    assert describe_appointment(legacy)[:2] == ['City: İstanbul', 'Offices: Altunizade, Gayrettepe']
+    assert describe_appointment(dict(legacy, profiles=[PROFILE, dict(PROFILE, residence_city='Ankara')])) == [
+        'Profile 1: İstanbul, Gayrettepe, Tourism, VIP, 2 persons',
+        'Profile 2: Ankara, Gayrettepe, Tourism, VIP, 2 persons',
+    ]
+
+
+def test_payload_maps_a_profile_onto_the_form(client):
+    action, method, payload = client._build_form_payload(FORM_URL, lxml_html.fromstring(FORM_PAGE), PROFILE)
+    
+    assert action == 'https://example.test/tr/appointment-result'
+    assert method == 'post'
+    assert payload == {
+        '_token': 'csrf123',
+        'residenceCity': '34',
+        'officeId': '14',
+        'travelPurpose': '1',
+        # Options without a value attribute submit their text
+        'serviceType': 'VIP',
+        'personCount': '2',
+        'kvkk': '1',
+    }
+
+
+def test_option_missing_from_the_form_falls_back_to_the_browser(client):
+    with pytest.raises(HttpFlowError):
+        client._build_form_payload(FORM_URL, lxml_html.fromstring(FORM_PAGE), dict(PROFILE, idata_office='Bursa'))
+
+
+def test_page_without_the_appointment_form_falls_back_to_the_browser(client):
+    with pytest.raises(HttpFlowError):
+        client._build_form_payload(FORM_URL, lxml_html.fromstring('<html><body><form></form></body></html>'), PROFILE)
\ No newline at end of file
@@ -0,0 +1,81 @@
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.scraper.appointment_checker import AppointmentChecker
+
+PROFILE = {
+    'residence_city': 'İstanbul',
+    'idata_office': 'Altunizade',
+    'travel_purpose': 'Tourism',
+    'service_type': 'Standard',
+    'num_persons': '1',
+}
+
+BROKEN_CAPTCHA_PAGE = b"""
+<html><body>
+  <form method="post" action="/tr">
+    <input type="hidden" name="_token" value="csrf123">
+    <img class="imageCaptcha" src="data:image/png;base64,abc">
+    <input name="mailConfirmCode">
+  </form>
+</body></html>
+"""
+
+
+@contextmanager
+def serving(body: bytes):
+    """Local site answering every request with ``body``."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, *args):
+            pass
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@contextmanager
+def http_checker(base_url: str):
+    checker = AppointmentChecker(config={
+        'appointment': {'profiles': [PROFILE]},
+        'scraper': {'base_url': base_url, 'backend': 'http', 'session_persistence': False,
+                    'block_resources': False},
+        'captcha': {'tuning': False, 'answer_cache': False, 'ensemble': False},
+    })
+    try:
+        yield checker
+    finally:
+        checker.close()
+
+
+@pytest.mark.parametrize('body', [b'', BROKEN_CAPTCHA_PAGE], ids=['empty body', 'broken captcha data url'])
+def test_unreadable_http_response_falls_back_to_the_browser(body, monkeypatch):
+    with serving(body) as base_url, http_checker(base_url) as checker:
+        @contextmanager
+        def no_browser(timeout=None):
+            raise RuntimeError("browser fallback reached")
+            yield
+        
+        monkeypatch.setattr(checker.driver_pool, 'driver', no_browser)
+        
+        assert checker._check_profile_http(PROFILE) is None
+        assert not checker.http_client.is_available()
+        
+        checker.http_client._disabled_until = 0.0
+        [result] = checker._check_batch([PROFILE])
+        assert result['details']['error'] == "browser fallback reached"
\ No newline at end of file
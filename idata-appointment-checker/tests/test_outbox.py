@@ -0,0 +1,152 @@
+import pytest
+
+from src.notifier.dispatcher import OutboxDispatcher
+from src.notifier.outbox import NotificationOutbox
+
+
+@pytest.fixture(params=['file', 'database'])
+def outbox(request, tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'outbox.db'}" if request.param == 'database' else None
+    outbox = NotificationOutbox(database_url=database_url, path=str(tmp_path / 'outbox.jsonl'))
+    yield outbox
+    outbox.close()
+
+
+def enqueue(outbox, kind='appointment'):
+    return outbox.enqueue(kind, 'Subject', 'Body', '*Body*')
+
+
+class Recipients:
+    """deliver() stand-in serving a fixed recipient list, failing the ones listed in ``down``."""
+    
+    def __init__(self, *recipients, down=()):
+        self.recipients = recipients
+        self.down = set(down)
+        self.calls = []
+    
+    def __call__(self, notification, served, record):
+        self.calls.append(set(served))
+        missing = [recipient for recipient in self.recipients if recipient not in served]
+        record({recipient: 'delivered' for recipient in missing if recipient not in self.down})
+        if any(recipient in self.down for recipient in missing):
+            return f"{len(self.down)} recipients unreachable"
+        return None
+
+
+def test_claimed_notifications_are_not_handed_out_twice(outbox):
+    first = enqueue(outbox)
+    second = enqueue(outbox, kind='status')
+    
+    claimed = outbox.claim_due()
+    assert [n['id'] for n in claimed] == [first, second]
+    assert claimed[0]['attempts'] == 0
+    assert outbox.claim_due() == []
+    assert outbox.pending_count() == 2
+
+
+def test_recorded_recipients_are_remembered(outbox):
+    notification_id = enqueue(outbox)
+    outbox.record(notification_id, {'telegram:1': 'delivered', 'email:a@example.test': 'unreachable'})
+    outbox.record(notification_id, {'telegram:1': 'delivered', 'telegram:2': 'delivered'})
+    
+    assert outbox.served_recipients(notification_id) == {'telegram:1', 'telegram:2', 'email:a@example.test'}
+
+
+def test_retry_and_complete(outbox):
+    notification_id = enqueue(outbox)
+    outbox.claim_due()
+    
+    outbox.retry_later(notification_id, 0, error='SMTP down')
+    assert [n['attempts'] for n in outbox.claim_due()] == [1]
+    
+    outbox.retry_later(notification_id, 3600)
+    assert outbox.claim_due() == []
+    
+    outbox.complete(notification_id)
+    assert outbox.pending_count() == 0
+
+
+def test_restart_resumes_with_the_missing_recipients(tmp_path):
+    path = str(tmp_path / 'outbox.jsonl')
+    outbox = NotificationOutbox(path=path)
+    done = enqueue(outbox)
+    notification_id = enqueue(outbox)
+    outbox.claim_due()
+    outbox.record(notification_id, {'telegram:1': 'delivered'})
+    outbox.complete(done)
+    
+    restarted = NotificationOutbox(path=path)
+    
+    # The claim of the crashed run does not survive the restart
+    assert [n['id'] for n in restarted.claim_due()] == [notification_id]
+    assert restarted.served_recipients(notification_id) == {'telegram:1'}
+
+
+def test_torn_last_line_is_skipped(tmp_path):
+    path = tmp_path / 'outbox.jsonl'
+    outbox = NotificationOutbox(path=str(path))
+    notification_id = enqueue(outbox)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"op": "record", "id": "')
+    
+    restarted = NotificationOutbox(path=str(path))
+    
+    assert restarted.pending_count() == 1
+    assert restarted.served_recipients(notification_id) == set()
+
+
+def test_log_starts_afresh_once_everything_is_delivered(tmp_path):
+    path = tmp_path / 'outbox.jsonl'
+    outbox = NotificationOutbox(path=str(path))
+    notification_id = enqueue(outbox)
+    outbox.complete(notification_id)
+    
+    assert path.read_text() == ''
+
+
+def test_dispatcher_resumes_a_partial_delivery(outbox):
+    enqueue(outbox)
+    deliver = Recipients('telegram:1', 'telegram:2', down=['telegram:2'])
+    
+    def flaky(notification, served, record):
+        error = deliver(notification, served, record)
+        # telegram:2 is back for the retry
+        deliver.down.clear()
+        return error
+    
+    dispatcher = OutboxDispatcher(outbox, flaky, retry_base_seconds=0)
+    
+    assert dispatcher.run_once() == 2
+    assert deliver.calls == [set(), {'telegram:1'}]
+    assert dispatcher.get_stats() == {'sent': 1, 'retried': 1, 'failed': 0, 'pending': 0}
+
+
+def test_dispatcher_gives_up_after_max_attempts(outbox):
+    enqueue(outbox)
+    
+    def broken(notification, served, record):
+        raise ConnectionError()
+    
+    dispatcher = OutboxDispatcher(outbox, broken, max_attempts=3, retry_base_seconds=0)
+    
+    # Retries without delay are due again within the same run
+    assert dispatcher.run_once() == 3
+    assert dispatcher.get_stats() == {'sent': 0, 'retried': 2, 'failed': 1, 'pending': 0}
+
+
+def test_retry_delay_backs_off_exponentially():
+    delays = []
+    
+    class RecordingOutbox:
+        def served_recipients(self, notification_id):
+            return set()
+        
+        def retry_later(self, notification_id, delay_seconds, error=None):
+            delays.append(delay_seconds)
+    
+    dispatcher = OutboxDispatcher(RecordingOutbox(), Recipients('email', down=['email']), max_attempts=10,
+                                  retry_base_seconds=30, retry_max_seconds=100)
+    for attempts in range(4):
+        dispatcher._dispatch({'id': 'n1', 'kind': 'status', 'attempts': attempts})
+    
+    assert delays == [30, 60, 100, 100]
\ No newline at end of file
@@ -0,0 +1,82 @@
+import json
+
+from src.scraper.resource_blocker import ResourceBlocker
+
+
+class FakeDriver:
+    """Records DevTools commands and serves a canned performance log."""
+    
+    def __init__(self, log=None, legacy=False):
+        self.commands = []
+        self.log = list(log or [])
+        self.legacy = legacy
+    
+    def execute_cdp_cmd(self, command, params):
+        if self.legacy and 'urlPatterns' in params:
+            raise Exception("Invalid parameters")
+        self.commands.append((command, params))
+    
+    def get_log(self, log_type):
+        entries, self.log = self.log, []
+        return entries
+
+
+def event(method, **params):
+    return {'message': json.dumps({'message': {'method': method, 'params': params}})}
+
+
+def test_patterns_follow_the_configured_types():
+    blocker = ResourceBlocker(block_types=['font', 'unknown'], deny_patterns=['*ads.example*'], allow_patterns=[])
+    
+    assert blocker.deny_patterns == ResourceBlocker.TYPE_PATTERNS['font'] + ['*ads.example*']
+    assert blocker.allow_patterns == []
+
+
+def test_allow_patterns_are_sent_before_deny_patterns():
+    driver = FakeDriver()
+    ResourceBlocker(block_types=['stylesheet']).apply(driver)
+    
+    assert driver.commands[0] == ('Network.enable', {})
+    assert driver.commands[1] == ('Network.setBlockedURLs', {'urlPatterns': [
+        {'urlPattern': '*captcha*', 'block': False},
+        {'urlPattern': '*.css*', 'block': True},
+    ]})
+
+
+def test_older_browsers_get_a_plain_deny_list():
+    driver = FakeDriver(legacy=True)
+    ResourceBlocker(block_types=['stylesheet']).apply(driver)
+    
+    assert driver.commands[-1] == ('Network.setBlockedURLs', {'urls': ['*.css*']})
+
+
+def test_nothing_is_installed_without_patterns():
+    driver = FakeDriver(log=[event('Network.requestWillBeSent')])
+    blocker = ResourceBlocker(block_types=[])
+    blocker.apply(driver)
+    
+    assert driver.commands == []
+    assert blocker.collect_stats(driver)['requests'] == 0
+
+
+def test_stats_count_network_events_since_the_last_call():
+    driver = FakeDriver(log=[event('Network.requestWillBeSent')])
+    blocker = ResourceBlocker()
+    blocker.reset_stats(driver)
+    driver.log = [
+        event('Network.requestWillBeSent'),
+        event('Network.requestWillBeSent'),
+        event('Network.requestWillBeSent'),
+        event('Network.loadingFailed', blockedReason='inspector'),
+        event('Network.loadingFailed', errorText='net::ERR_FAILED'),
+        event('Network.loadingFinished', encodedDataLength=1200),
+        {'message': 'not json'},
+    ]
+    
+    assert blocker.collect_stats(driver) == {
+        'requests': 3,
+        'requests_blocked': 1,
+        'requests_completed': 1,
+        'bytes_transferred': 1200,
+    }
+    assert blocker.collect_stats(driver)['requests'] == 0
\ No newline at end of file
@@ -0,0 +1,66 @@
+from src.scraper.result_parser import parse_result_page
+
+APPOINTMENT_URL = 'https://example.test/appointment'
+
+
+def page(body: str) -> str:
+    return f'<html><head><title>Randevu</title></head><body>{body}</body></html>'
+
+
+def test_no_appointment_message_wins():
+    available, message, details = parse_result_page(
+        page('<div class="slot">10:00</div><p> Uygun randevu tarihi bulunmamaktadır. </p>'), APPOINTMENT_URL)
+    
+    assert not available
+    assert message == 'Uygun randevu tarihi bulunmamaktadır.'
+    assert details['no_appointment_message'] == message
+
+
+def test_no_appointment_text_outside_page_text():
+    available, message, details = parse_result_page(
+        page('<input value="Uygun randevu tarihi bulunmamaktadır">'), APPOINTMENT_URL)
+    
+    assert not available
+    assert message == 'No appointments available'
+    assert 'no_appointment_message' not in details
+
+
+def test_slots_are_collected_in_document_order_without_duplicates():
+    slots = ''.join(f'<button class="time-slot">{time}</button>' for time in
+                    ('09:00', '09:30', '09:00', '10:00', '10:30', '11:00', '11:30'))
+    available, message, details = parse_result_page(
+        page(slots + '<td class="day available"><b>12</b>.05</td><span class="slot">13:00</span>'), APPOINTMENT_URL)
+    
+    assert available
+    assert details['all_slots'] == ['09:00', '09:30', '10:00', '10:30', '11:00', '11:30', '12.05']
+    assert details['available_slots'] == details['all_slots'][:5]
+    assert details['slots_found'] == 7
+    assert message.startswith('Appointments available! Found 7 slots')
+
+
+def test_short_slot_texts_are_ignored():
+    available, message, _ = parse_result_page(page('<div class="slot">-</div>'), APPOINTMENT_URL)
+    
+    assert not available
+    assert message == 'No appointment slots found'
+
+
+def test_error_messages_are_capped_per_keyword():
+    body = ''.join(f'<p>Hata {number}</p>' for number in range(5)) + '<script>var error = 1;</script>'
+    _, _, details = parse_result_page(page(body), APPOINTMENT_URL)
+    
+    assert details['error_messages'] == ['Hata 0', 'Hata 1', 'Hata 2']
+
+
+def test_page_issue_outside_the_appointment_page():
+    _, _, details = parse_result_page(page('<p>Welcome</p>'), 'https://example.test/')
+    
+    assert details['page_issue'] == 'Not on appointment page'
+
+
+def test_xml_declaration_is_accepted():
+    available, _, details = parse_result_page(
+        '<?xml version="1.0" encoding="utf-8"?>' + page('<div class="slot">10:00</div>'), APPOINTMENT_URL)
+    
+    assert available
+    assert details['all_slots'] == ['10:00']
\ No newline at end of file